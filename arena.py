@@ -1,57 +1,111 @@
 # arena.py
 import pygame
 import random
+from assets import load_image
+from spatial_hash import SpatialHash
+from tmx import TileMap
+from chunk_grid import ChunkGrid
+
+FEW_OBSTACLES = 64  # up to this many, one rect is tested against each directly (no grid)
 
 class Arena:
     """Manages the game arena with parallax background layers and obstacles"""
     
-    def __init__(self, width, height):
+    def __init__(self, width, height, map_path=None, collision_layers=("ground",)):
         self.width = width
         self.height = height
+        self.map_path = map_path
+        
+        # Load obstacle and decoration sprites
+        self.obstacles = []
+        self.decorations = []
+        self.ground_tiles = []
+        self.tilemap = None
+        
+        # World size (the built-in arena is exactly one screen)
+        self.world_width = width
+        self.world_height = height
+        
+        if map_path:
+            # Arena comes from a Tiled map, which brings its own sky and backgrounds
+            self.bg_sky = None
+            self.bg_clouds = None
+            self.bg_flora1 = None
+            self.bg_flora2 = None
+            self.load_map(map_path, collision_layers)
+        else:
+            self.load_backgrounds()
+            self.load_tileset()
+            self.load_objects()
+            self.load_decorations()
+        
+        # Obstacles never move, so their broadphase grid is built once
+        self.obstacle_rects = self.get_obstacle_rects()
+        self.obstacle_grid = SpatialHash()
+        self.obstacle_grid.rebuild_rects(self.obstacle_rects)
         
+        # Static content is pre-composited into these chunk grids on first draw
+        self.back_layer = ChunkGrid()
+        self.static_layer = ChunkGrid()
+        self.layers_dirty = True
+        
+        # Camera offset for parallax
+        self.camera_x = 0
+        self.camera_y = 0
+        self.parallax_offset_x = 0
+        self.parallax_offset_y = 0
+    
+    def load_backgrounds(self):
+        """Load the full-screen parallax background layers"""
         # Load all background layers for parallax effect
         try:
             # Load full HD background layers
-            self.bg_sky = pygame.image.load("asset1/PNG/Background/1920x1080/Sky_1920x1080.png").convert()
-            self.bg_clouds = pygame.image.load("asset1/PNG/Background/1920x1080/Clouds_1920x1080.png").convert_alpha()
-            self.bg_flora1 = pygame.image.load("asset1/PNG/Background/1920x1080/Flora1_1920x1080.png").convert_alpha()
-            self.bg_flora2 = pygame.image.load("asset1/PNG/Background/1920x1080/Flora2_1920x1080.png").convert_alpha()
+            self.bg_sky = load_image("asset1/PNG/Background/1920x1080/Sky_1920x1080.png", alpha=False)
+            self.bg_clouds = load_image("asset1/PNG/Background/1920x1080/Clouds_1920x1080.png")
+            self.bg_flora1 = load_image("asset1/PNG/Background/1920x1080/Flora1_1920x1080.png")
+            self.bg_flora2 = load_image("asset1/PNG/Background/1920x1080/Flora2_1920x1080.png")
             
             # Scale backgrounds to fit screen
-            self.bg_sky = pygame.transform.scale(self.bg_sky, (width, height))
-            self.bg_clouds = pygame.transform.scale(self.bg_clouds, (width, height))
-            self.bg_flora1 = pygame.transform.scale(self.bg_flora1, (width, height))
-            self.bg_flora2 = pygame.transform.scale(self.bg_flora2, (width, height))
+            self.bg_sky = pygame.transform.scale(self.bg_sky, (self.width, self.height))
+            self.bg_clouds = pygame.transform.scale(self.bg_clouds, (self.width, self.height))
+            self.bg_flora1 = pygame.transform.scale(self.bg_flora1, (self.width, self.height))
+            self.bg_flora2 = pygame.transform.scale(self.bg_flora2, (self.width, self.height))
+            
+            # RLE-encode the transparent parallax layers so blits skip empty pixels
+            for layer in (self.bg_clouds, self.bg_flora1, self.bg_flora2):
+                layer.set_alpha(255, pygame.RLEACCEL)
             
             print("✅ Loaded background layers successfully!")
         except Exception as e:
             print(f"⚠️ Error loading backgrounds: {e}")
             # Fallback gradient background
-            self.bg_sky = pygame.Surface((width, height))
+            self.bg_sky = pygame.Surface((self.width, self.height))
             self.bg_sky.fill((135, 206, 250))  # Sky blue
             self.bg_clouds = None
             self.bg_flora1 = None
             self.bg_flora2 = None
-        
-        # Load obstacle and decoration sprites
-        self.obstacles = []
-        self.decorations = []
-        self.ground_tiles = []
-        
-        self.load_tileset()
-        self.load_objects()
-        self.load_decorations()
-        
-        # Camera offset for parallax
-        self.camera_x = 0
-        self.camera_y = 0
-        self.parallax_offset_x = 0
-        self.parallax_offset_y = 0
+    
+    def load_map(self, map_path, collision_layers):
+        """Build the arena from a Tiled .tmx map; tiles in collision layers become obstacles"""
+        self.tilemap = TileMap.load(map_path)
+        bounds = self.tilemap.tile_bounds()
+        # put the top-left used tile at world (0, 0); the world is as big as the map
+        if bounds:
+            tile_w, tile_h = self.tilemap.tilewidth, self.tilemap.tileheight
+            self.map_offset = (-bounds[0] * tile_w, -bounds[1] * tile_h)
+            self.world_width = (bounds[2] - bounds[0]) * tile_w
+            self.world_height = (bounds[3] - bounds[1]) * tile_h
+        else:
+            self.map_offset = (0, 0)
+        solid_layers = self.tilemap.find_layers(collision_layers)
+        for rect in self.tilemap.collision_rects(solid_layers, self.map_offset):
+            self.obstacles.append({"image": None, "rect": rect})
+        print(f"✅ Loaded map {map_path} ({len(self.tilemap.layers)} layers, {len(self.obstacles)} obstacles)")
     
     def load_tileset(self):
         """Load ground tileset and create multiple platform levels"""
         try:
-            tileset = pygame.image.load("asset1/PNG/Tileset.png").convert_alpha()
+            tileset = load_image("asset1/PNG/Tileset.png")
             tile_size = 32
             
             # Extract different tiles from tileset
@@ -89,14 +143,14 @@ class Arena:
         """Load ALL interactive objects and create a complete arena"""
         try:
             # Load all object images
-            chest = pygame.image.load("asset1/PNG/chest.png").convert_alpha()
-            flying_stone = pygame.image.load("asset1/PNG/Flying_stone.png").convert_alpha()
-            cave = pygame.image.load("asset1/PNG/cave_entrance.png").convert_alpha()
-            key = pygame.image.load("asset1/PNG/key.png").convert_alpha()
+            chest = load_image("asset1/PNG/chest.png")
+            flying_stone = load_image("asset1/PNG/Flying_stone.png")
+            cave = load_image("asset1/PNG/cave_entrance.png")
+            key = load_image("asset1/PNG/key.png")
             
             # Load additional objects
             try:
-                objects_sheet = pygame.image.load("asset1/PNG/Objects.png").convert_alpha()
+                objects_sheet = load_image("asset1/PNG/Objects.png")
             except:
                 objects_sheet = None
             
@@ -154,16 +208,16 @@ class Arena:
         """Load ALL decorative elements to fill the arena"""
         try:
             # Load all decoration images
-            predator_plant = pygame.image.load("asset1/PNG/Predator_plant.png").convert_alpha()
-            fairy = pygame.image.load("asset1/PNG/Fairys.png").convert_alpha()
-            stalactite = pygame.image.load("asset1/PNG/stalactites.png").convert_alpha()
-            shinies = pygame.image.load("asset1/PNG/shinies.png").convert_alpha()
+            predator_plant = load_image("asset1/PNG/Predator_plant.png")
+            fairy = load_image("asset1/PNG/Fairys.png")
+            stalactite = load_image("asset1/PNG/stalactites.png")
+            shinies = load_image("asset1/PNG/shinies.png")
             
             # Load additional decorations
             try:
-                details = pygame.image.load("asset1/PNG/Details.png").convert_alpha()
-                clouds_tiles = pygame.image.load("asset1/PNG/Clouds_in_tiles.png").convert_alpha()
-                spikes = pygame.image.load("asset1/PNG/Spikes.png").convert_alpha()
+                details = load_image("asset1/PNG/Details.png")
+                clouds_tiles = load_image("asset1/PNG/Clouds_in_tiles.png")
+                spikes = load_image("asset1/PNG/Spikes.png")
             except:
                 details = None
                 clouds_tiles = None
@@ -246,8 +300,41 @@ class Arena:
         self.parallax_offset_x = self.camera_x
         self.parallax_offset_y = self.camera_y
     
-    def draw(self, screen):
-        """Draw all arena layers with proper depth sorting"""
+    def invalidate_layers(self):
+        """Call after changing tiles, obstacles or decorations so the baked layers are rebuilt"""
+        self.layers_dirty = True
+    
+    def bake_layers(self):
+        """Pre-composite everything that never moves into two chunked layers"""
+        # Back decorations sit between the distant parallax layers
+        back = [d for d in self.decorations if d.get("layer") == "back"]
+        self.back_layer.bake(back)
+        
+        # Everything in front of Flora 2, in draw order:
+        # mid decorations, ground tiles (back to front), obstacles, front decorations
+        static = [d for d in self.decorations if d.get("layer") == "mid"]
+        static += sorted(self.ground_tiles, key=lambda t: t.get("layer", 3))
+        static += self.obstacles
+        static += [d for d in self.decorations if d.get("layer") == "front"]
+        self.static_layer.bake(static)
+        
+        self.layers_dirty = False
+    
+    def draw(self, screen, time_ms=None, view=None):
+        """Draw all arena layers with proper depth sorting.
+        view is the world rect on screen (camera.get_view()); only chunks inside it are drawn."""
+        view_x, view_y = (view.x, view.y) if view else (0, 0)
+        if self.tilemap:
+            # Map chunks are pre-rendered; time_ms drives animated tiles
+            if time_ms is None:
+                time_ms = pygame.time.get_ticks()
+            offset = (self.map_offset[0] - view_x, self.map_offset[1] - view_y)
+            self.tilemap.draw(screen, offset, time_ms)
+            return
+        
+        if self.layers_dirty:
+            self.bake_layers()
+        
         # ===== BACKGROUND LAYERS (Parallax) =====
         # Layer 1: Sky (no parallax - static background)
         screen.blit(self.bg_sky, (0, 0))
@@ -264,10 +351,8 @@ class Arena:
             flora1_y = -self.parallax_offset_y * 0.4
             screen.blit(self.bg_flora1, (flora1_x, flora1_y))
         
-        # ===== BACK DECORATIONS (Behind everything) =====
-        for decoration in self.decorations:
-            if decoration.get("layer") == "back":
-                screen.blit(decoration["image"], decoration["rect"])
+        # ===== BACK DECORATIONS (Behind everything, baked) =====
+        self.back_layer.draw(screen, (-view_x, -view_y))
         
         # Layer 4: Flora 2 (faster parallax - closer plants)
         if self.bg_flora2:
@@ -275,33 +360,37 @@ class Arena:
             flora2_y = -self.parallax_offset_y * 0.6
             screen.blit(self.bg_flora2, (flora2_x, flora2_y))
         
-        # ===== MID DECORATIONS (Between background and gameplay) =====
-        for decoration in self.decorations:
-            if decoration.get("layer") == "mid":
-                screen.blit(decoration["image"], decoration["rect"])
-        
-        # ===== GROUND TILES (Multiple layers) =====
-        # Sort by layer to draw back to front
-        sorted_tiles = sorted(self.ground_tiles, key=lambda t: t.get("layer", 3))
-        for tile in sorted_tiles:
-            screen.blit(tile["image"], tile["rect"])
-        
-        # ===== OBSTACLES (Foreground - collidable objects) =====
-        for obstacle in self.obstacles:
-            screen.blit(obstacle["image"], obstacle["rect"])
-        
-        # ===== FRONT DECORATIONS (In front of everything) =====
-        for decoration in self.decorations:
-            if decoration.get("layer") == "front":
-                screen.blit(decoration["image"], decoration["rect"])
+        # ===== MID DECORATIONS + GROUND TILES + OBSTACLES + FRONT DECORATIONS (baked) =====
+        self.static_layer.draw(screen, (-view_x, -view_y))
+    
+    def background_key(self, view=None):
+        """Hashable summary of what draw() would produce for this view, so a
+        renderer can reuse the last frame's background while it is unchanged.
+        None means the arena changes every frame (animated map tiles)."""
+        view_pos = (view.x, view.y) if view else (0, 0)
+        if self.tilemap:
+            return None if self.tilemap.animations else view_pos
+        # blit truncates float positions, so compare the pixel each parallax layer lands on
+        parallax = tuple(int(-offset * factor)
+                         for factor in (0.2, 0.4, 0.6)
+                         for offset in (self.parallax_offset_x, self.parallax_offset_y))
+        return (view_pos, parallax, self.layers_dirty)
+    
+    @property
+    def world_size(self):
+        return (self.world_width, self.world_height)
     
     def get_obstacle_rects(self):
         """Return all obstacle collision rectangles"""
         return [obs["rect"] for obs in self.obstacles]
     
+    def query_obstacles(self, rect):
+        """Return indices of obstacles overlapping rect, in load order"""
+        if len(self.obstacle_rects) <= FEW_OBSTACLES:
+            # pygame's own loop over a few dozen rects beats the array query
+            return rect.collidelistall(self.obstacle_rects)
+        return self.obstacle_grid.query_rect(rect).tolist()
+    
     def check_collision(self, rect):
         """Check if rect collides with any obstacle"""
-        for obstacle in self.obstacles:
-            if rect.colliderect(obstacle["rect"]):
-                return True
-        return False
+        return len(self.query_obstacles(rect)) > 0
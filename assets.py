@@ -0,0 +1,195 @@
+# assets.py
+import os, json
+import pygame
+
+# ---------------------------------------------------------
+# Asset loading shared by the window and headless runs
+# ---------------------------------------------------------
+SPRITE_DIR = "assets/sprites"
+
+# Texture atlases written by build_atlases.py: name -> folder of PNGs packed into it
+ATLAS_DIR = "assets/atlases"
+ATLAS_SOURCES = {
+    "sprites": SPRITE_DIR,
+    "arena": "asset1/PNG",
+}
+
+
+def load_image(path, alpha=True):
+    """Load an image, converting it for fast blitting when a window exists.
+
+    Images packed into a texture atlas are handed out as subsurfaces of the
+    (shared) atlas, so callers must not draw onto them.
+    convert()/convert_alpha() need a display mode, so headless simulations
+    (no window) keep the surface exactly as it was decoded.
+    """
+    if alpha:
+        region = atlas_region(path)
+        if region is not None:
+            return region
+    image = pygame.image.load(path)
+    if pygame.display.get_surface() is None:
+        return image
+    return image.convert_alpha() if alpha else image.convert()
+
+
+def _source_key(path):
+    return os.path.normpath(path).replace(os.sep, "/")
+
+
+def _source_stamp(path):
+    """(size, mtime) of a source image, used to spot stale atlas entries"""
+    stat = os.stat(path)
+    return [stat.st_size, int(stat.st_mtime)]
+
+
+# ---------------------------------------------------------
+# Texture atlases
+# ---------------------------------------------------------
+_atlas_index = None  # source path -> (atlas name, rect, stamp)
+_atlases = {}        # atlas name -> loaded atlas surface
+
+
+def _load_atlas_index():
+    index = {}
+    for name in ATLAS_SOURCES:
+        try:
+            with open(os.path.join(ATLAS_DIR, f"{name}.json")) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            continue  # atlas not built - images load from their own files
+        for path, entry in meta["sprites"].items():
+            index[path] = (name, entry["rect"], entry["stamp"])
+    return index
+
+
+def atlas_region(path):
+    """Subsurface of the atlas `path` was packed into, or None when it is not
+    in an atlas (or changed since the atlas was built)"""
+    global _atlas_index
+    if _atlas_index is None:
+        _atlas_index = _load_atlas_index()
+    entry = _atlas_index.get(_source_key(path))
+    if entry is None:
+        return None
+    name, rect, stamp = entry
+    try:
+        if _source_stamp(path) != stamp:
+            return None
+    except OSError:
+        return None
+    atlas = _atlases.get(name)
+    if atlas is None:
+        atlas = pygame.image.load(os.path.join(ATLAS_DIR, f"{name}.png"))
+        if pygame.display.get_surface() is not None:
+            atlas = atlas.convert_alpha()
+        _atlases[name] = atlas
+    return atlas.subsurface(rect)
+
+
+def pack_atlas(paths, max_width=2048):
+    """Shelf-pack images into one surface. Returns (atlas, {path: rect}) with
+    rects as [x, y, w, h]; images that fail to load are skipped."""
+    images = {}
+    for path in paths:
+        try:
+            images[path] = pygame.image.load(path)
+        except pygame.error:
+            print(f"⚠️ Skipping {path} (could not load)")
+    # tallest first keeps shelves tight
+    order = sorted(images, key=lambda p: (-images[p].get_height(), p))
+    rects = {}
+    x = y = shelf_height = width = 0
+    for path in order:
+        w, h = images[path].get_size()
+        if x + w > max_width and x > 0:
+            x, y = 0, y + shelf_height
+            shelf_height = 0
+        rects[path] = [x, y, w, h]
+        x += w
+        shelf_height = max(shelf_height, h)
+        width = max(width, x)
+
+    atlas = pygame.Surface((max(width, 1), max(y + shelf_height, 1)), pygame.SRCALPHA)
+    atlas.blits([(images[path], rects[path][:2]) for path in order], doreturn=False)
+    return atlas, rects
+
+
+def build_atlas(name, max_width=2048):
+    """Pack the PNGs directly inside ATLAS_SOURCES[name] into
+    ATLAS_DIR/<name>.png plus a <name>.json index; returns the index"""
+    folder = ATLAS_SOURCES[name]
+    paths = sorted(_source_key(os.path.join(folder, f)) for f in os.listdir(folder) if f.lower().endswith(".png"))
+    atlas, rects = pack_atlas(paths, max_width)
+    os.makedirs(ATLAS_DIR, exist_ok=True)
+    pygame.image.save(atlas, os.path.join(ATLAS_DIR, f"{name}.png"))
+    meta = {
+        "image": f"{name}.png",
+        "size": list(atlas.get_size()),
+        "sprites": {path: {"rect": rect, "stamp": _source_stamp(path)} for path, rect in rects.items()},
+    }
+    with open(os.path.join(ATLAS_DIR, f"{name}.json"), "w") as f:
+        json.dump(meta, f, indent=1)
+    # pick the new atlas up on the next load_image
+    global _atlas_index
+    _atlas_index = None
+    _atlases.pop(name, None)
+    return meta
+
+
+def load_game_sprites():
+    """Load the player, bullet and slime sprites used by the game rules"""
+    return {
+        "player": load_image(f"{SPRITE_DIR}/player_walk_0.png"),
+        "bullet": load_image(f"{SPRITE_DIR}/bullet.png"),
+        "enemies": [load_image(f"{SPRITE_DIR}/slime_animation_{i}.png") for i in range(4)],
+    }
+
+
+# ---------------------------------------------------------
+# Shared scaled sprites
+# ---------------------------------------------------------
+class ScaledSpriteCache:
+    """Scales each source image once per scale factor and hands out the
+    shared result, so spawning entities never allocates new Surfaces.
+    Callers must treat the returned surfaces as read-only."""
+
+    def __init__(self):
+        self.surfaces = {}  # (id(source), scale) -> (source, scaled surface)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, source, scale):
+        key = (id(source), scale)
+        entry = self.surfaces.get(key)
+        # the stored source reference keeps its id from being reused
+        if entry is not None and entry[0] is source:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        scaled = pygame.transform.scale_by(source, scale) if scale != 1 else source
+        self.surfaces[key] = (source, scaled)
+        return scaled
+
+    def stats(self):
+        """Hit/miss counters plus how many surfaces (and pixel bytes) are held"""
+        held = [scaled for _, scaled in self.surfaces.values()]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "surfaces": len(held),
+            "bytes": sum(s.get_pitch() * s.get_height() for s in held),
+        }
+
+    def clear(self):
+        self.surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+scaled_sprites = ScaledSpriteCache()
+
+
+def get_scaled(source, scale):
+    """Shared copy of `source` scaled by `scale` (see ScaledSpriteCache)"""
+    return scaled_sprites.get(source, scale)
@@ -0,0 +1,145 @@
+# batch.py
+# ----------------------------------------------------------
+# Run many headless games (wave 1 until death) across a
+# process pool and stream one result per game to JSONL or
+# CSV as games finish.
+#
+#   python batch.py --games 10000 --workers 8 --policy kite --out results.jsonl
+# ----------------------------------------------------------
+import argparse, csv, json, os, sys, time
+from multiprocessing import Pool
+import numpy as np
+from config import WIDTH, HEIGHT, ARENA_MAP
+from simulation import GameSimulation
+from policies import POLICIES
+
+RESULT_FIELDS = ["game", "seed", "policy", "score", "wave", "ticks", "seconds"]
+
+# Games that never die (good policies) end after 30 minutes of game time
+DEFAULT_MAX_TICKS = 60 * 60 * 30
+
+# One simulation per worker process, reused for all of its games
+_worker = {}
+
+
+def _init_worker(map_path, policy, max_ticks):
+    from arena import Arena
+    _worker["sim"] = GameSimulation(arena=Arena(WIDTH, HEIGHT, map_path))
+    _worker["policy"] = policy
+    _worker["max_ticks"] = max_ticks
+
+
+def _run_game(job):
+    game, seed = job
+    return run_game(_worker["sim"], POLICIES[_worker["policy"]], seed, _worker["max_ticks"],
+                    game=game, policy_name=_worker["policy"])
+
+
+def run_game(sim, policy, seed, max_ticks=None, game=0, policy_name=None):
+    """Play one game from wave 1 until death (or max_ticks); returns its result row"""
+    start = time.perf_counter()
+    sim.reset(seed)
+    rng = np.random.default_rng(seed)  # the policy's own randomness
+    while not sim.game_over and (max_ticks is None or sim.ticks < max_ticks):
+        sim.step(policy(sim, rng))
+    return {
+        "game": game,
+        "seed": seed,
+        "policy": policy_name or policy.__name__,
+        "score": sim.score,
+        "wave": sim.wave,
+        "ticks": sim.ticks,
+        "seconds": round(time.perf_counter() - start, 4),
+    }
+
+
+class ResultWriter:
+    """Writes result rows as JSON lines, or CSV when the path ends in .csv"""
+
+    def __init__(self, path):
+        self.file = open(path, "w", newline="") if path else None
+        self.csv = None
+        if self.file and path.lower().endswith(".csv"):
+            self.csv = csv.DictWriter(self.file, fieldnames=RESULT_FIELDS)
+            self.csv.writeheader()
+
+    def write(self, row):
+        if self.file is None:
+            return
+        if self.csv:
+            self.csv.writerow(row)
+        else:
+            self.file.write(json.dumps(row) + "\n")
+        self.file.flush()  # stream: partial results survive an interrupted run
+
+    def close(self):
+        if self.file:
+            self.file.close()
+
+
+def run_batch(games, workers=None, policy="nearest", seed=0, max_ticks=DEFAULT_MAX_TICKS,
+              map_path=ARENA_MAP, out=None, progress_every=100):
+    """Run `games` games (seeds seed, seed+1, ...) and return the summary dict"""
+    workers = workers or os.cpu_count() or 1
+    jobs = [(game, seed + game) for game in range(games)]
+    writer = ResultWriter(out)
+    scores, waves, ticks = [], [], []
+    start = time.perf_counter()
+
+    def collect(row):
+        writer.write(row)
+        scores.append(row["score"])
+        waves.append(row["wave"])
+        ticks.append(row["ticks"])
+        if progress_every and len(scores) % progress_every == 0:
+            elapsed = time.perf_counter() - start
+            print(f"  {len(scores)}/{games} games ({len(scores) / elapsed:.1f} games/s)", file=sys.stderr)
+
+    try:
+        if workers == 1:
+            _init_worker(map_path, policy, max_ticks)
+            for job in jobs:
+                collect(_run_game(job))
+        else:
+            with Pool(workers, initializer=_init_worker, initargs=(map_path, policy, max_ticks)) as pool:
+                for row in pool.imap_unordered(_run_game, jobs, chunksize=max(1, min(16, games // (workers * 8)))):
+                    collect(row)
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "games": len(scores),
+        "workers": workers,
+        "policy": policy,
+        "seconds": round(elapsed, 3),
+        "games_per_sec": round(len(scores) / elapsed, 2) if elapsed else 0.0,
+        "ticks_per_sec": round(sum(ticks) / elapsed, 1) if elapsed else 0.0,
+        "mean_score": float(np.mean(scores)) if scores else 0.0,
+        "median_score": float(np.median(scores)) if scores else 0.0,
+        "max_wave": max(waves, default=0),
+        "mean_ticks": float(np.mean(ticks)) if ticks else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run many headless games in parallel")
+    parser.add_argument("--games", type=int, default=100, help="number of games to play")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all CPUs)")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="nearest", help="built-in player to run")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game (game i uses seed + i)")
+    parser.add_argument("--max-ticks", type=int, default=DEFAULT_MAX_TICKS, help="stop a game after this many ticks")
+    parser.add_argument("--map", default=ARENA_MAP, help="Tiled .tmx arena (default: config.ARENA_MAP)")
+    parser.add_argument("--out", default=None, help="results file (.jsonl, or .csv)")
+    args = parser.parse_args(argv)
+
+    summary = run_batch(args.games, args.workers, args.policy, args.seed, args.max_ticks, args.map, args.out)
+    print(f"✅ {summary['games']} games in {summary['seconds']}s with {summary['workers']} workers - "
+          f"{summary['games_per_sec']} games/s, {summary['ticks_per_sec']:.0f} ticks/s")
+    print(f"   score mean {summary['mean_score']:.1f} / median {summary['median_score']:.1f}, "
+          f"max wave {summary['max_wave']}, mean ticks {summary['mean_ticks']:.0f}")
+    return summary
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,524 @@
+# benchmark.py
+# ----------------------------------------------------------
+# Reproducible performance benchmarks. Scripted stress
+# scenarios run headlessly (fixed seeds, fixed tick counts),
+# each in its own fresh process so peak memory is its own, and
+# report ticks/sec, frame time percentiles, per-phase means and
+# peak memory. Results can be saved as a named baseline and
+# later runs compared against it; the comparison exits with 1
+# when something got slower or bigger than the threshold, so
+# regressions in enemy.py / bullet.py / arena.py show up before
+# a build ships.
+#
+#   python benchmark.py                         # run and print every scenario
+#   python benchmark.py --save baseline         # ... and keep it as benchmarks/baseline.json
+#   python benchmark.py --compare baseline      # ... and report changes against it
+#   python benchmark.py --scenarios wave20 --ticks 600
+# ----------------------------------------------------------
+import argparse, json, math, os, platform, subprocess, sys, time, tracemalloc
+import multiprocessing
+
+# every scenario runs without a window (render scenarios draw into a dummy display)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+import pygame
+from config import WIDTH, HEIGHT
+from simulation import GameSimulation
+from policies import nearest_policy, kite_policy, idle_policy
+from profiler import FrameProfiler
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCH_VERSION = 1
+BASELINE_DIR = "benchmarks"
+
+# Generated by the large_tmx scenario (deterministic, rebuilt when missing)
+LARGE_MAP_SOURCE = "asset1/TILED_files/Map.tmx"
+LARGE_MAP_PATH = os.path.join(BASELINE_DIR, "maps", "large_arena.tmx")
+LARGE_MAP_REPEAT = 3       # the source map is tiled this many times across and down
+
+WARMUP_TICKS = 60          # run before timing starts (first-use caches, prerendered chunks)
+TRACE_TICKS = 300          # length of the separate tracemalloc pass
+DEFAULT_REPEAT = 3         # timed runs per scenario; the median one is reported
+DEFAULT_THRESHOLD = 10.0   # % change counted as a regression by --compare
+
+HORDE_SIZE = 300           # live enemies held in the wave20 scenario
+SPAM_BULLETS_PER_TICK = 16 # extra bullets fired in a ring every tick by bullet_spam
+SPAM_ENEMIES = 50          # live enemies held in bullet_spam, so collisions have work
+PAN_PERIOD = 1200          # ticks for the render scenarios' camera to go round once
+VEC_ENVS = 16              # games stepped together by the vec_env scenario
+CROWD_SIDE = 160           # crowd scenarios pack their enemies into a square this wide (px)
+SEED = 1234
+
+
+# ---------------------------------------------------------
+# Scenarios: scenario(seed, profiler) -> tick function.
+# Setup happens in the scenario; every call of the returned
+# function is one timed frame.
+# ---------------------------------------------------------
+def _simulation(map_path=None, seed=SEED):
+    from arena import Arena
+    sim = GameSimulation(arena=Arena(WIDTH, HEIGHT, map_path))
+    sim.reset(seed)
+    # god mode: stress scenarios must not end early because the player died
+    sim.player.health = sim.player.max_health = 10 ** 9
+    return sim
+
+
+def _hold_enemies(sim, count, rng):
+    """Top the game up to `count` live enemies at random spots and freeze the
+    wave counters, so the load stays the same for the whole run"""
+    missing = count - sim.enemy_manager.get_count()
+    if missing > 0:
+        world_width, world_height = sim.arena.world_size
+        for x, y in rng.uniform((0, 0), (world_width, world_height), size=(missing, 2)):
+            sim.enemy_manager.spawn_enemy_at(float(x), float(y))
+    sim.enemies_spawned_this_wave = sim.enemies_per_wave
+    sim.enemies_killed_this_wave = 0
+
+
+def _pan_view(tick, world_size):
+    """Camera view for a tick: circles the world centre, PAN_PERIOD ticks per lap"""
+    angle = 2 * math.pi * tick / PAN_PERIOD
+    max_x = max(0, world_size[0] - WIDTH)
+    max_y = max(0, world_size[1] - HEIGHT)
+    x = max_x / 2 + math.cos(angle) * max_x * 0.4
+    y = max_y / 2 + math.sin(angle) * max_y * 0.4
+    return pygame.Rect(int(x), int(y), WIDTH, HEIGHT)
+
+
+def wave20_scenario(seed, profiler):
+    """Wave 20 difficulty with HORDE_SIZE enemies alive; nearest policy shooting"""
+    sim = _simulation(seed=seed)
+    for _ in range(19):
+        sim.start_next_wave()
+    sim.profiler = profiler
+    rng = np.random.default_rng(seed)
+
+    def tick():
+        _hold_enemies(sim, HORDE_SIZE, rng)
+        sim.step(nearest_policy(sim, rng))
+        profiler.count("enemies", sim.enemy_manager.get_count())
+        profiler.count("bullets", len(sim.bullets))
+    return tick
+
+
+def early_waves_scenario(seed, profiler):
+    """A normal game from wave 1 (kiting player, a handful of enemies): the
+    fixed per-step cost that the crowded scenarios hide"""
+    sim = _simulation(seed=seed)
+    sim.profiler = profiler
+    rng = np.random.default_rng(seed)
+
+    def tick():
+        sim.step(kite_policy(sim, rng))
+        profiler.count("enemies", sim.enemy_manager.get_count())
+        profiler.count("bullets", len(sim.bullets))
+    return tick
+
+
+def idle_wave1_scenario(seed, profiler):
+    """Wave 1 with the player standing still: a few enemies, no bullets, so
+    ticks/s is the bare per-step cost (what small waves and batch rollouts pay)"""
+    sim = _simulation(seed=seed)
+    sim.profiler = profiler
+    rng = np.random.default_rng(seed)
+
+    def tick():
+        sim.step(idle_policy(sim, rng))
+        profiler.count("enemies", sim.enemy_manager.get_count())
+    return tick
+
+
+def vec_env_scenario(seed, profiler):
+    """env.VecEnv with VEC_ENVS games on random actions, as RL training runs
+    it (no god mode: finished games reset). One tick is one VecEnv.step, so
+    env-steps/s is ticks/s times VEC_ENVS."""
+    from env import VecEnv
+    envs = VecEnv(VEC_ENVS)
+    envs.reset(seed)
+    rng = np.random.default_rng(seed)
+
+    def tick():
+        actions = rng.uniform((-1, -1, -math.pi, -1), (1, 1, math.pi, 1), size=(VEC_ENVS, 4))
+        envs.step(actions)
+        profiler.count("envs", VEC_ENVS)
+        profiler.count("enemies", sum(env.sim.enemy_manager.get_count() for env in envs.envs) / VEC_ENVS)
+    return tick
+
+
+def crowd_scenario(count):
+    """Scenario with `count` enemies put back every tick at the same random
+    spots in a CROWD_SIDE square around an idle player: crowd steering at its
+    most crowded. Run at several counts, it shows how that cost grows."""
+    def scenario(seed, profiler):
+        sim = _simulation(seed=seed)
+        sim.profiler = profiler
+        rng = np.random.default_rng(seed)
+        _hold_enemies(sim, count, rng)
+        centre = np.array(sim.player.rect.center, dtype=float)
+        packed = centre + rng.uniform(-CROWD_SIDE / 2, CROWD_SIDE / 2, size=(count, 2))
+
+        def tick():
+            _hold_enemies(sim, count, rng)
+            sim.enemy_manager.store.pos[:count] = packed
+            sim.step(idle_policy(sim, rng))
+            profiler.count("enemies", sim.enemy_manager.get_count())
+        return tick
+    return scenario
+
+
+def bullet_spam_scenario(seed, profiler):
+    """Player fires every tick (cooldown skipped) plus a ring of extra bullets"""
+    sim = _simulation(seed=seed)
+    sim.profiler = profiler
+    rng = np.random.default_rng(seed)
+    image = sim.sprites["bullet"]
+    ring = [(math.cos(a), math.sin(a)) for a in np.linspace(0, 2 * math.pi, SPAM_BULLETS_PER_TICK, endpoint=False)]
+    state = {"tick": 0}
+
+    def tick():
+        _hold_enemies(sim, SPAM_ENEMIES, rng)
+        action = nearest_policy(sim, rng)
+        action.shoot = True
+        sim.player.fire_cooldown = 0
+        # spin the ring a little each tick so bullets spread over the arena
+        spin = state["tick"] * 0.05
+        cx, cy = sim.player.rect.center
+        cos_s, sin_s = math.cos(spin), math.sin(spin)
+        for dx, dy in ring:
+            sim.bullets.add_bullet((cx, cy), (cx + dx * cos_s - dy * sin_s, cy + dx * sin_s + dy * cos_s), image)
+        sim.step(action)
+        state["tick"] += 1
+        profiler.count("enemies", sim.enemy_manager.get_count())
+        profiler.count("bullets", len(sim.bullets))
+    return tick
+
+
+def large_tmx_scenario(seed, profiler):
+    """Simulation plus Arena.draw on a generated Tiled map LARGE_MAP_REPEAT^2
+    times the size of the bundled one, camera panning across it"""
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    sim = _simulation(build_large_map(), seed=seed)
+    sim.profiler = profiler
+    rng = np.random.default_rng(seed)
+
+    def tick():
+        sim.step(kite_policy(sim, rng))
+        with profiler.phase("arena"):
+            sim.arena.draw(screen, sim.time_ms, _pan_view(sim.ticks, sim.arena.world_size))
+        profiler.count("enemies", sim.enemy_manager.get_count())
+    return tick
+
+
+def arena_render_scenario(seed, profiler):
+    """Arena.draw of the built-in arena alone, parallax layers moving"""
+    from arena import Arena
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    arena = Arena(WIDTH, HEIGHT)
+    state = {"tick": 0}
+
+    def tick():
+        view = _pan_view(state["tick"], (WIDTH * 2, HEIGHT * 2))
+        arena.update_camera(view.center)
+        with profiler.phase("arena"):
+            arena.draw(screen, state["tick"] * 1000 / 60)
+        state["tick"] += 1
+    return tick
+
+
+SCENARIOS = {
+    "wave20": (wave20_scenario, 1800),
+    "early_waves": (early_waves_scenario, 1800),
+    "idle_wave1": (idle_wave1_scenario, 6000),
+    "vec_env": (vec_env_scenario, 600),
+    "crowd200": (crowd_scenario(200), 600),
+    "crowd400": (crowd_scenario(400), 600),
+    "crowd800": (crowd_scenario(800), 600),
+    "bullet_spam": (bullet_spam_scenario, 1800),
+    "large_tmx": (large_tmx_scenario, 1200),
+    "arena_render": (arena_render_scenario, 1200),
+}
+
+
+def build_large_map(path=LARGE_MAP_PATH, source=LARGE_MAP_SOURCE, repeat=LARGE_MAP_REPEAT):
+    """Write `source` tiled repeat x repeat times as one infinite .tmx (skipped
+    when it already exists, so its parse cache stays valid between runs)"""
+    if os.path.exists(path):
+        return path
+    from tmx import parse_tmx
+    meta, layers_chunks = parse_tmx(source)
+    size = meta["chunk_size"]
+    keys = [key for chunks in layers_chunks for key in chunks]
+    lo = np.min(keys, axis=0)
+    span = np.max(keys, axis=0) - lo + 1  # chunks per copy, so copies stay chunk-aligned
+
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             f'<map version="1.10" orientation="orthogonal" renderorder="right-down" '
+             f'width="{size}" height="{size}" tilewidth="{meta["tilewidth"]}" '
+             f'tileheight="{meta["tileheight"]}" infinite="1">']
+    for tileset in meta["tilesets"]:
+        lines.append(f' <tileset firstgid="{tileset["firstgid"]}" name="{tileset["name"]}" '
+                     f'tilewidth="{tileset["tilewidth"]}" tileheight="{tileset["tileheight"]}" '
+                     f'tilecount="{tileset["tilecount"]}" columns="{tileset["columns"]}">')
+        if tileset["image"]:
+            lines.append(f'  <image source="{os.path.abspath(tileset["image"])}"/>')
+        for tile, frames in sorted(tileset["animations"].items()):
+            lines.append(f'  <tile id="{tile}"><animation>')
+            lines += [f'   <frame tileid="{frame}" duration="{duration}"/>' for frame, duration in frames]
+            lines.append('  </animation></tile>')
+        lines.append(' </tileset>')
+    for layer, chunks in zip(meta["layers"], layers_chunks):
+        lines.append(f' <layer name="{layer["name"]}" visible="{int(layer["visible"])}" '
+                     f'opacity="{layer["opacity"]}">')
+        lines.append('  <data encoding="csv">')
+        for copy_y in range(repeat):
+            for copy_x in range(repeat):
+                for (cx, cy), gids in sorted(chunks.items()):
+                    x = (cx - lo[0] + copy_x * span[0]) * size
+                    y = (cy - lo[1] + copy_y * span[1]) * size
+                    lines.append(f'   <chunk x="{x}" y="{y}" width="{size}" height="{size}">')
+                    lines.append(",".join(map(str, gids.ravel().tolist())))
+                    lines.append('   </chunk>')
+        lines.append('  </data>')
+        lines.append(' </layer>')
+    lines.append('</map>')
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write("\n".join(lines))
+    os.replace(tmp_path, path)
+    return path
+
+
+# ---------------------------------------------------------
+# Running
+# ---------------------------------------------------------
+def _timed_run(scenario, seed, ticks):
+    profiler = FrameProfiler(history=ticks)
+    setup_start = time.perf_counter()
+    tick = scenario(seed, profiler)
+    setup = time.perf_counter() - setup_start
+    for _ in range(WARMUP_TICKS):
+        profiler.begin_frame()
+        tick()
+        profiler.end_frame()
+    start = time.perf_counter()
+    for _ in range(ticks):
+        profiler.begin_frame()
+        tick()
+        profiler.end_frame()
+    return time.perf_counter() - start, setup, profiler
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_scenario(name, ticks=None, repeat=DEFAULT_REPEAT, seed=SEED):
+    """Run one scenario in this process and return its result dict"""
+    scenario, default_ticks = SCENARIOS[name]
+    ticks = ticks or default_ticks
+    runs = sorted((_timed_run(scenario, seed, ticks) for _ in range(repeat)), key=lambda run: run[0])
+    seconds, setup, profiler = runs[len(runs) // 2]
+    stats = profiler.stats()
+    frame = stats["phases"].pop("frame")
+
+    # Python heap peak (NumPy buffers included); tracing slows everything
+    # down, so it gets its own short run instead of skewing the timings
+    tracemalloc.start()
+    tick = scenario(seed, FrameProfiler(history=1))
+    for _ in range(TRACE_TICKS):
+        tick()
+    traced_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "ticks": ticks,
+        "repeat": repeat,
+        "seconds": round(seconds, 4),
+        "setup_seconds": round(setup, 4),
+        "ticks_per_sec": round(ticks / seconds, 1),
+        "frame_ms": {key: round(frame[key], 4) for key in ("mean", "p50", "p95", "p99", "max")},
+        "phases_ms": {phase: round(values["mean"], 4) for phase, values in sorted(stats["phases"].items())},
+        "counts": {count: round(values["mean"], 1) for count, values in stats["counts"].items()},
+        "peak_traced_mb": round(traced_peak / (1024 * 1024), 1),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def machine_info():
+    """Where a result came from - comparisons across machines mean little"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pygame": pygame.version.ver,
+        "commit": commit,
+    }
+
+
+def run_benchmarks(names, ticks=None, repeat=DEFAULT_REPEAT, seed=SEED):
+    """Every scenario in a fresh process (one at a time, so they don't compete
+    for the CPU) and the whole report as a dict"""
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for name in names:
+        print(f"  {name} ...", file=sys.stderr)
+        with context.Pool(1) as pool:
+            results[name] = pool.apply(run_scenario, (name, ticks, repeat, seed))
+            # let the worker exit by itself: SDL swallows the SIGTERM of terminate()
+            pool.close()
+            pool.join()
+    return {
+        "version": BENCH_VERSION,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "seed": seed,
+        "machine": machine_info(),
+        "scenarios": results,
+    }
+
+
+# ---------------------------------------------------------
+# Baselines and reports
+# ---------------------------------------------------------
+# (label, result keys, True when bigger is better)
+METRICS = [
+    ("ticks/s", ("ticks_per_sec",), True),
+    ("frame p50 ms", ("frame_ms", "p50"), False),
+    ("frame p95 ms", ("frame_ms", "p95"), False),
+    ("frame p99 ms", ("frame_ms", "p99"), False),
+    ("heap peak MB", ("peak_traced_mb",), False),
+    ("RSS peak MB", ("peak_rss_mb",), False),
+]
+
+
+def baseline_path(name):
+    """A baseline name (kept in BASELINE_DIR) or a path to a .json file"""
+    if name.endswith(".json") or os.sep in name:
+        return name
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def save_report(report, path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def load_report(path):
+    with open(path) as f:
+        report = json.load(f)
+    if report.get("version") != BENCH_VERSION:
+        raise ValueError(f"{path}: benchmark version {report.get('version')}, expected {BENCH_VERSION}")
+    return report
+
+
+def _metric(result, keys):
+    for key in keys:
+        if result is None:
+            return None
+        result = result.get(key)
+    return result
+
+
+def print_report(report):
+    for name, result in report["scenarios"].items():
+        frame = result["frame_ms"]
+        print(f"{name:<13} {result['ticks_per_sec']:>9.1f} ticks/s   frame ms p50 {frame['p50']:.3f}"
+              f"  p95 {frame['p95']:.3f}  p99 {frame['p99']:.3f}  max {frame['max']:.3f}"
+              f"   heap {result['peak_traced_mb']} MB  RSS {result['peak_rss_mb']} MB")
+        phases = "  ".join(f"{phase} {ms:.3f}" for phase, ms in result["phases_ms"].items())
+        counts = "  ".join(f"{count} {value:g}" for count, value in result["counts"].items())
+        print(f"{'':<13} phases ms: {phases or '-'}   counts: {counts or '-'}")
+        if "envs" in result["counts"]:
+            print(f"{'':<13} {result['ticks_per_sec'] * result['counts']['envs']:.0f} env-steps/s")
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """Rows of (scenario, metric, baseline, current, % change, regressed)
+    for every metric both reports have"""
+    rows = []
+    for name, result in current["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if old is None:
+            continue
+        for label, keys, higher_is_better in METRICS:
+            before, after = _metric(old, keys), _metric(result, keys)
+            if before is None or after is None or before == 0:
+                continue
+            change = (after - before) / before * 100
+            worse = -change if higher_is_better else change
+            rows.append((name, label, before, after, change, worse > threshold))
+    return rows
+
+
+def print_comparison(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """Print the comparison table; returns the number of regressions"""
+    machine = [{key: value for key, value in report["machine"].items() if key != "commit"}
+               for report in (baseline, current)]
+    if machine[0] != machine[1]:
+        print("⚠️ Baseline was recorded on a different machine or software versions")
+    print(f"{'scenario':<13} {'metric':<13} {'baseline':>10} {'current':>10} {'change':>8}")
+    rows = compare(baseline, current, threshold)
+    for name, label, before, after, change, regressed in rows:
+        flag = "  ⚠️ regression" if regressed else ""
+        print(f"{name:<13} {label:<13} {before:>10.3f} {after:>10.3f} {change:>+7.1f}%{flag}")
+    regressions = sum(row[-1] for row in rows)
+    if regressions:
+        print(f"⚠️ {regressions} metric(s) worse than the baseline by more than {threshold:g}%")
+    else:
+        print(f"✅ No metric worse than the baseline by more than {threshold:g}%")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the headless performance benchmarks")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS),
+                        help="scenarios to run (default: all)")
+    parser.add_argument("--ticks", type=int, default=None, help="timed ticks per scenario (default: per scenario)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timed runs per scenario (median reported)")
+    parser.add_argument("--seed", type=int, default=SEED, help="seed of every scenario")
+    parser.add_argument("--out", metavar="JSON", help="write the full results here")
+    parser.add_argument("--save", metavar="NAME", help=f"save the results as a baseline ({BASELINE_DIR}/NAME.json)")
+    parser.add_argument("--compare", metavar="NAME", help="compare the results with a saved baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="%% change that counts as a regression")
+    args = parser.parse_args(argv)
+
+    baseline = load_report(baseline_path(args.compare)) if args.compare else None
+    report = run_benchmarks(args.scenarios, args.ticks, args.repeat, args.seed)
+    print_report(report)
+    if args.out:
+        save_report(report, args.out)
+        print(f"✅ Results written to {args.out}")
+    if args.save:
+        save_report(report, baseline_path(args.save))
+        print(f"✅ Baseline saved to {baseline_path(args.save)}")
+    if baseline is not None and print_comparison(baseline, report, args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
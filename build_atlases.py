@@ -0,0 +1,12 @@
+# build_atlases.py
+# Build step: packs the sprite PNGs into texture atlases (assets/atlases/)
+# Run again after changing any sprite - stale entries are ignored at load time
+import pygame
+from assets import ATLAS_SOURCES, build_atlas
+
+pygame.init()
+
+for name in ATLAS_SOURCES:
+    meta = build_atlas(name)
+    width, height = meta["size"]
+    print(f"✅ Packed {len(meta['sprites'])} images into {name}.png ({width}x{height})")
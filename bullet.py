@@ -1,37 +1,137 @@
 # bullet.py
-import pygame, math
-from config import BULLET_SPEED, BULLET_LIFETIME, BULLET_SCALE
+import pygame, math, copy
+from itertools import repeat
+import numpy as np
+from config import BULLET_SPEED, BULLET_LIFETIME, BULLET_SCALE, BULLET_POOL_SIZE
+from sim_clock import ms_to_frames
+from assets import get_scaled
+from entity_store import EntityStore
+from camera import on_screen
+from render_queue import LAYER_BULLETS
 
 # ---------------------------------------------------------
-# Bullet: tiny moving sprite that flies toward mouse
+# Bullet: read-only sprite view of one bullet in a BulletGroup
+# (views are pooled and refreshed by BulletGroup.sprites())
 # ---------------------------------------------------------
 class Bullet(pygame.sprite.Sprite):
-    def __init__(self, pos, target, image):
+    def __init__(self, image, center):
         super().__init__()
-        # scale pixel bullet sprite
-        self.image = pygame.transform.scale_by(image, BULLET_SCALE)
-        self.rect = self.image.get_rect(center=pos)
+        self.image = image
+        self.rect = self.image.get_rect(center=center)
+
+    def refresh(self, image, center):
+        self.image = image
+        self.rect.size = image.get_size()
+        self.rect.center = center
+
+# ---------------------------------------------------------
+# BulletGroup: all bullets as NumPy arrays, moved and
+# expired in one batch per frame
+# ---------------------------------------------------------
+class BulletGroup:
+    def __init__(self):
+        self.store = EntityStore({
+            "pos": ((2,), float),       # centre position
+            "prev": ((2,), float),      # centre before this frame's move
+            "vel": ((2,), float),       # pixels per 60fps frame
+            "life": ((), float),        # game time left (frames) before it expires
+        }, capacity=BULLET_POOL_SIZE, name="bullet")
+        self.views = []  # Bullet views reused by sprites()
+        self.source_image = None
+        self.image = None
+        self.half_size = np.zeros(2)
+
+    def __len__(self):
+        return len(self.store)
+
+    def add_bullet(self, pos, target, image):
+        # scaled pixel bullet sprite is shared, not made per shot
+        if image is not self.source_image:
+            self.source_image = image
+            self.image = get_scaled(image, BULLET_SCALE)
+            self.half_size = np.array(self.image.get_size(), dtype=float) / 2
 
         # calculate direction vector from player → target
         dx, dy = target[0] - pos[0], target[1] - pos[1]
         angle = math.atan2(dy, dx)
-        self.vel = pygame.Vector2(math.cos(angle), math.sin(angle)) * BULLET_SPEED
-
-        # store when this bullet was created (to auto-delete later)
-        self.spawn_time = pygame.time.get_ticks()
+        self.store.add(
+            pos=pos,
+            prev=pos,
+            vel=(math.cos(angle) * BULLET_SPEED, math.sin(angle) * BULLET_SPEED),
+            # counts down each update (to auto-delete later)
+            life=ms_to_frames(BULLET_LIFETIME),
+        )
 
     def update(self, dt):
-        # move bullet
-        self.rect.x += self.vel.x * dt
-        self.rect.y += self.vel.y * dt
+        n = len(self.store)
+        if n == 0:
+            return
+        # move bullets, remembering where they started so collisions can
+        # test the whole path (a long dt cannot skip over anything)
+        self.store.prev[:n] = self.store.pos[:n]
+        self.store.pos[:n] += self.store.vel[:n] * dt
 
-        # remove if lifetime expired
-        if pygame.time.get_ticks() - self.spawn_time > BULLET_LIFETIME:
-            self.kill()
+        # age every bullet, then remove the ones whose lifetime ran out
+        # (a bullet lives exactly ms_to_frames(BULLET_LIFETIME) frames at dt 1)
+        self.store.life[:n] -= dt
+        self.store.remove(self.store.life[:n] <= 0)
 
-# ---------------------------------------------------------
-# BulletGroup: manages all bullets easily
-# ---------------------------------------------------------
-class BulletGroup(pygame.sprite.Group):
-    def add_bullet(self, pos, target, image):
-        self.add(Bullet(pos, target, image))
+    def remove(self, dead):
+        """Remove bullets selected by a boolean mask"""
+        self.store.remove(dead)
+
+    def get_bounds(self):
+        """Return (mins, maxs) arrays of every bullet's bounding box"""
+        pos = self.store.pos[:len(self.store)]
+        return pos - self.half_size, pos + self.half_size
+
+    def sweep(self, grid):
+        """(bullet index, item index, entry time) for every box in a
+        SpatialHash that a bullet touched along this frame's move, sorted by
+        bullet then time (0 = where it started, 1 = where it is now)"""
+        n = len(self.store)
+        return grid.query_swept(self.store.prev[:n], self.store.pos[:n], self.half_size)
+
+    def get_topleft(self, alpha=1.0):
+        """Integer screen positions of every bullet sprite (like rect.topleft),
+        `alpha` of the way from the previous update's positions to the current"""
+        n = len(self.store)
+        pos = self.store.pos[:n]
+        if alpha != 1.0:
+            prev = self.store.prev[:n]
+            pos = prev + (pos - prev) * alpha
+        return (pos - self.half_size).astype(int)
+
+    def sprites(self):
+        """Sprite views of the current bullets (a snapshot; the view objects
+        are pooled, so the next call updates them in place)"""
+        centers = self.store.pos[:len(self.store)].astype(int).tolist()
+        views = self.views
+        while len(views) < len(centers):
+            views.append(Bullet(self.image, (0, 0)))
+        for view, center in zip(views, centers):
+            view.refresh(self.image, center)
+        return views[:len(centers)]
+
+    def draw(self, surface, camera_offset=(0, 0), queue=None, alpha=1.0):
+        """Draw bullets overlapping the screen. Blits go into `queue` when one
+        is given (the caller flushes it and gets the touched rects); otherwise
+        they are drawn now and the rects returned. `alpha` interpolates between
+        the last two updates (see get_topleft)."""
+        topleft = self.get_topleft(alpha) + camera_offset
+        topleft = topleft[on_screen(surface, topleft, self.half_size * 2)]
+        blits = zip(repeat(self.image), topleft.tolist())
+        if queue is not None:
+            queue.extend(blits, LAYER_BULLETS)
+            return []
+        return surface.blits(blits)
+
+    def snapshot(self):
+        """Read-only copy for drawing (see EntityStore.snapshot)"""
+        frozen = copy.copy(self)
+        frozen.store = self.store.snapshot()
+        frozen.views = []
+        return frozen
+
+    def empty(self):
+        self.store.clear()
@@ -1,14 +1,54 @@
 # camera.py
 import random
+import pygame
+from config import WIDTH, HEIGHT
+
+def on_screen(surface, topleft, size, margin=0):
+    """Mask (NumPy) of sprites (screen-space top-left corners, shared size) overlapping
+    the surface's clip rect, grown by `margin` for things drawn around them"""
+    clip = surface.get_clip()
+    return ((topleft[:, 0] + size[0] + margin > clip.left) & (topleft[:, 0] - margin < clip.right) &
+            (topleft[:, 1] + size[1] + margin > clip.top) & (topleft[:, 1] - margin < clip.bottom))
+
 
 class Camera:
-    """Handles camera effects like shake"""
+    """Handles the world-space viewport and camera effects like shake"""
     
-    def __init__(self):
+    def __init__(self, viewport_width=WIDTH, viewport_height=HEIGHT, seed=None):
+        # Own seeded RNG: shake is cosmetic, so it never draws from (and
+        # desyncs) the simulation's RNG, but is still reproducible
+        self.rng = random.Random(seed)
         self.shake_amount = 0
         self.shake_duration = 0
         self.offset_x = 0
         self.offset_y = 0
+        
+        # World position of the viewport's top-left corner
+        self.x = 0
+        self.y = 0
+        self.viewport_width = viewport_width
+        self.viewport_height = viewport_height
+    
+    def follow(self, target, world_size):
+        """Centre the viewport on a world position, clamped to the world edges"""
+        max_x = max(0, world_size[0] - self.viewport_width)
+        max_y = max(0, world_size[1] - self.viewport_height)
+        self.x = int(min(max(target[0] - self.viewport_width // 2, 0), max_x))
+        self.y = int(min(max(target[1] - self.viewport_height // 2, 0), max_y))
+    
+    def get_view(self):
+        """World-space rectangle currently on screen"""
+        return pygame.Rect(self.x, self.y, self.viewport_width, self.viewport_height)
+    
+    def world_to_screen(self, pos):
+        return (pos[0] - self.x, pos[1] - self.y)
+    
+    def screen_to_world(self, pos):
+        return (pos[0] + self.x, pos[1] + self.y)
+    
+    def reseed(self, seed):
+        """Restart the shake RNG (e.g. with the simulation's seed on restart)"""
+        self.rng.seed(seed)
     
     def start_shake(self, intensity=5, duration=10):
         """Start screen shake effect"""
@@ -18,17 +58,17 @@ class Camera:
     def update(self):
         """Update camera shake"""
         if self.shake_duration > 0:
-            self.offset_x = random.randint(-self.shake_amount, self.shake_amount)
-            self.offset_y = random.randint(-self.shake_amount, self.shake_amount)
+            self.offset_x = self.rng.randint(-self.shake_amount, self.shake_amount)
+            self.offset_y = self.rng.randint(-self.shake_amount, self.shake_amount)
             self.shake_duration -= 1
         else:
             self.offset_x = 0
             self.offset_y = 0
     
     def apply(self, rect):
-        """Apply camera offset to a rect"""
-        return rect.move(self.offset_x, self.offset_y)
+        """Move a world rect to where it is drawn on screen (viewport + shake)"""
+        return rect.move(self.get_offset())
     
     def get_offset(self):
-        """Get current camera offset"""
-        return (self.offset_x, self.offset_y)
+        """Screen offset for world-space drawing: shake minus viewport position"""
+        return (self.offset_x - self.x, self.offset_y - self.y)
@@ -0,0 +1,71 @@
+# check_bullet_lifetime.py
+# ----------------------------------------------------------
+# Bullet lifetime: a bullet fired with BULLET_LIFETIME must be
+# removed by exactly the update that brings its game time to
+# zero - ms_to_frames(BULLET_LIFETIME) updates at dt 1, and
+# ceil(lifetime / dt) at other step sizes. Bullets are fired
+# on different updates so removals renumber the store while
+# older and younger bullets are still alive. Exits with 1 on
+# any difference.
+#
+#   python checks/check_bullet_lifetime.py
+# ----------------------------------------------------------
+import math, os, sys
+from fractions import Fraction
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+import pygame
+from config import BULLET_LIFETIME
+from sim_clock import ms_to_frames
+from bullet import BulletGroup
+
+DTS = (1, 0.5, 1.5, 0.75, 2.0, 0.7)  # step sizes, some not dividing the lifetime
+FIRE_AT = (0, 1, 7, 30)              # updates already run when each bullet is fired
+
+
+def expected_updates(dt):
+    """Updates a bullet survives into: the first one taking its life to <= 0"""
+    return math.ceil(Fraction(ms_to_frames(BULLET_LIFETIME)) / Fraction(dt))
+
+
+def check_dt(dt, image):
+    bullets = BulletGroup()
+    lifetime = expected_updates(dt)
+    problems = []
+    # bullet i is fired along direction i (its quadrant tells them apart)
+    directions = [(1, 1), (-1, 1), (-1, -1), (1, -1)]
+    for tick in range(FIRE_AT[-1] + lifetime + 2):
+        for i, fired in enumerate(FIRE_AT):
+            if tick == fired:
+                bullets.add_bullet((0, 0), directions[i], image)
+        bullets.update(dt)
+        vel = bullets.store.vel[:len(bullets)]
+        alive = sorted(directions.index(d) for d in map(tuple, np.sign(vel).astype(int).tolist()))
+        # bullet i has had tick - fired + 1 updates; it is gone once that reaches the lifetime
+        want = [i for i, fired in enumerate(FIRE_AT) if fired <= tick and tick - fired + 1 < lifetime]
+        if alive != want:
+            problems.append(f"dt {dt}: after update {tick + 1} bullets {alive} are alive, expected {want}")
+    return problems
+
+
+def main():
+    pygame.init()
+    image = pygame.Surface((4, 4))
+    checked = 0
+    for dt in DTS:
+        problems = check_dt(dt, image)
+        checked += 1
+        if problems:
+            for problem in problems[:5]:
+                print(f"⚠️ {problem}")
+            return 1
+    print(f"✅ Bullets live exactly {ms_to_frames(BULLET_LIFETIME):g} frames at dt 1 ({checked} step sizes checked)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+# check_flow_field.py
+# ----------------------------------------------------------
+# Compares FlowField with a plain one-cell-at-a-time search on
+# random obstacle layouts: which cells are blocked, every cell's
+# step distance, and every cell's direction (the legal step to
+# the closest neighbour, first in STEPS order on ties, none
+# within direct_steps; blocked cells point out of the
+# obstacle). Following the directions cell by cell from
+# anywhere must get around the obstacles to the target in
+# exactly the expected number of steps. The target then wanders
+# back and forth so the LRU cache is hit and evicted: fields
+# from the cache must equal fresh searches, and the few-point
+# lookup (step_indices) must agree with sample(). Exits with 1
+# on the first difference.
+#
+#   python checks/check_flow_field.py [--rounds 40] [--seed 0]
+# ----------------------------------------------------------
+import argparse, os, sys
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from flow_field import FlowField, STEPS, STEP_DIRECTIONS, UNREACHABLE
+
+CELL_SIZE = 32
+WORLD_CELLS = ((20, 12), (30, 17), (7, 5), (1, 9))  # grid sizes (cells), odd shapes included
+MAX_OBSTACLES = 12
+LATTICE = 4              # obstacle corners are multiples of this (centres are hit exactly)
+CLEARANCES = (0, 8, 20)
+DIRECT_STEPS = (0, 2)
+WANDER = 30              # target moves per layout for the cache test
+SMALL_CACHE = 3          # cache size forced for the eviction test
+
+
+def random_layout(rng, world):
+    count = int(rng.integers(0, MAX_OBSTACLES + 1))
+    mins = rng.integers(-8, world // LATTICE, size=(count, 2)) * LATTICE
+    maxs = mins + rng.integers(1, 160 // LATTICE, size=(count, 2)) * LATTICE
+    return mins.astype(float), maxs.astype(float)
+
+
+def brute_open(width, height, mins, maxs, clearance):
+    """open[y][x]: the cell centre is outside every grown obstacle"""
+    grown = [((lo[0] - clearance, lo[1] - clearance), (hi[0] + clearance, hi[1] + clearance))
+             for lo, hi in zip(mins.tolist(), maxs.tolist())]
+    return [[not any(lo[0] <= (x + 0.5) * CELL_SIZE < hi[0] and lo[1] <= (y + 0.5) * CELL_SIZE < hi[1]
+                     for lo, hi in grown)
+             for x in range(width)] for y in range(height)]
+
+
+def legal_steps(open_, x, y):
+    """(step index, neighbour) for every step allowed from cell (x, y)"""
+    height, width = len(open_), len(open_[0])
+    for k, (dx, dy) in enumerate(STEPS.tolist()):
+        nx, ny = x + dx, y + dy
+        if not (0 <= nx < width and 0 <= ny < height):
+            continue
+        if dx and dy and not (open_[y][nx] and open_[ny][x]):
+            continue
+        yield k, (nx, ny)
+
+
+def brute_search(open_, target, direct_steps):
+    """(distance, step) dicts: distance of reachable cells, step index of
+    every cell (-1 for none)"""
+    distance = {target: 0}
+    queue = deque([target])
+    while queue:
+        cell = queue.popleft()
+        # steps are symmetric, so the cells that can step onto `cell` are
+        # the ones `cell` can step to
+        for _, (nx, ny) in legal_steps(open_, *cell):
+            if open_[ny][nx] and (nx, ny) not in distance:
+                distance[nx, ny] = distance[cell] + 1
+                queue.append((nx, ny))
+    step = {}
+    for y in range(len(open_)):
+        for x in range(len(open_[0])):
+            d = distance.get((x, y), UNREACHABLE)
+            closer = sorted((distance.get(n, UNREACHABLE), k) for k, n in legal_steps(open_, x, y))
+            closer = [k for nd, k in closer if nd < d]
+            step[x, y] = closer[0] if closer and d > direct_steps else -1
+    return distance, step
+
+
+def check_layout(rng, width, height):
+    mins, maxs = random_layout(rng, width * CELL_SIZE)
+    clearance = float(rng.choice(CLEARANCES))
+    direct_steps = int(rng.choice(DIRECT_STEPS))
+    field = FlowField((width * CELL_SIZE, height * CELL_SIZE), mins, maxs, CELL_SIZE, clearance, direct_steps)
+    open_ = brute_open(width, height, mins, maxs, clearance)
+    if field.open.tolist() != open_:
+        return [f"{width}x{height} cells: blocked cells differ from brute force"]
+
+    problems = []
+    targets = [(int(rng.integers(0, width)), int(rng.integers(0, height))) for _ in range(4)]
+    fresh = {}
+    for target in targets:
+        field.update(((target[0] + rng.random()) * CELL_SIZE, (target[1] + rng.random()) * CELL_SIZE))
+        distance, step = brute_search(open_, target, direct_steps)
+        want_distance = [[distance.get((x, y), UNREACHABLE) for x in range(width)] for y in range(height)]
+        want_step = [step[x, y] for y in range(height) for x in range(width)]
+        want_direction = np.zeros((height, width, 2))
+        for (x, y), k in step.items():
+            if k >= 0:
+                want_direction[y, x] = STEP_DIRECTIONS[k]
+        if field.distance.tolist() != want_distance:
+            problems.append(f"target {target}: distances differ from brute force")
+        if field.step_list != want_step or not np.array_equal(field.direction, want_direction):
+            problems.append(f"target {target}: directions differ from brute force")
+        problems += follow_field(field, open_, distance, target, direct_steps)
+        fresh[target] = (field.distance.copy(), field.direction.copy(), list(field.step_list))
+        if problems:
+            return problems
+    return check_cache(rng, field, fresh)
+
+
+def follow_field(field, open_, distance, target, direct_steps):
+    """Walk the field's steps from every cell that has one: the walk must
+    stay out of obstacles (after leaving the one it started in) and stop
+    exactly direct_steps from the target"""
+    starts = [(x, y) for y in range(field.height) for x in range(field.width)]
+    for x, y in starts:
+        if field.step_list[y * field.width + x] < 0:
+            continue
+        cell, walked, first = (x, y), 0, None
+        while field.step_list[cell[1] * field.width + cell[0]] >= 0:
+            k = field.step_list[cell[1] * field.width + cell[0]]
+            legal = dict(legal_steps(open_, *cell))
+            if k not in legal or not (legal[k] == target or open_[legal[k][1]][legal[k][0]]):
+                return [f"target {target}: from {(x, y)} the field steps into an obstacle at {cell}"]
+            cell, walked = legal[k], walked + 1
+            first = first or cell
+            if walked > field.width * field.height:
+                return [f"target {target}: from {(x, y)} the field goes round in circles"]
+        # a blocked start takes one step out, then the open cell's walk
+        want = max(0, distance.get((x, y), UNREACHABLE) - direct_steps)
+        if not open_[y][x] and (x, y) != target:
+            want = 1 + max(0, distance[first] - direct_steps)
+        if walked != want:
+            return [f"target {target}: from {(x, y)} the field stops after {walked} steps, not {want}"]
+    return []
+
+
+def check_cache(rng, field, fresh):
+    """Wander the target over the fields already searched; with a tiny cache
+    most visits are misses that search again"""
+    problems = []
+    field.cache_size = SMALL_CACHE
+    while len(field.cache) > SMALL_CACHE:
+        field.cache.popitem(last=False)
+    targets = list(fresh)
+    order = list(field.cache)  # expected cache keys, least recently used first
+    for _ in range(WANDER):
+        target = targets[int(rng.integers(0, len(targets)))]
+        searches = field.searches + (target != field.target and target not in order)
+        if target != field.target:
+            if target in order:
+                order.remove(target)
+            elif len(order) >= SMALL_CACHE:
+                order.pop(0)
+            order.append(target)
+        field.update(((target[0] + 0.5) * CELL_SIZE, (target[1] + 0.5) * CELL_SIZE))
+        if field.searches != searches:
+            problems.append(f"target {target}: {field.searches} searches, expected {searches}")
+        if list(field.cache) != order:
+            problems.append(f"target {target}: cache holds {list(field.cache)}, expected {order}")
+        distance, direction, step_list = fresh[target]
+        if not (np.array_equal(field.distance, distance) and np.array_equal(field.direction, direction)
+                and field.step_list == step_list):
+            problems.append(f"target {target}: field after the cache differs from a fresh search")
+
+        # step_indices against sample, points past the edges included
+        points = (rng.random((20, 2)) * 1.4 - 0.2) * [field.width * CELL_SIZE, field.height * CELL_SIZE]
+        direction, _ = field.sample(points)
+        steps = field.step_indices(points.tolist())
+        want = [STEP_DIRECTIONS[k].tolist() if k >= 0 else [0.0, 0.0] for k in steps]
+        if direction.tolist() != want:
+            problems.append(f"target {target}: step_indices differs from sample")
+        if problems:
+            return problems
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare FlowField with a plain search on random layouts")
+    parser.add_argument("--rounds", type=int, default=40, help="random layouts per grid size")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    checked = 0
+    for width, height in WORLD_CELLS:
+        for _ in range(args.rounds):
+            problems = check_layout(rng, width, height)
+            checked += 1
+            if problems:
+                for problem in problems:
+                    print(f"⚠️ {problem}")
+                print(f"⚠️ Seed {args.seed}: layout {checked} does not match brute force")
+                return 1
+    print(f"✅ FlowField matches a plain search in {checked} random layouts")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+# check_small_crowd.py
+# ----------------------------------------------------------
+# EnemyManager.update runs in plain Python up to SMALL_CROWD
+# enemies and with NumPy batches above it. Both must move the
+# same enemies to the same place: random crowds (packed on a
+# lattice so ties and shared spots are common), with and
+# without the flow field, go through a few updates each way.
+# Every field - positions, offsets redrawn from the rng,
+# animation, countdowns - and player hits must be exactly
+# equal. Exits with 1 on the first difference.
+#
+#   python checks/check_small_crowd.py [--rounds 1000] [--seed 0]
+# ----------------------------------------------------------
+import argparse, os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+import pygame
+import enemy
+from enemy import EnemyManager, ANIMATION_SPEED, SMALL_CROWD
+from simulation import GameSimulation
+
+SPREADS = (20, 60, 200, 900)  # side of the square the crowd starts in
+DTS = (1.0, 0.5, 1.37)
+UPDATES = 3
+PLAYER_RECTS = 20
+FIELDS = ("pos", "prev", "offset", "reset_offset", "health", "max_health", "speed", "animation_count")
+
+
+def run(sprites, flow_field, seed, pos, counters, player, dt, rects, small_crowd):
+    """Store fields after UPDATES updates with the given cut-off, and player
+    hits (one per rect) before and after them"""
+    enemy.SMALL_CROWD = small_crowd
+    try:
+        manager = EnemyManager(sprites, seed=seed)
+        for x, y in pos.tolist():
+            manager.spawn_enemy_at(x, y)
+        n = len(manager.store)
+        manager.store.reset_offset[:n], manager.store.animation_count[:n] = counters
+        hits = [manager.check_player_collision(rect) for rect in rects]
+        for _ in range(UPDATES):
+            manager.update(dt, player, flow_field)
+        fields = {name: getattr(manager.store, name)[:n].copy() for name in FIELDS}
+        return fields, hits + [manager.check_player_collision(rect) for rect in rects]
+    finally:
+        enemy.SMALL_CROWD = SMALL_CROWD
+
+
+def check_round(rng, sim, seed):
+    n = int(rng.integers(1, SMALL_CROWD + 1))
+    spread = float(rng.choice(SPREADS))
+    pos = rng.uniform(100, 100 + spread, size=(n, 2))
+    if rng.random() < 0.3:
+        pos = pos // 8 * 8
+    if n > 1 and rng.random() < 0.2:
+        pos[1] = pos[0]
+    # countdowns of 0-2 so offsets are redrawn during the updates, and
+    # animations that wrap (exactly on the last frame too)
+    frames = len(sim.enemy_manager.sprite_images)
+    counters = rng.integers(0, UPDATES, size=n), rng.integers(0, 4 * frames, size=n) * ANIMATION_SPEED
+    player = tuple(rng.uniform(0, 900, 2).tolist())
+    dt = float(rng.choice(DTS))
+    flow_field = sim.flow_field if rng.random() < 0.5 else None
+    if flow_field is not None:
+        flow_field.update(player)
+    # player boxes around the crowd, half of them against the side of an
+    # enemy's box (touching exactly while a lattice crowd is on whole pixels)
+    half_w, half_h = sim.enemy_manager.half_size.tolist()
+    rects = []
+    for _ in range(PLAYER_RECTS):
+        rect = pygame.Rect(*rng.integers(60, 140 + spread, size=2), *rng.integers(1, 60, size=2))
+        if rng.random() < 0.5:
+            x, y = pos[int(rng.integers(0, n))].tolist()
+            rect.center = int(x), int(y)
+            side = int(rng.integers(0, 4))
+            if side == 0:
+                rect.left = int(x + half_w)
+            elif side == 1:
+                rect.right = int(x - half_w)
+            elif side == 2:
+                rect.top = int(y + half_h)
+            else:
+                rect.bottom = int(y - half_h)
+        rects.append(rect)
+
+    few, few_hits = run(sim.sprites["enemies"], flow_field, seed, pos, counters, player, dt, rects, SMALL_CROWD)
+    batch, batch_hits = run(sim.sprites["enemies"], flow_field, seed, pos, counters, player, dt, rects, 0)
+    problems = [f"{n} enemies: {name} differs" for name in FIELDS if not np.array_equal(few[name], batch[name])]
+    wrong = sum(a != b for a, b in zip(few_hits, batch_hits))
+    if wrong:
+        problems.append(f"{n} enemies: player hit differs for {wrong} of {len(few_hits)} boxes")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the plain Python and NumPy enemy updates")
+    parser.add_argument("--rounds", type=int, default=1000, help="random crowds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    sim = GameSimulation()
+    for round_ in range(args.rounds):
+        problems = check_round(rng, sim, round_)
+        if problems:
+            for problem in problems:
+                print(f"⚠️ {problem}")
+            print(f"⚠️ Seed {args.seed}: crowd {round_ + 1} moves differently in plain Python")
+            return 1
+    print(f"✅ Plain Python and NumPy enemy updates agree in {args.rounds} random crowds")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+# check_spatial_hash.py
+# ----------------------------------------------------------
+# Compares SpatialHash.query, query_swept and sweep_times with
+# brute force on random boxes: every pair tested one at a time
+# (Rect.colliderect for overlaps, an exact slab test in
+# fractions for sweeps). Batches are sized to go through both
+# the all-pairs path and the grid, with removed items mixed in.
+# Everything sits on a coarse lattice and moves are powers of
+# two, so touching edges and corners are common and the float
+# results must equal the exact ones. Exits with 1 on the first
+# difference.
+#
+#   python checks/check_spatial_hash.py [--rounds 50] [--seed 0]
+# ----------------------------------------------------------
+import argparse, os, sys
+from fractions import Fraction
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+import pygame
+from spatial_hash import SpatialHash, sweep_times
+
+CELL_SIZE = 64
+LATTICE = 8        # box corners and path starts are multiples of this
+WORLD = 2048       # boxes and paths start within this square (negative cells included)
+MAX_BOX = 256      # largest box side, several cells across
+MOVES = np.array([0, 32, 64, 128, 256, 512])  # per-axis move lengths (exact in floats)
+HALF_SIZES = (0, 4, 12.5)  # moving box half sizes for query_swept
+MAX_PATHS = 40     # moving boxes per scene (the exact test is slow; 16+ builds the grid)
+CORNER_STARTS = 0.3  # share of paths that start on a box corner
+SIZES = (1, 5, 20, 60, 150)  # items per scene, either side of the all-pairs cut-off
+
+
+def random_boxes(rng, count):
+    """(N, 2) mins and maxs of boxes on the lattice"""
+    mins = rng.integers(-WORLD // 4, WORLD, size=(count, 2)) // LATTICE * LATTICE
+    maxs = mins + rng.integers(1, MAX_BOX // LATTICE, size=(count, 2)) * LATTICE
+    return mins.astype(float), maxs.astype(float)
+
+
+def random_paths(rng, count):
+    """(N, 2) starts and moves; some move along one axis only, some not at all"""
+    start = (rng.integers(-WORLD // 4, WORLD, size=(count, 2)) // LATTICE * LATTICE).astype(float)
+    delta = rng.choice(MOVES, size=(count, 2)) * rng.choice([-1, 1], size=(count, 2))
+    return start, delta.astype(float)
+
+
+def brute_overlaps(query_mins, query_maxs, mins, maxs):
+    """Sorted (query, item) pairs by Rect.colliderect"""
+    items = [pygame.Rect(*lo, *(hi - lo)) for lo, hi in zip(mins, maxs)]
+    pairs = []
+    for q, (lo, hi) in enumerate(zip(query_mins, query_maxs)):
+        rect = pygame.Rect(*lo, *(hi - lo))
+        pairs.extend((q, i) for i, item in enumerate(items) if rect.colliderect(item))
+    return pairs
+
+
+def exact_entry(start, delta, lo, hi):
+    """Entry time (Fraction) of one segment into the open box, or None"""
+    enter, leave = Fraction(0), Fraction(1)
+    for s, d, a, b in zip(start, delta, lo, hi):
+        s, d, a, b = Fraction(s), Fraction(d), Fraction(a), Fraction(b)
+        if d == 0:
+            if not a < s < b:
+                return None
+            continue
+        t0, t1 = sorted(((a - s) / d, (b - s) / d))
+        enter, leave = max(enter, t0), min(leave, t1)
+    return enter if enter < leave else None
+
+
+def check_query(rng, grid, count):
+    mins, maxs = random_boxes(rng, count)
+    query_mins, query_maxs = random_boxes(rng, int(rng.integers(1, 2 * count + 2)))
+    grid.rebuild(mins, maxs)
+    problems = []
+    # twice: the first call may build the grid, the second then uses it
+    for _ in range(2):
+        q, items = grid.query(query_mins, query_maxs)
+        if list(zip(q.tolist(), items.tolist())) != brute_overlaps(query_mins, query_maxs, mins, maxs):
+            problems.append(f"query: {count} items x {len(query_mins)} boxes differ from brute force")
+
+    # drop some items: the rest renumber like EntityStore.remove
+    dead = rng.random(count) < 0.3
+    grid.remove(dead)
+    q, items = grid.query(query_mins, query_maxs)
+    if list(zip(q.tolist(), items.tolist())) != brute_overlaps(query_mins, query_maxs, mins[~dead], maxs[~dead]):
+        problems.append(f"query after remove: {count} items differ from brute force")
+    return problems
+
+
+def check_sweeps(rng, grid, count):
+    mins, maxs = random_boxes(rng, count)
+    start, delta = random_paths(rng, int(rng.integers(1, MAX_PATHS)))
+    half_size = float(rng.choice(HALF_SIZES))
+    grid.rebuild(mins, maxs)
+    problems = []
+
+    # some paths start on a corner of a (grown) box, so they slide along
+    # its edges or just leave it
+    lo, hi = mins - half_size, maxs + half_size
+    on_corner = rng.random(len(start)) < CORNER_STARTS
+    box = rng.integers(0, count, size=on_corner.sum())
+    start[on_corner] = np.where(rng.random((len(box), 2)) < 0.5, lo[box], hi[box])
+
+    # sweep_times, every path against every grown box
+    q_all = np.repeat(np.arange(len(start)), count)
+    i_all = np.tile(np.arange(count), len(start))
+    times = sweep_times(start[q_all], delta[q_all], lo[i_all], hi[i_all])
+    expected = []
+    for q, i, t in zip(q_all.tolist(), i_all.tolist(), times.tolist()):
+        exact = exact_entry(start[q], delta[q], lo[i], hi[i])
+        if t != (np.inf if exact is None else exact):
+            problems.append(f"sweep_times: path {q} box {i} gave {t}, exact {exact}")
+        if exact is not None:
+            expected.append((q, i, exact))
+
+    # query_swept: the same hits, sorted by path then entry time (ties in
+    # any order)
+    q, items, t = grid.query_swept(start, start + delta, half_size)
+    got = sorted(zip(q.tolist(), t.tolist(), items.tolist()))
+    if got != sorted((q, float(t), i) for q, i, t in expected):
+        problems.append(f"query_swept: {len(got)} hits, brute force {len(expected)} (half size {half_size})")
+    if list(zip(q.tolist(), t.tolist())) != [(q, t) for q, t, _ in got]:
+        problems.append("query_swept: not sorted by path then entry time")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare SpatialHash with brute force on random boxes")
+    parser.add_argument("--rounds", type=int, default=50, help="random scenes per item count")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    grid = SpatialHash(CELL_SIZE)
+    checked = 0
+    for count in SIZES:
+        for _ in range(args.rounds):
+            problems = check_query(rng, grid, count) + check_sweeps(rng, grid, count)
+            checked += 1
+            if problems:
+                for problem in problems:
+                    print(f"⚠️ {problem}")
+                print(f"⚠️ Seed {args.seed}: scene {checked} does not match brute force")
+                return 1
+    print(f"✅ SpatialHash query, query_swept and sweep_times match brute force in {checked} random scenes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
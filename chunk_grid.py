@@ -0,0 +1,68 @@
+# chunk_grid.py
+import pygame
+from config import CHUNK_SIZE
+
+# ---------------------------------------------------------
+# Chunked static content with viewport culling
+# ---------------------------------------------------------
+# The world is cut into CHUNK_SIZE squares. Static sprites are
+# baked into one surface per chunk they touch, and drawing only
+# visits the chunks that overlap the screen - so frame cost stays
+# flat no matter how big the map is.
+# ---------------------------------------------------------
+def visible_chunks(screen, offset, chunk_width, chunk_height):
+    """Range of chunk keys visible on `screen` when world (0, 0) is drawn at
+    `offset`. Returns (first_x, first_y, end_x, end_y), ends exclusive."""
+    clip = screen.get_clip()
+    first_x = (clip.left - offset[0]) // chunk_width
+    first_y = (clip.top - offset[1]) // chunk_height
+    end_x = (clip.right - 1 - offset[0]) // chunk_width + 1
+    end_y = (clip.bottom - 1 - offset[1]) // chunk_height + 1
+    return int(first_x), int(first_y), int(end_x), int(end_y)
+
+
+class ChunkGrid:
+    def __init__(self, chunk_size=CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.chunks = {}  # (cx, cy) -> (surface, world topleft)
+        self.drawn = 0    # chunks blitted by the last draw()
+
+    def bake(self, items):
+        """Composite {"image", "rect"} items (in draw order) into per-chunk surfaces"""
+        size = self.chunk_size
+        canvases = {}
+        for item in items:
+            if item["image"] is None:
+                continue
+            rect = item["rect"]
+            for cy in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                for cx in range(rect.left // size, (rect.right - 1) // size + 1):
+                    canvas = canvases.get((cx, cy))
+                    if canvas is None:
+                        canvas = canvases[(cx, cy)] = pygame.Surface((size, size), pygame.SRCALPHA)
+                    canvas.blit(item["image"], (rect.left - cx * size, rect.top - cy * size))
+
+        self.chunks = {}
+        for (cx, cy), canvas in canvases.items():
+            bounds = canvas.get_bounding_rect()
+            if bounds.width == 0 or bounds.height == 0:
+                continue
+            surface = canvas.subsurface(bounds).copy()
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha()
+            # RLE lets SDL skip the fully transparent runs instead of blending them
+            surface.set_alpha(255, pygame.RLEACCEL)
+            self.chunks[(cx, cy)] = (surface, (cx * size + bounds.left, cy * size + bounds.top))
+
+    def draw(self, screen, offset=(0, 0)):
+        """Blit the chunks overlapping the screen; world (0, 0) lands at `offset`"""
+        first_x, first_y, end_x, end_y = visible_chunks(screen, offset, self.chunk_size, self.chunk_size)
+        blits = []
+        for cy in range(first_y, end_y):
+            for cx in range(first_x, end_x):
+                chunk = self.chunks.get((cx, cy))
+                if chunk is not None:
+                    surface, (x, y) = chunk
+                    blits.append((surface, (x + offset[0], y + offset[1])))
+        screen.blits(blits, doreturn=False)
+        self.drawn = len(blits)
@@ -11,6 +11,14 @@ WIDTH = 960          # Width of the game window (pixels)
 HEIGHT = 540         # Height of the game window (pixels)
 FPS = 60             # Frames per second (how fast the game updates)
 TITLE = "💀 Death Circuit - Pixel Arena"  # Window title
+DIRTY_RECTS = False  # Only push changed screen regions (pygame.display.update(rects)) - faster on slow displays
+REPLAY_FILE = "replays/last_game.npz"  # Each game's seed + inputs are saved here (None = don't record)
+PROFILE = False      # Time every phase of each frame (F3 toggles the overlay, and turns profiling on)
+PROFILE_OUTPUT = "profile.json"  # Profiler stats are written here at exit (None = don't write)
+TIME_SCALE = 1.0     # Game speed, 0.25x-16x (- / = keys); None = as fast as possible (0 key toggles)
+MAX_CATCH_UP_STEPS = 5  # Simulation steps per drawn frame (x time scale) before the game slows down instead
+SIM_THREAD = False   # Step the simulation on its own thread; the main thread only handles input and draws
+SIM_THREAD_BUFFERS = 3  # Snapshots between the threads: 2 = the simulation waits for each draw, 3 = it never waits
 
 # ----- COLORS (RGB FORMAT) -----
 # RGB = (Red, Green, Blue), each from 0 to 255
@@ -26,19 +34,36 @@ PLAYER_SPEED = 3.0               # Movement speed (pixels per frame)
 PLAYER_SCALE = 2                 # Scaling multiplier for pixel sprite
 PLAYER_FIRE_COOLDOWN = 200       # Minimum time between shots (ms)
 
+# ----- SPRITE ROTATION SETTINGS -----
+ROTATION_STEPS = 360             # Distinct aim angles pre-rendered per rotated sprite (360 = 1°)
+ROTATION_CACHE_SIZE = 360        # Max rotated frames kept per sprite (None = unlimited)
+
 # ----- BULLET SETTINGS -----
 BULLET_SPEED = 9                 # How fast bullets move (pixels per frame)
 BULLET_LIFETIME = 1000           # How long bullets exist before disappearing (ms)
 BULLET_SCALE = 2                 # Scale for bullet sprite (same as player)
+BULLET_POOL_SIZE = 1024          # Bullets preallocated (the pool grows, with a warning, if ever full)
 
 # ----- ENEMY SETTINGS -----
 ENEMY_BASE_SPEED = 1.5           # Base speed of AI enemies
 ENEMY_SCALE = 2                  # Scaling for enemy sprites
 ENEMY_HP = 40                    # Base health (each enemy can have more later)
+SHOW_FULL_HEALTH_BARS = True     # False = only draw bars for damaged enemies
+ENEMY_POOL_SIZE = 512            # Enemies preallocated (the pool grows, with a warning, if ever full)
+ENEMY_PATHFINDING = True         # Enemies path around obstacles (shared flow field) instead of straight at you
+ENEMY_NEIGHBOUR_RADIUS = 32      # Enemies closer than this (pixels) push apart / pull together
+ENEMY_MAX_NEIGHBOURS = 8         # Only the closest this many neighbours count (keeps crowds cheap)
+ENEMY_SEPARATION = 0.25          # Share of the overlap with each neighbour undone per frame (0 = overlap freely)
+ENEMY_COHESION = 0.02            # Share of the way to the neighbours' centre moved per frame (keeps groups together)
 
 # ----- GAMEPLAY SETTINGS -----
 SCORE_PER_KILL = 10              # Points per enemy kill
 TILE_SIZE = 32                   # Base tile size for the arena grid
+CHUNK_SIZE = TILE_SIZE * 16      # World chunk size (pixels) for baking and visibility culling
+
+# ----- ARENA SETTINGS -----
+ARENA_MAP = None                 # Tiled .tmx file to build the arena from (None = built-in arena)
+                                 # e.g. "asset1/TILED_files/Map.tmx"
 
 # ----------------------------------------------------------
 # Why we keep this file:
@@ -1,135 +1,539 @@
 # enemy.py
+import copy, math
 import pygame
-import random
-import math
-from config import ENEMY_BASE_SPEED, ENEMY_SCALE, ENEMY_HP, WIDTH, HEIGHT
+import numpy as np
+from config import (ENEMY_BASE_SPEED, ENEMY_SCALE, ENEMY_HP, ENEMY_POOL_SIZE, SHOW_FULL_HEALTH_BARS,
+                    ENEMY_NEIGHBOUR_RADIUS, ENEMY_MAX_NEIGHBOURS, ENEMY_SEPARATION, ENEMY_COHESION,
+                    WIDTH, HEIGHT)
+from assets import get_scaled
+from entity_store import EntityStore
+from spatial_hash import SpatialHash
+from flow_field import STEP_DIRECTIONS
+from camera import on_screen
+from render_queue import RenderQueue, LAYER_ENEMIES, LAYER_HEALTH_BARS
+
+ANIMATION_SPEED = 0.25  # Animation frames advanced per 60fps frame
+BULLET_DAMAGE = 20      # Damage dealt by one bullet
+FLOW_DIRECT_STEPS = 2   # Within this many flow field cells of the player, steer straight at it
+CROWD_ALL_PAIRS = 24    # Up to this many enemies, crowd neighbours come from every pair (no grid)
+SMALL_CROWD = 16        # Up to this many enemies, update() runs in plain Python
+STEP_LIST = STEP_DIRECTIONS.tolist()
+HEALTH_BAR_SIZE = (30, 4)
+HEALTH_BAR_RED = (255, 0, 0)
+HEALTH_BAR_GREEN = (0, 255, 0)
+
+
+def lengths(vectors):
+    """Lengths of (..., 2) vectors, rounded exactly like
+    math.sqrt(x * x + y * y) (np.hypot can differ in the last bit), so the
+    plain Python and NumPy paths agree"""
+    x, y = vectors[..., 0], vectors[..., 1]
+    return np.sqrt(x * x + y * y)
+
 
 class Enemy(pygame.sprite.Sprite):
-    def __init__(self, x, y, sprite_images):
+    """Read-only sprite view of one enemy stored in an EnemyManager.
+
+    The manager keeps enemies as NumPy arrays; these views exist for code that
+    wants classic sprites (rendering, debugging). Changing a view does not
+    change the enemy. Views are pooled by the manager and refreshed in place.
+    """
+
+    def __init__(self, image, center, health, max_health):
         super().__init__()
-        self.sprite_images = [pygame.transform.scale_by(img, ENEMY_SCALE) for img in sprite_images]
-        self.image = self.sprite_images[0]
-        self.rect = self.image.get_rect(center=(x, y))
-        
-        # Health and stats
-        self.health = ENEMY_HP
-        self.max_health = ENEMY_HP
-        self.speed = ENEMY_BASE_SPEED
-        
-        # Animation
-        self.animation_count = 0
-        self.animation_speed = 0.25  # Animation speed
-        
-        # AI behavior
-        self.reset_offset = 0
-        self.offset_x = random.randrange(-100, 100)
-        self.offset_y = random.randrange(-100, 100)
-    
-    def update(self, dt, player_pos):
-        # Update animation
-        self.animation_count += self.animation_speed * dt
-        if self.animation_count >= len(self.sprite_images):
-            self.animation_count = 0
-        self.image = self.sprite_images[int(self.animation_count)]
-        
-        # AI movement with randomized offset
-        if self.reset_offset == 0:
-            self.offset_x = random.randrange(-100, 100)
-            self.offset_y = random.randrange(-100, 100)
-            self.reset_offset = random.randrange(120, 180)
-        else:
-            self.reset_offset -= 1
-        
-        # Move toward player with offset using vector math
-        target_x = player_pos[0] + self.offset_x
-        target_y = player_pos[1] + self.offset_y
-        
-        dx = target_x - self.rect.centerx
-        dy = target_y - self.rect.centery
-        dist = math.sqrt(dx * dx + dy * dy)
-        
-        if dist > 5:
-            dx /= dist
-            dy /= dist
-            self.rect.x += dx * self.speed * dt
-            self.rect.y += dy * self.speed * dt
-    
-    def take_damage(self, damage):
-        self.health -= damage
-        if self.health <= 0:
-            self.kill()
-            return True  # Enemy died
-        return False
-    
-    def draw_health_bar(self, surface, camera_offset=(0, 0)):
-        # Draw health bar above enemy
-        bar_width = 30
-        bar_height = 4
-        bar_x = self.rect.centerx - bar_width // 2 + camera_offset[0]
-        bar_y = self.rect.top - 8 + camera_offset[1]
-        
-        # Background (red)
-        pygame.draw.rect(surface, (255, 0, 0), (bar_x, bar_y, bar_width, bar_height))
-        # Foreground (green)
-        health_width = (self.health / self.max_health) * bar_width
-        pygame.draw.rect(surface, (0, 255, 0), (bar_x, bar_y, health_width, bar_height))
+        self.image = image
+        self.rect = self.image.get_rect(center=center)
+        self.health = health
+        self.max_health = max_health
+
+    def refresh(self, image, center, health, max_health):
+        self.image = image
+        self.rect.size = image.get_size()
+        self.rect.center = center
+        self.health = health
+        self.max_health = max_health
+
+
+_health_bars = []
+
+
+def get_health_bars():
+    """Pre-drawn health bar for every whole-pixel green width (index = width)"""
+    if not _health_bars:
+        bar_w, bar_h = HEALTH_BAR_SIZE
+        for green_w in range(bar_w + 1):
+            bar = pygame.Surface(HEALTH_BAR_SIZE)
+            bar.fill(HEALTH_BAR_RED)
+            bar.fill(HEALTH_BAR_GREEN, (0, 0, green_w, bar_h))
+            _health_bars.append(bar)
+    return _health_bars
 
 
 class EnemyManager:
-    def __init__(self, sprite_images):
-        self.enemies = pygame.sprite.Group()
-        self.sprite_images = sprite_images
+    """All enemies as a structure of NumPy arrays, updated in batches"""
+
+    def __init__(self, sprite_images, seed=None):
+        # scaled animation frames are shared by every enemy (and every manager)
+        self.sprite_images = [get_scaled(img, ENEMY_SCALE) for img in sprite_images]
+        self.half_size = np.array(self.sprite_images[0].get_size(), dtype=float) / 2
+        self.store = EntityStore({
+            "pos": ((2,), float),          # centre position
+            "prev": ((2,), float),         # centre before the last update (for interpolation)
+            "offset": ((2,), float),       # random offset around the player we aim for
+            "reset_offset": ((), int),     # frames until a new offset is picked
+            "health": ((), int),
+            "max_health": ((), int),
+            "speed": ((), float),
+            "animation_count": ((), float),
+        }, capacity=ENEMY_POOL_SIZE, name="enemy")
+        self.views = []  # Enemy views reused by the enemies property
+        self.rng = np.random.default_rng(seed)
+        # broadphase grid of enemy boxes, rebuilt lazily after enemies move
+        self.grid = SpatialHash()
+        self.grid_dirty = True
+        # crowd steering (see steer_crowd)
+        self.neighbour_radius = ENEMY_NEIGHBOUR_RADIUS
+        self.max_neighbours = ENEMY_MAX_NEIGHBOURS
+        self.separation = ENEMY_SEPARATION
+        self.cohesion = ENEMY_COHESION
         self.spawn_timer = 0
         self.difficulty_multiplier = 1.0
-    
-    def update(self, dt, player_pos):
-        # Update all enemies
-        for enemy in self.enemies:
-            enemy.update(dt, player_pos)
-    
+
+    def update(self, dt, player_pos, flow_field=None):
+        """Animate and move every enemy. With a FlowField (pointed at the
+        player) enemies further than FLOW_DIRECT_STEPS cells follow it around
+        obstacles; the rest head straight for the player plus their offset."""
+        n = len(self.store)
+        if n == 0:
+            return
+        if n <= SMALL_CROWD:
+            # a few enemies: the same steps one enemy at a time, which costs
+            # less than the NumPy calls below
+            self._update_few(dt, player_pos, flow_field)
+            self.grid_dirty = True
+            return
+        store = self.store
+        store.prev[:n] = store.pos[:n]
+
+        # Update animation
+        anim = store.animation_count[:n]
+        anim += ANIMATION_SPEED * dt
+        anim[anim >= len(self.sprite_images)] = 0
+
+        # AI movement with randomized offset (the countdown of enemies picking
+        # a new offset is overwritten, so everyone can count down first)
+        reset = store.reset_offset[:n]
+        due = reset == 0
+        reset -= 1
+        if due.any():
+            picks = int(np.count_nonzero(due))
+            store.offset[:n][due] = self.rng.integers(-100, 100, size=(picks, 2))
+            reset[due] = self.rng.integers(120, 180, size=picks)
+
+        # Move toward player with offset using vector math. Whole-array
+        # where() instead of boolean indexing: fewer NumPy calls and copies.
+        pos = store.pos[:n]
+        delta = np.asarray(player_pos, dtype=float) + store.offset[:n] - pos
+        dist = lengths(delta)
+        moving = dist > 5
+        travel = store.speed[:n] * dt
+        # enemies closer than 5px stay put (step 0)
+        step = np.where(moving, travel / np.where(moving, dist, 1.0), 0.0)
+        move = delta * step[:, None]
+        if flow_field is not None:
+            # the field has no direction within FLOW_DIRECT_STEPS of the
+            # player (see FlowField direct_steps), so one lookup decides
+            direction = flow_field.direction_at(pos)
+            routed = direction.any(axis=1)
+            move = np.where(routed[:, None], direction * travel[:, None], move)
+        pos += move
+        self.steer_crowd(dt)
+        self.grid_dirty = True
+
+    def _update_few(self, dt, player_pos, flow_field):
+        """update() in plain Python, with the same arithmetic and random
+        draws as the array code"""
+        store = self.store
+        n = len(store)
+        points = store.pos[:n].tolist()
+        store.prev[:n] = store.pos[:n]
+
+        frames = len(self.sprite_images)
+        anim = [count + ANIMATION_SPEED * dt for count in store.animation_count[:n].tolist()]
+        store.animation_count[:n] = [0.0 if count >= frames else count for count in anim]
+
+        due = [i for i, countdown in enumerate(store.reset_offset[:n].tolist()) if countdown == 0]
+        store.reset_offset[:n] -= 1
+        if due:
+            store.offset[due] = self.rng.integers(-100, 100, size=(len(due), 2))
+            store.reset_offset[due] = self.rng.integers(120, 180, size=len(due))
+
+        px, py = player_pos
+        offsets = store.offset[:n].tolist()
+        speeds = store.speed[:n].tolist()
+        steps = flow_field.step_indices(points) if flow_field is not None else [-1] * n
+        for point, (ox, oy), speed, k in zip(points, offsets, speeds, steps):
+            travel = speed * dt
+            x, y = point
+            if k >= 0:
+                sx, sy = STEP_LIST[k]
+                point[0], point[1] = x + sx * travel, y + sy * travel
+                continue
+            dx, dy = px + ox - x, py + oy - y
+            dist = math.sqrt(dx * dx + dy * dy)
+            if dist > 5:
+                step = travel / dist
+                point[0], point[1] = x + dx * step, y + dy * step
+
+        self._steer_few(points, dt)
+        store.pos[:n] = points
+
+    def steer_crowd(self, dt):
+        """Separation / cohesion between nearby enemies, all in one batch.
+
+        Each enemy only counts its max_neighbours closest within the radius.
+        Small crowds (up to CROWD_ALL_PAIRS) test every pair, the smallest of
+        them in plain Python (see _steer_few); bigger ones look them up in
+        cells one radius wide (see _crowd_neighbours), so the cost grows with
+        the enemy count however tightly they are packed."""
+        n = len(self.store)
+        if n < 2 or not (self.separation or self.cohesion):
+            return
+        pos = self.store.pos[:n]
+        if n <= SMALL_CROWD:
+            points = pos.tolist()
+            self._steer_few(points, dt)
+            pos[:] = points
+            return
+        radius = self.neighbour_radius
+        if n <= CROWD_ALL_PAIRS:
+            delta = pos[:, None] - pos[None, :]
+            dist = lengths(delta)
+            near = dist < radius
+            np.fill_diagonal(near, False)
+            if not near.any():
+                return  # nobody close to anybody - the usual case in small waves
+            me, other = np.nonzero(near)
+            delta, dist = delta[me, other], dist[me, other]
+            # keep each enemy's closest max_neighbours (ties by index)
+            order = np.lexsort((dist, me))
+            me, other, delta, dist = me[order], other[order], delta[order], dist[order]
+            counts = np.bincount(me, minlength=n)
+            rank = np.arange(len(me)) - np.repeat(np.cumsum(counts) - counts, counts)
+            keep = rank < self.max_neighbours
+            me, other, delta, dist = me[keep], other[keep], delta[keep], dist[keep]
+        else:
+            me, other, delta, dist = self._crowd_neighbours(pos, radius)
+            if len(me) == 0:
+                return
+        counts = np.bincount(me, minlength=n)
+
+        # separation: push apart by `separation` of how far each pair is
+        # inside the radius (enemies on the exact same spot split by index)
+        same_spot = dist == 0
+        away = delta / np.where(same_spot, 1, dist)[:, None]
+        away[same_spot, 0] = np.where(me[same_spot] < other[same_spot], -1.0, 1.0)
+        overlap = radius - dist
+        nudge = np.zeros((n, 2))
+        for axis in range(2):
+            push = np.bincount(me, away[:, axis] * overlap, minlength=n)
+            # cohesion: move `cohesion` of the way to the neighbours' mean position
+            centre = np.bincount(me, pos[other, axis], minlength=n) / np.maximum(counts, 1)
+            pull = np.where(counts > 0, centre - pos[:, axis], 0)
+            nudge[:, axis] = (self.separation * push + self.cohesion * pull) * dt
+
+        # never more than half a radius per frame, so crowds don't jitter
+        length = lengths(nudge)
+        pos += nudge * (np.minimum(length, radius / 2) / np.maximum(length, 1e-9))[:, None]
+
+    def _steer_few(self, points, dt):
+        """steer_crowd() for a list of [x, y] (changed in place), in plain
+        Python: every pair, with the same arithmetic as the array code"""
+        if not (self.separation or self.cohesion):
+            return
+        radius = self.neighbour_radius
+        n = len(points)
+        near = [[] for _ in range(n)]
+        for i in range(n - 1):
+            xi, yi = points[i]
+            for j in range(i + 1, n):
+                xj, yj = points[j]
+                dx = xi - xj
+                if -radius < dx < radius:
+                    dy = yi - yj
+                    dist = math.sqrt(dx * dx + dy * dy)
+                    if dist < radius:
+                        near[i].append((dist, j, dx, dy))
+                        near[j].append((dist, i, -dx, -dy))
+
+        nudges = []
+        for i, pairs in enumerate(near):
+            if not pairs:
+                continue
+            pairs.sort()
+            del pairs[self.max_neighbours:]
+            push_x = push_y = centre_x = centre_y = 0.0
+            for dist, j, dx, dy in pairs:
+                overlap = radius - dist
+                if dist == 0:
+                    # enemies on the exact same spot split by index
+                    push_x += (-1.0 if i < j else 1.0) * overlap
+                    push_y += dy * overlap
+                else:
+                    push_x += dx / dist * overlap
+                    push_y += dy / dist * overlap
+                centre_x += points[j][0]
+                centre_y += points[j][1]
+            x, y = points[i]
+            count = len(pairs)
+            nudge_x = (self.separation * push_x + self.cohesion * (centre_x / count - x)) * dt
+            nudge_y = (self.separation * push_y + self.cohesion * (centre_y / count - y)) * dt
+            length = math.sqrt(nudge_x * nudge_x + nudge_y * nudge_y)
+            scale = min(length, radius / 2) / max(length, 1e-9)
+            nudges.append((i, nudge_x * scale, nudge_y * scale))
+        for i, nudge_x, nudge_y in nudges:
+            points[i][0] += nudge_x
+            points[i][1] += nudge_y
+
+    def _crowd_neighbours(self, pos, radius):
+        """(me, other, delta, dist) of every enemy's max_neighbours closest
+        within `radius`, for crowds too big to test every pair.
+
+        Enemies are bucketed into cells one radius wide, so neighbours are in
+        the 3 x 3 cells around, and sorted by cell, then x: each row of three
+        cells is one run of enemies in x order. From each of its three rows an
+        enemy takes the 3 * max_neighbours nearest it in that order, so it
+        never looks at more than 9 * max_neighbours candidates however crowded
+        the cells are. That is exact until a cell holds more than
+        max_neighbours enemies, and a cell that full is all neighbours about
+        as close as each other."""
+        n, k = len(pos), self.max_neighbours
+        cell = np.floor_divide(pos, radius)
+        # dense cell numbers with a free border, so every neighbour cell exists
+        corner = cell.min(axis=0) - 1
+        width = int(cell[:, 0].max() - corner[0]) + 2
+        cells = int(cell[:, 1].max() - corner[1] + 2) * width
+        key = ((cell[:, 1] - corner[1]) * width + cell[:, 0] - corner[0]).astype(np.int64)
+        # position across the cell (0 to <1) after the cell number: one sort
+        # orders by cell, then x
+        sort_key = key + np.clip(pos[:, 0] / radius - cell[:, 0], 0, 0.999)
+        order = np.argsort(sort_key, kind="stable")
+        counts = np.bincount(key, minlength=cells)
+        ends = np.cumsum(counts)
+
+        # the run of each row of three cells, and where each enemy's x falls in it
+        rows = key[:, None] + np.array([-width, 0, width])
+        row_start, row_end = ends[rows - 1] - counts[rows - 1], ends[rows + 1]
+        at = np.searchsorted(sort_key[order], sort_key[:, None] + np.array([-width, 0, width]))
+        window = min(3 * k, int((row_end - row_start).max()))
+        first = np.clip(at - window // 2, row_start, np.maximum(row_start, row_end - window))
+        slot = first[:, :, None] + np.arange(window)
+        valid = (slot < row_end[:, :, None]).reshape(n, -1)
+        other = order[np.where(valid, slot.reshape(n, -1), 0)]
+
+        # the k closest candidates inside the radius (not itself)
+        me = np.arange(n)
+        dx = pos[:, 0, None] - pos[other, 0]
+        dy = pos[:, 1, None] - pos[other, 1]
+        dist2 = dx * dx + dy * dy
+        dist2[~valid | (other == me[:, None]) | (dist2 >= radius * radius)] = np.inf
+        if k < dist2.shape[1]:
+            closest = np.argpartition(dist2, k - 1, axis=1)[:, :k]
+            other = np.take_along_axis(other, closest, 1)
+            dist2 = np.take_along_axis(dist2, closest, 1)
+        keep = np.isfinite(dist2)
+        me, other = np.broadcast_to(me[:, None], keep.shape)[keep], other[keep]
+        return me, other, pos[me] - pos[other], np.sqrt(dist2[keep])
+
     def spawn_enemy_at(self, x, y):
         """Spawn enemy at specific position"""
-        enemy = Enemy(x, y, self.sprite_images)
-        enemy.speed *= self.difficulty_multiplier
-        enemy.max_health = int(ENEMY_HP * self.difficulty_multiplier)
-        enemy.health = enemy.max_health
-        self.enemies.add(enemy)
-    
+        max_health = int(ENEMY_HP * self.difficulty_multiplier)
+        self.store.add(
+            pos=(x, y),
+            prev=(x, y),
+            health=max_health,
+            max_health=max_health,
+            speed=ENEMY_BASE_SPEED * self.difficulty_multiplier,
+        )
+        self.grid_dirty = True
+
     def increase_difficulty(self):
         """Make enemies harder each wave"""
         self.difficulty_multiplier += 0.15
-    
-    def draw(self, surface, camera_offset=(0, 0)):
-        # Draw all enemies with camera shake
-        for enemy in self.enemies:
-            enemy_rect = enemy.rect.move(camera_offset)
-            surface.blit(enemy.image, enemy_rect)
-            enemy.draw_health_bar(surface, camera_offset)
-    
-    def check_bullet_collisions(self, bullets):
-        """Check collisions between bullets and enemies"""
+
+    def get_bounds(self):
+        """Return (mins, maxs) arrays of every enemy's bounding box"""
+        pos = self.store.pos[:len(self.store)]
+        return pos - self.half_size, pos + self.half_size
+
+    def get_grid(self):
+        """Spatial hash of the current enemy boxes (item i is enemy i)"""
+        if self.grid_dirty:
+            self.grid.rebuild(*self.get_bounds())
+            self.grid_dirty = False
+        return self.grid
+
+    def get_topleft(self, alpha=1.0):
+        """Integer screen positions of every enemy sprite (like rect.topleft),
+        `alpha` of the way from the previous update's positions to the current"""
+        n = len(self.store)
+        pos = self.store.pos[:n]
+        if alpha != 1.0:
+            prev = self.store.prev[:n]
+            pos = prev + (pos - prev) * alpha
+        return (pos - self.half_size).astype(int)
+
+    def get_frames(self):
+        """Current animation frame index of every enemy"""
+        return self.store.animation_count[:len(self.store)].astype(int)
+
+    @property
+    def enemies(self):
+        """Sprite views of the current enemies (a snapshot; the view objects
+        are pooled, so the next access updates them in place)"""
+        n = len(self.store)
+        centers = self.store.pos[:n].astype(int).tolist()
+        frames = self.get_frames().tolist()
+        health = self.store.health[:n].tolist()
+        max_health = self.store.max_health[:n].tolist()
+        views = self.views
+        while len(views) < n:
+            views.append(Enemy(self.sprite_images[0], (0, 0), 0, 1))
+        for i in range(n):
+            views[i].refresh(self.sprite_images[frames[i]], centers[i], health[i], max_health[i])
+        return pygame.sprite.Group(views[:n])
+
+    def draw(self, surface, camera_offset=(0, 0), show_full_health=SHOW_FULL_HEALTH_BARS, queue=None, alpha=1.0):
+        """Draw on-screen enemies with camera offset (viewport + shake), with
+        all their health bars on a layer above.
+        Blits go into `queue` when one is given (the caller flushes it and gets
+        the touched rects); otherwise they are drawn now and the rects returned.
+        `alpha` interpolates between the last two updates (see get_topleft)."""
+        own_queue = queue is None
+        if own_queue:
+            queue = RenderQueue()
+        n = len(self.store)
+        topleft = self.get_topleft(alpha) + camera_offset
+        visible = np.flatnonzero(on_screen(surface, topleft, self.half_size * 2, margin=8))
+        topleft = topleft[visible]
+        frames = self.get_frames()[visible].tolist()
+        health = self.store.health[:n][visible] / self.store.max_health[:n][visible]
+
+        images = self.sprite_images
+        queue.extend(zip([images[f] for f in frames], topleft.tolist()), LAYER_ENEMIES)
+
+        # Health bar above enemy
+        bar_pos = topleft + (int(self.half_size[0]) - HEALTH_BAR_SIZE[0] // 2, -8)
+        if not show_full_health:
+            damaged = health < 1
+            bar_pos, health = bar_pos[damaged], health[damaged]
+        queue.extend(self.health_bar_blits(bar_pos, health), LAYER_HEALTH_BARS)
+        return queue.flush(surface) if own_queue else []
+
+    def health_bar_blits(self, bar_pos, health):
+        """(surface, position) blits for health bars (red background, green for
+        the health fraction) at integer top-left positions"""
+        # draw.rect truncated the green width to whole pixels, so there are
+        # only bar_width + 1 distinct bars
+        green_w = (health * HEALTH_BAR_SIZE[0]).astype(int).tolist()
+        bars = get_health_bars()
+        return zip([bars[g] for g in green_w], bar_pos.tolist())
+
+    def check_bullet_collisions(self, bullets, obstacles=None):
+        """Check collisions between bullets and enemies (and obstacles).
+
+        Each bullet is swept along its whole move this frame, so fast bullets
+        or long frames cannot tunnel through anything. A bullet stops at the
+        first thing on its path: an obstacle from the `obstacles` SpatialHash
+        just absorbs it, otherwise it damages the live enemies it reaches
+        first. Bullets resolve in firing order, so an enemy killed by an
+        earlier bullet this frame no longer stops later ones.
+        """
+        if len(bullets) == 0:
+            return 0
+        # when each bullet hits its first obstacle (inf = never)
+        blocked = np.full(len(bullets), np.inf)
+        if obstacles is not None and len(obstacles):
+            hit_bullets, _, times = bullets.sweep(obstacles)
+            # reversed, so each bullet's earliest hit is written last
+            blocked[hit_bullets[::-1]] = times[::-1]
+        dead_bullets = blocked < np.inf
+        if len(self.store) == 0:
+            bullets.remove(dead_bullets)
+            return 0
+
+        hit_bullets, hit_enemies, times = bullets.sweep(self.get_grid())
+        health = self.store.health[:len(self.store)]
+        dead = np.zeros(len(self.store), dtype=bool)
         kills = 0
-        for bullet in bullets:
-            hit_enemies = pygame.sprite.spritecollide(bullet, self.enemies, False)
-            if hit_enemies:
-                bullet.kill()
-                for enemy in hit_enemies:
-                    if enemy.take_damage(20):  # 20 damage per bullet
-                        kills += 1
-                break
+        for bullet, enemy, t in zip(hit_bullets.tolist(), hit_enemies.tolist(), times.tolist()):
+            # behind an obstacle, an enemy already down, or past where the
+            # bullet stopped
+            if t >= blocked[bullet] or dead[enemy]:
+                continue
+            blocked[bullet] = np.nextafter(t, np.inf)  # same-time hits still land
+            dead_bullets[bullet] = True
+            health[enemy] -= BULLET_DAMAGE
+            if health[enemy] <= 0:
+                dead[enemy] = True
+                kills += 1
+
+        bullets.remove(dead_bullets)
+        if kills:
+            self.remove(dead)
         return kills
-    
+
+    def damage(self, mask, amount):
+        """Damage the enemies selected by a boolean mask; returns how many died"""
+        health = self.store.health[:len(self.store)]
+        health[mask] -= amount
+        dead = health <= 0
+        kills = int(dead.sum())
+        if kills:
+            self.remove(dead)
+        return kills
+
+    def remove(self, dead):
+        """Remove enemies selected by a boolean mask, keeping the grid in sync"""
+        if not self.grid_dirty:
+            self.grid.remove(dead)
+        self.store.remove(dead)
+
     def check_player_collision(self, player_rect):
         """Check if any enemy is touching the player"""
-        for enemy in self.enemies:
-            if player_rect.colliderect(enemy.rect):
-                return True
-        return False
-    
+        n = len(self.store)
+        if n == 0:
+            return False
+        # one box against every enemy: a direct test (the grid would brute
+        # force a single query anyway, after rebuilding itself for nothing)
+        left, top, right, bottom = player_rect.left, player_rect.top, player_rect.right, player_rect.bottom
+        if n <= SMALL_CROWD:
+            half_w, half_h = self.half_size.tolist()
+            return any(x - half_w < right and left < x + half_w and y - half_h < bottom and top < y + half_h
+                       for x, y in self.store.pos[:n].tolist())
+        mins, maxs = self.get_bounds()
+        return bool(((mins[:, 0] < right) & (left < maxs[:, 0]) &
+                     (mins[:, 1] < bottom) & (top < maxs[:, 1])).any())
+
     def get_count(self):
-        return len(self.enemies)
-    
-    def reset(self):
-        self.enemies.empty()
+        return len(self.store)
+
+    def snapshot(self):
+        """Read-only copy for drawing (see EntityStore.snapshot); it has no
+        grid or RNG, so it cannot be updated"""
+        frozen = copy.copy(self)
+        frozen.store = self.store.snapshot()
+        frozen.views = []
+        frozen.grid = frozen.rng = None
+        return frozen
+
+    def reset(self, seed=None):
+        """Remove every enemy. `seed` (an int or a shared numpy Generator)
+        replaces the RNG used for wandering offsets."""
+        self.store.clear()
+        self.grid.clear()
+        self.grid_dirty = True
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
         self.spawn_timer = 0
         self.difficulty_multiplier = 1.0
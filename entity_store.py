@@ -0,0 +1,109 @@
+# entity_store.py
+import numpy as np
+
+# ---------------------------------------------------------
+# EntityStore: structure-of-arrays storage for entities
+# ---------------------------------------------------------
+# Instead of one Python object per enemy/bullet, every field
+# (position, velocity, health, ...) is one NumPy array. Live
+# entities are packed at the front, so `store.pos[:len(store)]`
+# is every position and whole-wave updates are single array ops.
+# Removal compacts the arrays but keeps spawn order, so results
+# don't depend on which entities died first.
+# The arrays double as an object pool: nothing is allocated per
+# spawn or freed per death, so there is no garbage to collect.
+# The price is a fixed cost per NumPy call (microseconds), paid
+# however few entities are alive: with a handful, a step costs
+# more than plain Python objects did. Per-tick code therefore
+# avoids boolean indexing and throwaway temporaries where a
+# whole-array op does the same job; benchmark.py's early_waves
+# scenario keeps an eye on the small-game cost.
+# ---------------------------------------------------------
+class EntityStore:
+    def __init__(self, fields, capacity=64, name=None):
+        """fields maps name -> (per-entity shape, dtype), e.g. {"pos": ((2,), float)}.
+
+        The arrays are a fixed-size pool: add() acquires the next free slot
+        and remove()/clear() release slots, without allocating anything.
+        Size `capacity` for the worst case - a store that runs out grows
+        (one reallocation of every array) and says so once."""
+        self.fields = fields
+        self.name = name or "entity"
+        self.capacity = capacity
+        self.count = 0
+        # pool stats (kept across clear(), so they cover a whole session)
+        self.high_water = 0  # most entities alive at once
+        self.grows = 0       # times the pool ran out and was reallocated
+        self.acquired = 0
+        self.released = 0
+        for name, (shape, dtype) in fields.items():
+            setattr(self, name, np.zeros((capacity,) + shape, dtype=dtype))
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self, needed):
+        # double capacity so appends stay amortised O(1)
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        for name, (shape, dtype) in self.fields.items():
+            grown = np.zeros((capacity,) + shape, dtype=dtype)
+            grown[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, grown)
+        if self.grows == 0:
+            print(f"⚠️ {self.name} pool full at {self.capacity}, growing to {capacity}")
+        self.grows += 1
+        self.capacity = capacity
+
+    def add(self, **values):
+        """Acquire a slot for one entity and return its index. Unlisted fields start at zero."""
+        if self.count == self.capacity:
+            self._grow(self.count + 1)
+        index = self.count
+        for name in self.fields:
+            getattr(self, name)[index] = values.get(name, 0)
+        self.count += 1
+        self.acquired += 1
+        if self.count > self.high_water:
+            self.high_water = self.count
+        return index
+
+    def remove(self, dead):
+        """Release every entity where the boolean mask `dead` (length len(self)) is True"""
+        if not dead.any():
+            return
+        keep = ~dead
+        alive = int(keep.sum())
+        for name in self.fields:
+            array = getattr(self, name)
+            array[:alive] = array[:self.count][keep]
+        self.released += self.count - alive
+        self.count = alive
+
+    def clear(self):
+        self.released += self.count
+        self.count = 0
+
+    def snapshot(self):
+        """Read-only copy of the live entities (exactly len(self) of them), safe
+        to read on another thread while this store keeps changing"""
+        copy = object.__new__(EntityStore)
+        copy.__dict__.update(self.__dict__)
+        copy.capacity = self.count
+        for name in self.fields:
+            array = getattr(self, name)[:self.count].copy()
+            array.flags.writeable = False
+            setattr(copy, name, array)
+        return copy
+
+    def stats(self):
+        """Pool usage: capacity, live count, high-water mark, grows, slots acquired/released"""
+        return {
+            "capacity": self.capacity,
+            "live": self.count,
+            "high_water": self.high_water,
+            "grows": self.grows,
+            "acquired": self.acquired,
+            "released": self.released,
+        }
@@ -0,0 +1,240 @@
+# env.py
+# ----------------------------------------------------------
+# Agent interface: a Gymnasium-style environment around
+# GameSimulation, plus VecEnv, which steps many games in
+# lockstep and returns their observations as one NumPy batch.
+#
+# gymnasium is optional - without it ShooterEnv still works
+# (same reset/step API), it just has no observation_space /
+# action_space objects.
+# ----------------------------------------------------------
+import math
+import numpy as np
+from config import WIDTH, HEIGHT, ARENA_MAP, BULLET_SPEED, SCORE_PER_KILL
+from assets import load_game_sprites
+from simulation import GameSimulation, Action
+from observation_renderer import ObservationRenderer
+
+try:
+    import gymnasium as gym
+    from gymnasium import spaces
+except ImportError:
+    gym = None
+    spaces = None
+
+NEAREST_ENEMIES = 8  # enemies in each observation (closest first)
+NEAREST_BULLETS = 8  # bullets in each observation (closest first)
+AIM_DISTANCE = 100   # aim angles become a point this far from the player
+
+# Observation layout (float32)
+PLAYER_FEATURES = 5  # x, y (world fraction), health fraction, can shoot, invincible
+GAME_FEATURES = 3    # wave / 10, wave kills left fraction, wave complete
+ENEMY_FEATURES = 4   # dx, dy (world fraction), health fraction, present
+BULLET_FEATURES = 5  # dx, dy (world fraction), vx, vy (fraction of bullet speed), present
+OBS_SIZE = (PLAYER_FEATURES + GAME_FEATURES
+            + NEAREST_ENEMIES * ENEMY_FEATURES + NEAREST_BULLETS * BULLET_FEATURES)
+
+# Reward: +1 per kill, -DAMAGE_PENALTY per health point lost
+DAMAGE_PENALTY = 0.1
+
+# Episodes are cut off (truncated) after this many steps
+MAX_EPISODE_STEPS = 60 * 60 * 10
+
+
+def _nearest_rows(out, counts, pos, centers, world, k, base, width):
+    """Scatter the k entities nearest to each game's player into `out`.
+    `pos` holds every game's entities back to back (`counts` per game).
+    Returns (game, slot, entity) index arrays of the rows written."""
+    game = np.repeat(np.arange(len(counts)), counts)
+    delta = pos - centers[game]
+    dist = np.einsum("ij,ij->i", delta, delta)
+    order = np.lexsort((dist, game))  # by game, then closest first
+    game = game[order]
+    slot = np.arange(len(order)) - np.repeat(np.cumsum(counts) - counts, counts)
+    keep = slot < k
+    game, slot, entity = game[keep], slot[keep], order[keep]
+    rows = out[:, base:base + k * width].reshape(len(out), k, width)
+    rows[game, slot, 0:2] = delta[entity] / world[game]
+    rows[game, slot, width - 1] = 1  # present
+    return rows, game, slot, entity
+
+
+def observe_batch(sims, out=None):
+    """Observation vectors of many games at once, as a (len(sims), OBS_SIZE)
+    float32 array: entities of every game are ranked in one NumPy pass"""
+    count = len(sims)
+    if out is None:
+        out = np.empty((count, OBS_SIZE), dtype=np.float32)
+    out.fill(0)
+    players = [sim.player for sim in sims]
+    world = np.array([sim.arena.world_size for sim in sims], dtype=float)
+    centers = np.array([player.rect.center for player in players], dtype=float)
+
+    out[:, 0:2] = centers / world
+    out[:, 2:5] = [(p.health / p.max_health, p.can_shoot(), p.invincibility_timer > 0) for p in players]
+    out[:, 5:8] = [(sim.wave / 10,
+                    max(0, sim.enemies_per_wave - sim.enemies_killed_this_wave) / sim.enemies_per_wave,
+                    sim.wave_complete) for sim in sims]
+    base = PLAYER_FEATURES + GAME_FEATURES
+
+    stores = [sim.enemy_manager.store for sim in sims]
+    counts = np.array([len(store) for store in stores])
+    if counts.sum():
+        rows, game, slot, entity = _nearest_rows(
+            out, counts, np.concatenate([store.pos[:n] for store, n in zip(stores, counts)]),
+            centers, world, NEAREST_ENEMIES, base, ENEMY_FEATURES)
+        health = np.concatenate([store.health[:n] / store.max_health[:n] for store, n in zip(stores, counts)])
+        rows[game, slot, 2] = health[entity]
+    base += NEAREST_ENEMIES * ENEMY_FEATURES
+
+    stores = [sim.bullets.store for sim in sims]
+    counts = np.array([len(store) for store in stores])
+    if counts.sum():
+        rows, game, slot, entity = _nearest_rows(
+            out, counts, np.concatenate([store.pos[:n] for store, n in zip(stores, counts)]),
+            centers, world, NEAREST_BULLETS, base, BULLET_FEATURES)
+        vel = np.concatenate([store.vel[:n] for store, n in zip(stores, counts)])
+        rows[game, slot, 2:4] = vel[entity] / BULLET_SPEED
+    return out
+
+
+def observe(sim, out=None):
+    """Observation vector of one game (float32, OBS_SIZE), see observe_batch"""
+    if out is None:
+        out = np.empty(OBS_SIZE, dtype=np.float32)
+    observe_batch([sim], out.reshape(1, OBS_SIZE))
+    return out
+
+
+def to_action(sim, action):
+    """Agent action [move_x, move_y, aim_angle, fire] -> game Action.
+    Moves are clipped to [-1, 1]; aim is an angle in radians; fire when > 0."""
+    move_x, move_y, angle, fire = (float(v) for v in action)
+    cx, cy = sim.player.rect.center
+    aim = (cx + math.cos(angle) * AIM_DISTANCE, cy + math.sin(angle) * AIM_DISTANCE)
+    return Action(min(max(move_x, -1.0), 1.0), min(max(move_y, -1.0), 1.0), aim, fire > 0)
+
+
+class ShooterEnv(gym.Env if gym else object):
+    """One game as an environment.
+
+    action: [move_x, move_y, aim_angle, fire] (see to_action)
+    observation: float32 vector of OBS_SIZE (see observe), or with
+        obs_mode="pixels" a uint8 (channels, 84, 84) image (see ObservationRenderer)
+    reward: +1 per kill, -DAMAGE_PENALTY per health point lost
+    """
+
+    metadata = {"render_modes": []}
+
+    def __init__(self, sim=None, max_episode_steps=MAX_EPISODE_STEPS, map_path=ARENA_MAP,
+                 obs_mode="vector", renderer=None):
+        if sim is None:
+            from arena import Arena
+            sim = GameSimulation(arena=Arena(WIDTH, HEIGHT, map_path))
+        self.sim = sim
+        self.max_episode_steps = max_episode_steps
+        self.seeds = np.random.default_rng()
+        self.steps = 0
+        self.obs_mode = obs_mode
+        self.renderer = None
+        if obs_mode == "pixels":
+            self.renderer = renderer or ObservationRenderer()
+        elif obs_mode != "vector":
+            raise ValueError(f"obs_mode must be 'vector' or 'pixels', not {obs_mode!r}")
+        if spaces is not None:
+            if self.renderer:
+                self.observation_space = spaces.Box(0, self.renderer.value, shape=self.renderer.shape,
+                                                    dtype=self.renderer.dtype)
+            else:
+                self.observation_space = spaces.Box(-np.inf, np.inf, shape=(OBS_SIZE,), dtype=np.float32)
+            self.action_space = spaces.Box(
+                low=np.array([-1, -1, -math.pi, -1], dtype=np.float32),
+                high=np.array([1, 1, math.pi, 1], dtype=np.float32),
+            )
+
+    def reset(self, seed=None, options=None):
+        """Start a new game; `seed` also reseeds the seeds of later episodes"""
+        if seed is not None:
+            self.seeds = np.random.default_rng(seed)
+        self.sim.reset(int(self.seeds.integers(2 ** 63)))
+        self.steps = 0
+        return self.observation(), {"seed": self.sim.seed}
+
+    def step(self, action):
+        reward, terminated, truncated = self.advance(action)
+        info = {"score": self.sim.score, "wave": self.sim.wave}
+        return self.observation(), reward, terminated, truncated, info
+
+    def observation(self):
+        if self.renderer:
+            return self.renderer.render(self.sim)
+        return observe(self.sim)
+
+    def advance(self, action):
+        """step() without building the observation: (reward, terminated, truncated)"""
+        sim = self.sim
+        score, health = sim.score, sim.player.health
+        sim.step(to_action(sim, action))
+        self.steps += 1
+        reward = (sim.score - score) / SCORE_PER_KILL - DAMAGE_PENALTY * (health - sim.player.health)
+        terminated = sim.game_over
+        return reward, terminated, not terminated and self.steps >= self.max_episode_steps
+
+
+class VecEnv:
+    """N games stepped in lockstep. Observations, rewards and done flags come
+    back as (N, ...) arrays; finished games reset automatically (their last
+    observation is in info["final_observation"])."""
+
+    def __init__(self, num_envs, max_episode_steps=MAX_EPISODE_STEPS, map_path=ARENA_MAP, obs_mode="vector"):
+        from arena import Arena
+        # the arena and sprites are read-only while stepping, so every game shares them
+        arena = Arena(WIDTH, HEIGHT, map_path)
+        sprites = load_game_sprites()
+        self.renderer = ObservationRenderer() if obs_mode == "pixels" else None
+        self.envs = [ShooterEnv(GameSimulation(sprites, arena), max_episode_steps,
+                                obs_mode=obs_mode, renderer=self.renderer)
+                     for _ in range(num_envs)]
+        self.num_envs = num_envs
+        if self.renderer:
+            self.observations = np.zeros((num_envs,) + self.renderer.shape, dtype=self.renderer.dtype)
+        else:
+            self.observations = np.zeros((num_envs, OBS_SIZE), dtype=np.float32)
+        self.rewards = np.zeros(num_envs, dtype=np.float32)
+        self.terminated = np.zeros(num_envs, dtype=bool)
+        self.truncated = np.zeros(num_envs, dtype=bool)
+        if spaces is not None:
+            self.single_observation_space = self.envs[0].observation_space
+            self.single_action_space = self.envs[0].action_space
+
+    def reset(self, seed=None):
+        """Reset every game; with a seed, game i is seeded from seed + i"""
+        for i, env in enumerate(self.envs):
+            env.reset(None if seed is None else seed + i)
+        self.observe_all()
+        return self.observations.copy(), {"seed": [env.sim.seed for env in self.envs]}
+
+    def step(self, actions):
+        """Step every game with its row of `actions` (N, 4)"""
+        actions = np.asarray(actions, dtype=float).reshape(self.num_envs, 4)
+        final = {}
+        for i, env in enumerate(self.envs):
+            reward, terminated, truncated = env.advance(actions[i])
+            self.rewards[i] = reward
+            self.terminated[i] = terminated
+            self.truncated[i] = truncated
+            if terminated or truncated:
+                final[i] = env.observation()
+                env.reset()
+        self.observe_all()
+        info = {"final_observation": final} if final else {}
+        return (self.observations.copy(), self.rewards.copy(),
+                self.terminated.copy(), self.truncated.copy(), info)
+
+    def observe_all(self):
+        """Refresh self.observations from every game in one batched pass"""
+        sims = [env.sim for env in self.envs]
+        if self.renderer:
+            self.renderer.render_batch(sims, self.observations)
+        else:
+            observe_batch(sims, self.observations)
@@ -0,0 +1,188 @@
+# flow_field.py
+# ----------------------------------------------------------
+# Shared pathfinding for every enemy. The world is cut into
+# grid cells; cells covered by an obstacle are blocked. One
+# breadth-first search from the player's cell gives every cell
+# its step distance to the player and the neighbour to step to,
+# so an enemy finds its way around obstacles by looking up the
+# direction stored in its own cell - O(1) per enemy, however
+# many there are. The search only reruns when the player moves
+# to another cell, and obstacles never move, so the fields of
+# recently visited cells are kept: a player circling around
+# (or kiting back and forth) mostly revisits them.
+# ----------------------------------------------------------
+import math
+from collections import OrderedDict
+import numpy as np
+from config import TILE_SIZE
+from spatial_hash import cover_cells
+
+UNREACHABLE = np.iinfo(np.int32).max
+
+# Neighbour steps (dx, dy): straight moves first, so they win ties
+STEPS = np.array([(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, 1), (1, -1), (-1, -1)])
+STEP_DIRECTIONS = STEPS / np.hypot(STEPS[:, 0], STEPS[:, 1])[:, None]
+
+# Memory for cached fields (distance + direction per cell); at least one
+# field is always kept
+CACHE_BYTES = 1024 * 1024
+
+
+def _shift(grid, dx, dy, fill):
+    """grid moved so out[y, x] = grid[y + dy, x + dx] (fill past the edges)"""
+    out = np.full_like(grid, fill)
+    h, w = grid.shape
+    out[max(0, -dy):h - max(0, dy), max(0, -dx):w - max(0, dx)] = \
+        grid[max(0, dy):h - max(0, -dy), max(0, dx):w - max(0, -dx)]
+    return out
+
+
+class FlowField:
+    """Distance and direction to a target cell for every cell of the world.
+
+    `clearance` grows every obstacle by that many pixels, so an enemy
+    (about 2 * clearance across) following the field does not clip corners.
+    Diagonal steps are only taken when both cells beside them are open.
+    Cells within `direct_steps` of the target get no direction: from there
+    whoever follows the field heads straight for the target instead.
+    """
+
+    def __init__(self, world_size, obstacle_mins, obstacle_maxs, cell_size=TILE_SIZE, clearance=0,
+                 direct_steps=0):
+        self.cell_size = cell_size
+        self.direct_steps = direct_steps
+        self.width = max(1, math.ceil(world_size[0] / cell_size))
+        self.height = max(1, math.ceil(world_size[1] / cell_size))
+        self.max_cell = np.array([self.width - 1, self.height - 1])
+        self.open = np.ones((self.height, self.width), dtype=bool)
+        mins = np.asarray(obstacle_mins, dtype=float).reshape(-1, 2) - clearance
+        maxs = np.asarray(obstacle_maxs, dtype=float).reshape(-1, 2) + clearance
+        # a cell is blocked when its centre is inside a (grown) obstacle
+        first = np.ceil(mins / cell_size - 0.5).astype(np.int64)
+        last = np.ceil(maxs / cell_size - 0.5).astype(np.int64) - 1
+        keep = np.all(last >= first, axis=1)
+        if keep.any():
+            _, cx, cy = cover_cells(first[keep], last[keep], 1)
+            inside = (cx >= 0) & (cx < self.width) & (cy >= 0) & (cy < self.height)
+            self.open[cy[inside], cx[inside]] = False
+
+        # diagonal step (dx, dy) from a cell needs both cells beside it open
+        self.step_open = np.array([
+            _shift(self.open, dx, 0, False) & _shift(self.open, 0, dy, False) if dx and dy
+            else np.ones_like(self.open)
+            for dx, dy in STEPS.tolist()
+        ])
+        self.target = None
+        self.distance = np.full((self.height, self.width), UNREACHABLE, dtype=np.int32)
+        self.direction = np.zeros((self.height, self.width, 2))
+        # the same directions as a flat list of STEPS indices (-1 for none),
+        # for looking up a few points without array calls (see step_indices)
+        self.step_list = [-1] * (self.width * self.height)
+        self.updates = 0
+        self.searches = 0
+        # target cell -> (distance, direction, step_list), least recently used first
+        self.cache = OrderedDict()
+        field_bytes = self.distance.nbytes + self.direction.nbytes + 8 * len(self.step_list)
+        self.cache_size = max(1, CACHE_BYTES // field_bytes)
+
+    @classmethod
+    def from_arena(cls, arena, cell_size=TILE_SIZE, clearance=0, direct_steps=0):
+        grid = arena.obstacle_grid
+        return cls(arena.world_size, grid.mins, grid.maxs, cell_size, clearance, direct_steps)
+
+    def cell_of(self, pos):
+        """Grid cells (N, 2) of world positions (N, 2), clamped to the grid"""
+        return np.clip(np.floor_divide(pos, self.cell_size).astype(np.int64), 0, self.max_cell)
+
+    def update(self, target_pos):
+        """Point the field at a world position; only searches again when the
+        position is in a different cell than last time"""
+        # one point: plain int math is far cheaper than the array path
+        target = (min(max(int(target_pos[0] // self.cell_size), 0), self.width - 1),
+                  min(max(int(target_pos[1] // self.cell_size), 0), self.height - 1))
+        if target == self.target:
+            return False
+        self.target = target
+        field = self.cache.pop(target, None)
+        if field is None:
+            field = self._search(target)
+            self.searches += 1
+            if len(self.cache) >= self.cache_size:
+                self.cache.popitem(last=False)
+        self.cache[target] = field
+        self.distance, self.direction, self.step_list = field
+        self.updates += 1
+        return True
+
+    def _search(self, target):
+        """New (distance, direction, step_list) for a target cell"""
+        # breadth-first wavefront, one whole ring of cells per array pass
+        distance = np.full((self.height, self.width), UNREACHABLE, dtype=np.int32)
+        tx, ty = target
+        distance[ty, tx] = 0
+        h, w = self.height, self.width
+        # the frontier sits inside a one-cell border, so each neighbour
+        # offset is just a slice of it
+        padded = np.zeros((h + 2, w + 2), dtype=bool)
+        frontier = padded[1:h + 1, 1:w + 1]
+        frontier[ty, tx] = True
+        unvisited = self.open.copy()
+        unvisited[ty, tx] = False
+        reached = np.empty_like(unvisited)
+        hit = np.empty_like(unvisited)
+        step = 0
+        while True:
+            step += 1
+            reached.fill(False)
+            for (dx, dy), can_step in zip(STEPS.tolist(), self.step_open):
+                # cells whose step (dx, dy) lands on the frontier (straight
+                # steps are always allowed)
+                landed = padded[1 + dy:h + 1 + dy, 1 + dx:w + 1 + dx]
+                if dx and dy:
+                    landed = np.logical_and(landed, can_step, out=hit)
+                reached |= landed
+            reached &= unvisited
+            if not reached.any():
+                break
+            distance[reached] = step
+            unvisited &= ~reached
+            frontier[:] = reached
+
+        # every cell steps to its closest neighbour (if that gets it closer)
+        neighbour = np.array([
+            np.where(can_step, _shift(distance, dx, dy, UNREACHABLE), UNREACHABLE)
+            for (dx, dy), can_step in zip(STEPS.tolist(), self.step_open)
+        ])
+        best = neighbour.argmin(axis=0)
+        closer = np.take_along_axis(neighbour, best[None], 0)[0] < distance
+        closer &= distance > self.direct_steps
+        direction = np.zeros((self.height, self.width, 2))
+        direction[closer] = STEP_DIRECTIONS[best[closer]]
+        return distance, direction, np.where(closer, best, -1).ravel().tolist()
+
+    def sample(self, pos):
+        """(direction (N, 2), distance in steps (N,)) at world positions (N, 2).
+        Direction is a unit vector, or zero within `direct_steps` of the target
+        and where the target cannot be reached."""
+        cells = self.cell_of(pos)
+        return self.direction[cells[:, 1], cells[:, 0]], self.distance[cells[:, 1], cells[:, 0]]
+
+    def direction_at(self, pos):
+        """Just the direction part of sample()"""
+        cells = self.cell_of(pos)
+        return self.direction[cells[:, 1], cells[:, 0]]
+
+    def step_indices(self, points):
+        """Index into STEPS of the direction at each (x, y) of a list of world
+        points, or -1 where sample() gives no direction. Plain Python: for a
+        handful of points this is cheaper than sample()'s array calls."""
+        size, last_x, last_y = self.cell_size, self.width - 1, self.height - 1
+        step_list = self.step_list
+        steps = []
+        for x, y in points:
+            cx, cy = int(x // size), int(y // size)
+            # clamped to the grid like cell_of (comparisons beat min / max calls)
+            cx = 0 if cx < 0 else last_x if cx > last_x else cx
+            cy = 0 if cy < 0 else last_y if cy > last_y else cy
+            steps.append(step_list[cy * self.width + cx])
+        return steps
@@ -0,0 +1,145 @@
+# hud.py
+# ----------------------------------------------------------
+# Score / wave / health HUD and the game over screen.
+# The values behind the HUD change a few times per second at
+# most, so rendered text and overlay surfaces are cached and
+# only re-rendered when the string (or size) actually changes.
+# ----------------------------------------------------------
+import pygame
+from collections import OrderedDict
+from config import WIDTH, HEIGHT
+
+# Enough for every HUD string on screen plus a few stale ones
+TEXT_CACHE_SIZE = 64
+
+# Profiler overlay numbers are refreshed this often (frames), so they stay readable
+PROFILER_REFRESH = 15
+
+
+class TextCache:
+    """Rendered text surfaces keyed by (string, font, colour), least recently
+    used first out. Callers must treat returned surfaces as read-only."""
+
+    def __init__(self, max_cached=TEXT_CACHE_SIZE):
+        self.max_cached = max_cached
+        self.surfaces = OrderedDict()  # (text, id(font), colour) -> (font, surface)
+        self.overlays = {}             # (size, colour, alpha) -> surface
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text, font, color):
+        key = (text, id(font), color)
+        entry = self.surfaces.get(key)
+        # the stored font reference keeps its id from being reused
+        if entry is not None and entry[0] is font:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self.surfaces[key] = (font, surface)
+        if len(self.surfaces) > self.max_cached:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def overlay(self, size, color=(0, 0, 0), alpha=255):
+        """Solid, semi-transparent box of the given size (shared, read-only)"""
+        key = (tuple(size), color, alpha)
+        surface = self.overlays.get(key)
+        if surface is None:
+            self.misses += 1
+            surface = pygame.Surface(size)
+            surface.fill(color)
+            surface.set_alpha(alpha)
+            self.overlays[key] = surface
+        else:
+            self.hits += 1
+        return surface
+
+    def stats(self):
+        """Hit/miss counters plus how many surfaces are held"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "texts": len(self.surfaces),
+            "overlays": len(self.overlays),
+        }
+
+    def clear(self):
+        self.surfaces.clear()
+        self.overlays.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+class HUD:
+    def __init__(self):
+        self.font = pygame.font.Font(None, 36)
+        self.small_font = pygame.font.Font(None, 24)
+        self.text = TextCache()
+        self.profiler_lines = []
+        self.profiler_frame = None
+
+    def draw(self, screen, sim):
+        """Draw health, score, wave and banner; returns the rects touched"""
+        text = self.text
+        dirty = sim.player.draw_health_bar(screen, self.font, text)
+
+        score_text = text.render(f"Score: {sim.score}", self.font, (255, 255, 255))
+        dirty.append(screen.blit(score_text, (10, 40)))
+
+        wave_text = text.render(f"Wave: {sim.wave}", self.font, (255, 215, 0))
+        dirty.append(screen.blit(wave_text, (WIDTH - 150, 10)))
+
+        enemies_text = text.render(f"Enemies: {sim.enemies_killed_this_wave}/{sim.enemies_per_wave}",
+                                   self.small_font, (255, 255, 255))
+        dirty.append(screen.blit(enemies_text, (10, 70)))
+
+        # Wave complete banner
+        if sim.wave_complete:
+            banner_text = text.render(f"WAVE {sim.wave} COMPLETE!", self.font, (0, 255, 0))
+            banner_rect = banner_text.get_rect(center=(WIDTH // 2, HEIGHT // 2))
+            # Draw semi-transparent background
+            overlay = text.overlay((banner_rect.width + 40, banner_rect.height + 20), alpha=200)
+            overlay_rect = overlay.get_rect(center=(WIDTH // 2, HEIGHT // 2))
+            dirty.append(screen.blit(overlay, overlay_rect))
+            screen.blit(banner_text, banner_rect)
+        return dirty
+
+    def draw_profiler(self, screen, profiler):
+        """Per-phase ms and entity counts in the bottom-left corner"""
+        if self.profiler_frame is None or profiler.frames - self.profiler_frame >= PROFILER_REFRESH:
+            self.profiler_frame = profiler.frames
+            means = profiler.means()
+            frame = means.pop("frame", 0.0)
+            self.profiler_lines = [f"{'frame':<13} {frame:5.2f} ms"]
+            self.profiler_lines += [f"{name:<13} {ms:5.2f} ms"
+                                    for name, ms in sorted(means.items(), key=lambda item: -item[1])]
+            self.profiler_lines += [f"{name:<13} {value}" for name, value in profiler.latest_counts().items()]
+
+        lines = [self.text.render(line, self.small_font, (255, 255, 0)) for line in self.profiler_lines]
+        height = sum(line.get_height() for line in lines)
+        width = max((line.get_width() for line in lines), default=0)
+        y = HEIGHT - height - 10
+        # box width snaps to 20px steps so the overlay cache holds only a few sizes
+        box = ((width + 29) // 20 * 20, height + 6)
+        dirty = [screen.blit(self.text.overlay(box, alpha=160), (5, y - 3))]
+        for line in lines:
+            screen.blit(line, (10, y))
+            y += line.get_height()
+        return dirty
+
+    def draw_game_over(self, screen, sim):
+        text = self.text
+        # Draw semi-transparent overlay
+        screen.blit(text.overlay((WIDTH, HEIGHT), alpha=180), (0, 0))
+
+        lines = [
+            ("GAME OVER", (255, 0, 0), -60),
+            (f"Final Score: {sim.score}", (255, 255, 255), -10),
+            (f"Wave Reached: {sim.wave}", (255, 255, 255), 30),
+            ("Press R to Restart", (255, 255, 255), 70),
+        ]
+        for line, color, dy in lines:
+            surface = text.render(line, self.font, color)
+            screen.blit(surface, surface.get_rect(center=(WIDTH // 2, HEIGHT // 2 + dy)))
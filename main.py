@@ -1,11 +1,19 @@
 # main.py
 import pygame
-from config import WIDTH, HEIGHT, FPS, TITLE
-from player import Player
-from bullet import BulletGroup
-from enemy import EnemyManager
+from time import perf_counter
+from config import (WIDTH, HEIGHT, FPS, TITLE, ARENA_MAP, DIRTY_RECTS, REPLAY_FILE, PROFILE, PROFILE_OUTPUT,
+                    TIME_SCALE, MAX_CATCH_UP_STEPS, SIM_THREAD, SIM_THREAD_BUFFERS)
+from assets import load_game_sprites
 from arena import Arena
 from camera import Camera
+from simulation import GameSimulation, Action
+from renderer import GameRenderer
+from replay import Replay
+from profiler import FrameProfiler, NULL_PROFILER
+from sim_clock import FixedStep
+from sim_thread import SimulationThread, SnapshotBuffer
+
+SIM_DT = 1.0  # every simulation step is one 60fps frame of game time
 
 # ---------------------------------------------------------
 # 1️⃣ Initialize Pygame
@@ -14,215 +22,177 @@ pygame.init()
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption(TITLE)
 clock = pygame.time.Clock()
-font = pygame.font.Font(None, 36)
-small_font = pygame.font.Font(None, 24)
 
 # ---------------------------------------------------------
 # 2️⃣ Load Assets (sprites)
 # ---------------------------------------------------------
 # Loading sprites from assets/sprites folder
-player_img = pygame.image.load("assets/sprites/player_walk_0.png").convert_alpha()
-bullet_img = pygame.image.load("assets/sprites/bullet.png").convert_alpha()
-
-# Load enemy sprites (slime animations)
-enemy_images = [
-    pygame.image.load("assets/sprites/slime_animation_0.png").convert_alpha(),
-    pygame.image.load("assets/sprites/slime_animation_1.png").convert_alpha(),
-    pygame.image.load("assets/sprites/slime_animation_2.png").convert_alpha(),
-    pygame.image.load("assets/sprites/slime_animation_3.png").convert_alpha()
-]
+sprites = load_game_sprites()
 
 # ---------------------------------------------------------
-# 3️⃣ Create Player + Bullet Group + Enemies + Arena
+# 3️⃣ Create Arena + Camera + Simulation (player, bullets, enemies, waves) + Renderer
 # ---------------------------------------------------------
-player = Player(WIDTH // 2, HEIGHT // 2, player_img)
-bullets = BulletGroup()
-enemy_manager = EnemyManager(enemy_images)
-arena = Arena(WIDTH, HEIGHT)
+arena = Arena(WIDTH, HEIGHT, ARENA_MAP)
 camera = Camera()
-
-# Game state
-score = 0
-game_over = False
-wave = 1
-enemies_per_wave = 5
-enemies_spawned_this_wave = 0
-enemies_killed_this_wave = 0
-wave_complete = False
-wave_complete_timer = 0
-
-# Spawn zones (left and right edges)
-SPAWN_LEFT = 50
-SPAWN_RIGHT = WIDTH - 50
+sim = GameSimulation(sprites, arena)
+profiler = FrameProfiler() if PROFILE else NULL_PROFILER
+if not SIM_THREAD:
+    sim.profiler = profiler  # one profiler can't time two threads at once
+renderer = GameRenderer(screen, arena, camera, dirty_rects=DIRTY_RECTS, profiler=profiler)
+replay = Replay(sim.seed, ARENA_MAP)  # inputs of the current game, for bug reports
 
 # ---------------------------------------------------------
 # 4️⃣ Main Game Loop
 # ---------------------------------------------------------
+# The simulation runs in fixed steps (one 60fps frame of game time
+# each) however fast frames are drawn; drawing interpolates between
+# the last two steps. - / = change the game speed, 0 toggles unbounded.
+stepper = FixedStep(TIME_SCALE, MAX_CATCH_UP_STEPS)
+move, aim = (0, 0), camera.screen_to_world(pygame.mouse.get_pos())
+clicks = 0        # clicks so far (main thread) ...
+clicks_used = 0   # ... and how many became shots; a click waits for the next step
+# Camera shake advances with the steps. On the simulation thread it has a
+# camera of its own, and each snapshot carries the offset to draw with.
+shaker = Camera() if SIM_THREAD else camera
+shaker.reseed(sim.seed)
+
+
+def show_speed():
+    global speed_shown
+    speed_shown = stepper.time_scale
+    speed = "max speed" if stepper.unbounded else f"{stepper.time_scale:g}x"
+    pygame.display.set_caption(TITLE if stepper.time_scale == 1 else f"{TITLE} - {speed}")
+
+
+def sim_step():
+    """One fixed simulation step with this frame's input; False once the game is over"""
+    global clicks_used
+    if sim.game_over:
+        return False
+    shoot = clicks > clicks_used
+    clicks_used = clicks
+    action = Action(move[0], move[1], aim, shoot)
+    events = sim.step(action, SIM_DT)
+    replay.record(action, SIM_DT, sim)
+    if "game_over" in events and REPLAY_FILE:
+        replay.save(REPLAY_FILE)
+
+    # camera shake counts in steps, so it lasts as long at any frame rate
+    if "shoot" in events:
+        shaker.start_shake(3, 8)  # Shake on shoot
+    shaker.update()
+    if "kill" in events:
+        shaker.start_shake(5, 10)  # Shake on enemy kill
+    if "hit" in events:
+        shaker.start_shake(8, 15)  # Big shake on damage
+    return not sim.game_over
+
+
+def restart():
+    global replay, clicks_used
+    sim.reset()
+    shaker.reseed(sim.seed)
+    replay = Replay(sim.seed, ARENA_MAP)
+    clicks_used = clicks
+
+
+# With SIM_THREAD the simulation steps on its own thread and the loop below
+# only handles input and draws the newest snapshot; anything that changes
+# the simulation is handed over with on_sim().
+if SIM_THREAD:
+    snapshots = SnapshotBuffer(SIM_THREAD_BUFFERS)
+    snapshots.publish(sim.snapshot())
+    sim_thread = SimulationThread(sim_step, lambda: sim.snapshot((shaker.offset_x, shaker.offset_y)),
+                                  stepper, snapshots)
+    on_sim = sim_thread.call
+    sim_thread.start()
+else:
+    def on_sim(fn):
+        fn()
+
+speed_shown = False  # time scale the title bar shows (False = not set yet)
+view = sim  # what was drawn last frame: the simulation, or a snapshot of it
 running = True
 while running:
-    dt = clock.tick(FPS) / 16.67   # frame time normalization (~60fps baseline)
+    # wall time since the last frame (unbounded single-threaded, frames don't wait)
+    real_ms = clock.tick(0 if stepper.unbounded and not SIM_THREAD else FPS)
+    profiler.begin_frame()
+    if stepper.time_scale != speed_shown:
+        show_speed()  # in the title bar
 
     # ---- Handle Quit ----
-    for event in pygame.event.get():
+    with profiler.phase("input"):
+        frame_events = pygame.event.get()
+    for event in frame_events:
         if event.type == pygame.QUIT:
             running = False
 
+        # ---- Profiler overlay (turns profiling on if it was off) ----
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            if not profiler.enabled:
+                profiler = renderer.profiler = FrameProfiler()
+                if not SIM_THREAD:
+                    sim.profiler = profiler
+            profiler.toggle_overlay()
+
+        # ---- Game speed ----
+        if event.type == pygame.KEYDOWN and event.key in (pygame.K_MINUS, pygame.K_EQUALS, pygame.K_0):
+            if event.key == pygame.K_MINUS:
+                on_sim(stepper.slower)
+            elif event.key == pygame.K_EQUALS:
+                on_sim(stepper.faster)
+            else:
+                on_sim(stepper.toggle_unbounded)
+
         # ---- Mouse Shooting ----
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            if not game_over and player.can_shoot():
-                player.shoot(bullets, bullet_img)
-                camera.start_shake(3, 8)  # Shake on shoot
+            clicks += 1
         
         # ---- Restart Game ----
-        if event.type == pygame.KEYDOWN and event.key == pygame.K_r and game_over:
-            # Reset everything
-            player = Player(WIDTH // 2, HEIGHT // 2, player_img)
-            bullets = BulletGroup()
-            enemy_manager.reset()
-            score = 0
-            game_over = False
-            wave = 1
-            enemies_per_wave = 5
-            enemies_spawned_this_wave = 0
-            enemies_killed_this_wave = 0
-            wave_complete = False
-            wave_complete_timer = 0
-
-    if not game_over:
-        # ---- Wave System: Spawn enemies from left and right ----
-        if not wave_complete:
-            if enemies_spawned_this_wave < enemies_per_wave:
-                if enemy_manager.get_count() < enemies_per_wave:
-                    # Spawn from left or right edge
-                    spawn_side = "left" if enemies_spawned_this_wave % 2 == 0 else "right"
-                    spawn_x = SPAWN_LEFT if spawn_side == "left" else SPAWN_RIGHT
-                    spawn_y = HEIGHT // 2 + (enemies_spawned_this_wave - enemies_per_wave // 2) * 80
-                    
-                    # Clamp Y position
-                    spawn_y = max(100, min(HEIGHT - 100, spawn_y))
-                    
-                    enemy_manager.spawn_enemy_at(spawn_x, spawn_y)
-                    enemies_spawned_this_wave += 1
-        
-        # ---- Update ----
-        player.handle_input(dt)
-        player.aim_and_rotate(pygame.mouse.get_pos())
-        player.update_invincibility()
-        bullets.update(dt)
-        
-        # Check collision with obstacles
-        obstacle_rects = arena.get_obstacle_rects()
-        for obs_rect in obstacle_rects:
-            if player.rect.colliderect(obs_rect):
-                # Push player back
-                if hasattr(player, 'vel_x') and hasattr(player, 'vel_y'):
-                    player.rect.x -= player.vel_x * dt
-                    player.rect.y -= player.vel_y * dt
-        
-        enemy_manager.update(dt, player.rect.center)
-        arena.update_camera(player.rect.center)
-        camera.update()
-        
-        # ---- Check Collisions ----
-        # Bullets vs Enemies
-        kills = enemy_manager.check_bullet_collisions(bullets)
-        if kills > 0:
-            score += kills * 10
-            enemies_killed_this_wave += kills
-            camera.start_shake(5, 10)  # Shake on enemy kill
-        
-        # Enemies vs Player
-        if enemy_manager.check_player_collision(player.rect):
-            if player.take_damage(1):
-                camera.start_shake(8, 15)  # Big shake on damage
-        
-        # Check if player died
-        if not player.is_alive():
-            game_over = True
-        
-        # ---- Wave Complete Check ----
-        if enemies_killed_this_wave >= enemies_per_wave and not wave_complete:
-            wave_complete = True
-            wave_complete_timer = 120  # 2 seconds at 60fps
-        
-        if wave_complete:
-            wave_complete_timer -= 1
-            if wave_complete_timer <= 0:
-                # Start next wave
-                wave += 1
-                enemies_per_wave = 5 + wave * 2  # More enemies each wave
-                enemies_spawned_this_wave = 0
-                enemies_killed_this_wave = 0
-                wave_complete = False
-                # Increase enemy difficulty
-                enemy_manager.increase_difficulty()
-
-        # ---- Draw ----
-        arena.draw(screen)  # Draw arena background
-        
-        # Apply camera shake
-        cam_offset = camera.get_offset()
-        player_rect_shaken = player.rect.move(cam_offset)
-        screen.blit(player.image, player_rect_shaken)
-        
-        # Draw bullets with shake
-        for bullet in bullets.sprites():
-            bullet_rect = bullet.rect.move(cam_offset)
-            screen.blit(bullet.image, bullet_rect)
-        
-        enemy_manager.draw(screen, cam_offset)
-        
-        # Draw UI
-        player.draw_health_bar(screen, font)
-        score_text = font.render(f"Score: {score}", True, (255, 255, 255))
-        screen.blit(score_text, (10, 40))
-        
-        wave_text = font.render(f"Wave: {wave}", True, (255, 215, 0))
-        screen.blit(wave_text, (WIDTH - 150, 10))
-        
-        enemies_text = small_font.render(f"Enemies: {enemies_killed_this_wave}/{enemies_per_wave}", True, (255, 255, 255))
-        screen.blit(enemies_text, (10, 70))
-        
-        # Wave complete banner
-        if wave_complete:
-            banner_text = font.render(f"WAVE {wave} COMPLETE!", True, (0, 255, 0))
-            banner_rect = banner_text.get_rect(center=(WIDTH // 2, HEIGHT // 2))
-            # Draw semi-transparent background
-            overlay = pygame.Surface((banner_rect.width + 40, banner_rect.height + 20))
-            overlay.set_alpha(200)
-            overlay.fill((0, 0, 0))
-            overlay_rect = overlay.get_rect(center=(WIDTH // 2, HEIGHT // 2))
-            screen.blit(overlay, overlay_rect)
-            screen.blit(banner_text, banner_rect)
-    
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_r and view.game_over:
+            on_sim(restart)
+
+    # ---- Update (all game rules live in GameSimulation) ----
+    keys = pygame.key.get_pressed()
+    move = (keys[pygame.K_d] - keys[pygame.K_a], keys[pygame.K_s] - keys[pygame.K_w])
+    aim = camera.screen_to_world(pygame.mouse.get_pos())  # aim in world space
+    if SIM_THREAD:
+        sim_thread.meter.begin("render")
+        view = snapshots.take()
+        # a snapshot is one step's worth of (scaled) time old when the next arrives
+        age_ms = (perf_counter() - view.created) * 1000
+        alpha = 1.0 if stepper.unbounded else min(1.0, age_ms * stepper.time_scale / stepper.step_ms)
+        camera.offset_x, camera.offset_y = view.shake
+        profiler.count("snapshot_ms", round(age_ms, 1))
     else:
-        # ---- Game Over Screen ----
-        arena.draw(screen)  # Keep background
-        
-        game_over_text = font.render("GAME OVER", True, (255, 0, 0))
-        final_score_text = font.render(f"Final Score: {score}", True, (255, 255, 255))
-        wave_reached_text = font.render(f"Wave Reached: {wave}", True, (255, 255, 255))
-        restart_text = font.render("Press R to Restart", True, (255, 255, 255))
-        
-        text_rect1 = game_over_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 60))
-        text_rect2 = final_score_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 10))
-        text_rect3 = wave_reached_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 30))
-        text_rect4 = restart_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 70))
-        
-        # Draw semi-transparent overlay
-        overlay = pygame.Surface((WIDTH, HEIGHT))
-        overlay.set_alpha(180)
-        overlay.fill((0, 0, 0))
-        screen.blit(overlay, (0, 0))
-        
-        screen.blit(game_over_text, text_rect1)
-        screen.blit(final_score_text, text_rect2)
-        screen.blit(wave_reached_text, text_rect3)
-        screen.blit(restart_text, text_rect4)
+        if not sim.game_over:
+            stepper.run(real_ms, sim_step)
+        view, alpha = sim, stepper.alpha
+
+    if not view.game_over:
+        # the view follows where the player is drawn, between the last two steps
+        center = view.player.interpolated_rect(alpha).center
+        camera.follow(center, arena.world_size)
+        arena.update_camera(camera.world_to_screen(center))
 
-    pygame.display.flip()
+    # ---- Draw (game screen or game over screen) ----
+    renderer.render(view, alpha)
+    if SIM_THREAD:
+        snapshots.shown(view)
+        sim_thread.meter.end("render")
+    profiler.end_frame()
 
 # ---------------------------------------------------------
 # 5️⃣ Exit Game Cleanly
 # ---------------------------------------------------------
+if SIM_THREAD:
+    sim_thread.stop()
+    stats, overlap = snapshots.stats(), sim_thread.meter.stats()
+    print(f"✅ Sim thread: {stats['published']} snapshots, {stats['dropped']} dropped, "
+          f"{stats['repeats']} frames repeated one; latency {stats['latency_ms']['mean']:.1f} ms mean, "
+          f"{stats['latency_ms']['p95']:.1f} ms p95; busy at the same time {overlap['overlap_share']:.0%}")
+if REPLAY_FILE and len(replay) and not sim.game_over:
+    replay.save(REPLAY_FILE)  # game over already saved it
+if profiler.enabled and PROFILE_OUTPUT:
+    profiler.dump(PROFILE_OUTPUT)
 pygame.quit()
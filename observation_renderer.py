@@ -0,0 +1,91 @@
+# observation_renderer.py
+# ----------------------------------------------------------
+# Pixel observations for agents without pygame: walls, enemies,
+# bullets and the player are rasterized as boxes straight into a
+# small multi-channel NumPy image (84x84 by default) instead of
+# drawing the full 960x540 frame and shrinking it. Many games
+# render in one batched pass.
+# ----------------------------------------------------------
+import numpy as np
+from spatial_hash import cover_cells
+
+CHANNELS = ("walls", "enemies", "bullets", "player")
+WALLS, ENEMIES, BULLETS, PLAYER = range(len(CHANNELS))
+
+
+class ObservationRenderer:
+    """Rasterizes whole worlds into (channels, height, width) images.
+    A cell is set when any part of an entity's box touches it."""
+
+    def __init__(self, width=84, height=84, dtype=np.uint8):
+        self.width = width
+        self.height = height
+        self.dtype = np.dtype(dtype)
+        self.value = 255 if self.dtype.kind in "ui" else 1.0
+        self.walls = {}  # id(arena) -> (arena, wall mask), obstacles never move
+
+    @property
+    def shape(self):
+        return (len(CHANNELS), self.height, self.width)
+
+    def _fill(self, out, game, channel, mins, maxs, world):
+        """Set the cells of out[game, channel] covered by each box (world pixels,
+        max corners exclusive); game/world are per-box arrays"""
+        inside = np.all(maxs > 0, axis=1) & np.all(mins < world, axis=1)
+        if not inside.all():
+            game, mins, maxs, world = game[inside], mins[inside], maxs[inside], world[inside]
+        if len(game) == 0:
+            return
+        cell = world / (self.width, self.height)
+        # keep boxes on the grid; the tiny step back makes max corners exclusive
+        mins = np.maximum(mins, 0)
+        maxs = np.minimum(maxs, world) - 1e-6
+        owner, cx, cy = cover_cells(mins, maxs, cell)
+        np.clip(cx, 0, self.width - 1, out=cx)
+        np.clip(cy, 0, self.height - 1, out=cy)
+        out[game[owner], channel, cy, cx] = self.value
+
+    def wall_mask(self, arena):
+        """(height, width) obstacle image of an arena, built once per arena"""
+        cached = self.walls.get(id(arena))
+        if cached is not None and cached[0] is arena:
+            return cached[1]
+        mask = np.zeros((1,) + self.shape, dtype=self.dtype)
+        grid = arena.obstacle_grid
+        if len(grid):
+            count = len(grid.mins)
+            world = np.broadcast_to(np.array(arena.world_size, dtype=float), (count, 2))
+            self._fill(mask, np.zeros(count, dtype=np.int64), WALLS, grid.mins, grid.maxs, world)
+        self.walls[id(arena)] = (arena, mask[0, WALLS])
+        return mask[0, WALLS]
+
+    def render(self, sim):
+        """Observation image of one game"""
+        return self.render_batch([sim])[0]
+
+    def render_batch(self, sims, out=None):
+        """Observation images of many games as one (N, channels, height, width) array"""
+        if out is None:
+            out = np.zeros((len(sims),) + self.shape, dtype=self.dtype)
+        else:
+            out.fill(0)
+        worlds = np.array([sim.arena.world_size for sim in sims], dtype=float)
+        for i, sim in enumerate(sims):
+            out[i, WALLS] = self.wall_mask(sim.arena)
+
+        # every game's boxes per channel, back to back
+        for channel, boxes in ((ENEMIES, [sim.enemy_manager.get_bounds() for sim in sims]),
+                               (BULLETS, [sim.bullets.get_bounds() for sim in sims])):
+            counts = [len(mins) for mins, _ in boxes]
+            if sum(counts) == 0:
+                continue
+            game = np.repeat(np.arange(len(sims)), counts)
+            mins = np.concatenate([mins for mins, _ in boxes])
+            maxs = np.concatenate([maxs for _, maxs in boxes])
+            self._fill(out, game, channel, mins, maxs, worlds[game])
+
+        rects = [sim.player.rect for sim in sims]
+        mins = np.array([rect.topleft for rect in rects], dtype=float)
+        maxs = np.array([rect.bottomright for rect in rects], dtype=float)
+        self._fill(out, np.arange(len(sims)), PLAYER, mins, maxs, worlds)
+        return out
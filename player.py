@@ -1,15 +1,20 @@
 # player.py
-import pygame, math
+import pygame, math, copy
 from config import PLAYER_SPEED, PLAYER_SCALE, PLAYER_FIRE_COOLDOWN
+from rotation_cache import get_rotation_cache
+from sim_clock import ms_to_frames
 
 class Player(pygame.sprite.Sprite):
     def __init__(self, x, y, sprite):
         super().__init__()
         # store base (unrotated) sprite and position
-        self.original_image = pygame.transform.scale_by(sprite, PLAYER_SCALE)
-        self.image = self.original_image.copy()
+        self.rotations = get_rotation_cache(sprite, PLAYER_SCALE)
+        self.original_image = self.rotations.image
+        self.image = self.original_image
         self.rect = self.image.get_rect(center=(x, y))
-        self.last_shot = 0  # last bullet fired (timestamp)
+        self.prev_center = self.rect.center  # centre before the last step (for interpolation)
+        self.angle_index = None  # quantized aim angle currently shown
+        self.fire_cooldown = 0  # game time (frames) until the next shot - can fire straight away
         
         # Health system
         self.health = 100
@@ -19,9 +24,13 @@ class Player(pygame.sprite.Sprite):
 
     def handle_input(self, dt):
         keys = pygame.key.get_pressed()
-        # movement vector from keys
-        move_x = (keys[pygame.K_d] - keys[pygame.K_a]) * PLAYER_SPEED
-        move_y = (keys[pygame.K_s] - keys[pygame.K_w]) * PLAYER_SPEED
+        # movement direction from keys (-1, 0 or 1 on each axis)
+        self.move(keys[pygame.K_d] - keys[pygame.K_a], keys[pygame.K_s] - keys[pygame.K_w], dt)
+
+    def move(self, dir_x, dir_y, dt):
+        # movement vector from a direction (keyboard or headless action)
+        move_x = dir_x * PLAYER_SPEED
+        move_y = dir_y * PLAYER_SPEED
         # Store velocity for collision handling
         self.vel_x = move_x
         self.vel_y = move_y
@@ -29,21 +38,42 @@ class Player(pygame.sprite.Sprite):
         self.rect.x += move_x * dt
         self.rect.y += move_y * dt
 
+    def snapshot(self):
+        """Copy for drawing on another thread (the image is shared, never changed)"""
+        frozen = copy.copy(self)
+        frozen.rect = self.rect.copy()
+        return frozen
+
+    def interpolated_rect(self, alpha=1.0):
+        """rect moved `alpha` of the way from the previous step's centre to the current one"""
+        if alpha == 1.0:
+            return self.rect
+        cx, cy = self.rect.center
+        px, py = self.prev_center
+        return self.rect.move(round((px - cx) * (1 - alpha)), round((py - cy) * (1 - alpha)))
+
     def aim_and_rotate(self, mouse_pos):
         # rotate sprite to face mouse
         dx, dy = mouse_pos[0] - self.rect.centerx, mouse_pos[1] - self.rect.centery
         angle = math.degrees(math.atan2(-dy, dx)) - 90
-        self.image = pygame.transform.rotate(self.original_image, angle)
-        self.rect = self.image.get_rect(center=self.rect.center)
+        index = self.rotations.quantize(angle)
+        if index == self.angle_index:
+            return  # still facing the same way - keep image and rect
+        self.angle_index = index
+        self.image, offset = self.rotations.get_index(index)
+        center = self.rect.center
+        self.rect = self.image.get_rect(topleft=(center[0] + offset[0], center[1] + offset[1]))
 
     def can_shoot(self):
-        # cooldown check (ms)
-        return pygame.time.get_ticks() - self.last_shot >= PLAYER_FIRE_COOLDOWN
+        # cooldown check - counted down in game time by update_fire_cooldown
+        return self.fire_cooldown <= 0
 
-    def shoot(self, bullets, bullet_img):
-        # spawn bullet toward mouse
-        self.last_shot = pygame.time.get_ticks()
-        bullets.add_bullet(self.rect.center, pygame.mouse.get_pos(), bullet_img)
+    def shoot(self, bullets, bullet_img, target=None):
+        # spawn bullet toward target (defaults to the mouse)
+        if target is None:
+            target = pygame.mouse.get_pos()
+        self.fire_cooldown = ms_to_frames(PLAYER_FIRE_COOLDOWN)
+        bullets.add_bullet(self.rect.center, target, bullet_img)
     
     def take_damage(self, damage):
         if self.invincibility_timer <= 0:
@@ -58,15 +88,24 @@ class Player(pygame.sprite.Sprite):
         if self.invincibility_timer > 0:
             self.invincibility_timer -= 1
     
+    def update_fire_cooldown(self, dt):
+        if self.fire_cooldown > 0:
+            self.fire_cooldown -= dt
+    
     def is_alive(self):
         return self.health > 0
     
-    def draw_health_bar(self, surface, font):
+    def draw_health_bar(self, surface, font, text_cache=None):
         # Health bar background
-        pygame.draw.rect(surface, (255, 0, 0), (10, 10, 200, 20))
+        bar_rect = pygame.draw.rect(surface, (255, 0, 0), (10, 10, 200, 20))
         # Health bar foreground
         health_width = (self.health / self.max_health) * 200
         pygame.draw.rect(surface, (0, 255, 0), (10, 10, health_width, 20))
         # Health text
-        health_text = font.render(f"HP: {self.health}/{self.max_health}", True, (255, 255, 255))
-        surface.blit(health_text, (220, 10))
+        label = f"HP: {self.health}/{self.max_health}"
+        if text_cache is not None:
+            health_text = text_cache.render(label, font, (255, 255, 255))
+        else:
+            health_text = font.render(label, True, (255, 255, 255))
+        text_rect = surface.blit(health_text, (220, 10))
+        return [bar_rect, text_rect]  # regions touched, for dirty-rect rendering
@@ -0,0 +1,59 @@
+# policies.py
+# ----------------------------------------------------------
+# Built-in scripted players for headless runs (batch runs,
+# benchmarks, baselines for trained agents). A policy is a
+# function (sim, rng) -> Action; rng is a numpy Generator
+# owned by the caller so runs stay reproducible.
+# ----------------------------------------------------------
+import numpy as np
+from simulation import Action
+
+
+def nearest_enemy(sim):
+    """World position of the enemy closest to the player, or None"""
+    n = sim.enemy_manager.get_count()
+    if n == 0:
+        return None
+    pos = sim.enemy_manager.store.pos[:n]
+    delta = pos - sim.player.rect.center
+    return tuple(pos[np.argmin(np.einsum("ij,ij->i", delta, delta))])
+
+
+def idle_policy(sim, rng):
+    """Stand still and never shoot"""
+    return Action()
+
+
+def random_policy(sim, rng):
+    """Random movement, aim and trigger every tick"""
+    world_width, world_height = sim.arena.world_size
+    move_x, move_y = rng.integers(-1, 2, size=2)
+    aim = (float(rng.uniform(0, world_width)), float(rng.uniform(0, world_height)))
+    return Action(int(move_x), int(move_y), aim, bool(rng.random() < 0.5))
+
+
+def nearest_policy(sim, rng):
+    """Stand still and keep shooting the closest enemy"""
+    target = nearest_enemy(sim)
+    if target is None:
+        return Action(aim=sim.player.rect.center)
+    return Action(aim=target, shoot=True)
+
+
+def kite_policy(sim, rng):
+    """Back away from the closest enemy while shooting it"""
+    target = nearest_enemy(sim)
+    if target is None:
+        return Action(aim=sim.player.rect.center)
+    px, py = sim.player.rect.center
+    move_x = int(np.sign(px - target[0]))
+    move_y = int(np.sign(py - target[1]))
+    return Action(move_x, move_y, target, True)
+
+
+POLICIES = {
+    "idle": idle_policy,
+    "random": random_policy,
+    "nearest": nearest_policy,
+    "kite": kite_policy,
+}
@@ -0,0 +1,153 @@
+# profiler.py
+# ----------------------------------------------------------
+# Per-phase frame timing. Code wraps each phase of a frame in
+#     with profiler.phase("bullets"):
+# and the profiler keeps a rolling history of how many ms every
+# phase took per frame (plus entity counts), for the in-game
+# overlay or a JSON dump. When profiling is off NULL_PROFILER
+# stands in: its phase() hands back one shared do-nothing
+# context manager, so instrumented code costs next to nothing.
+# ----------------------------------------------------------
+import json
+from collections import deque
+from time import perf_counter
+import numpy as np
+
+# Histogram bucket edges (ms) used in stats()
+HISTOGRAM_EDGES = [0, 0.25, 0.5, 1, 2, 4, 8, 16, 33, float("inf")]
+
+
+class _Phase:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = perf_counter()
+
+    def __exit__(self, *exc):
+        current = self.profiler.current
+        current[self.name] = current.get(self.name, 0.0) + (perf_counter() - self.start) * 1000
+
+
+class FrameProfiler:
+    enabled = True
+
+    def __init__(self, history=300):
+        self.history = history
+        self.phases = {}      # name -> _Phase (reused every frame)
+        self.timings = {}     # name -> deque of ms per frame
+        self.counts = {}      # name -> deque of values per frame
+        self.current = {}     # ms per phase so far this frame
+        self.current_counts = {}
+        self.frames = 0
+        self.frame_start = None
+        self.overlay_visible = False
+
+    def phase(self, name):
+        timer = self.phases.get(name)
+        if timer is None:
+            timer = self.phases[name] = _Phase(self, name)
+        return timer
+
+    def count(self, name, value):
+        """Record a per-frame number (e.g. live enemies) next to the timings"""
+        self.current_counts[name] = value
+
+    def begin_frame(self):
+        self.frame_start = perf_counter()
+
+    def end_frame(self):
+        """Close the frame: push every phase's total (0 if it did not run)"""
+        if self.frame_start is not None:
+            self.current["frame"] = (perf_counter() - self.frame_start) * 1000
+            self.frame_start = None
+        for name in self.current.keys() - self.timings.keys():
+            self.timings[name] = deque([0.0] * min(self.frames, self.history), maxlen=self.history)
+        for name, history in self.timings.items():
+            history.append(self.current.get(name, 0.0))
+        for name, value in self.current_counts.items():
+            self.counts.setdefault(name, deque(maxlen=self.history)).append(value)
+        self.current = {}
+        self.current_counts = {}
+        self.frames += 1
+
+    def means(self):
+        """Mean ms per phase over the history (what the overlay shows)"""
+        return {name: sum(h) / len(h) for name, h in self.timings.items() if h}
+
+    def latest_counts(self):
+        return {name: h[-1] for name, h in self.counts.items() if h}
+
+    def stats(self):
+        """Per-phase mean / percentiles / max / histogram, plus entity counts"""
+        phases = {}
+        for name, history in self.timings.items():
+            if not history:
+                continue
+            ms = np.fromiter(history, dtype=float)
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            phases[name] = {
+                "mean": float(ms.mean()),
+                "p50": float(p50),
+                "p95": float(p95),
+                "p99": float(p99),
+                "max": float(ms.max()),
+                "histogram": np.histogram(ms, HISTOGRAM_EDGES)[0].tolist(),
+            }
+        counts = {
+            name: {"mean": float(np.mean(history)), "max": max(history)}
+            for name, history in self.counts.items() if history
+        }
+        return {
+            "frames": self.frames,
+            "history": self.history,
+            "histogram_edges_ms": HISTOGRAM_EDGES[:-1],
+            "phases": phases,
+            "counts": counts,
+        }
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            json.dump(self.stats(), f, indent=2)
+
+    def toggle_overlay(self):
+        self.overlay_visible = not self.overlay_visible
+
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+
+class NullProfiler:
+    """Stand-in used when profiling is off - every call is a no-op"""
+    enabled = False
+    overlay_visible = False
+    _phase = _NoPhase()
+
+    def phase(self, name):
+        return self._phase
+
+    def count(self, name, value):
+        pass
+
+    def begin_frame(self):
+        pass
+
+    def end_frame(self):
+        pass
+
+    def toggle_overlay(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,49 @@
+# render_queue.py
+# ----------------------------------------------------------
+# Collects every sprite blit of a frame and submits them with
+# Surface.blits, one call per layer, instead of one Python-level
+# blit() call per sprite.
+# ----------------------------------------------------------
+
+# Draw order of the entity layers (lowest first)
+LAYER_PLAYER = 0
+LAYER_BULLETS = 1
+LAYER_ENEMIES = 2
+LAYER_HEALTH_BARS = 3
+
+
+class RenderQueue:
+    """Per-frame list of (surface, position) blits grouped by layer.
+    Layers are drawn lowest first; within a layer blits keep the order
+    they were queued in."""
+
+    def __init__(self):
+        self.layers = {}  # layer -> [(surface, position), ...]
+        self.queued = 0   # stats: blits in the last flush
+        self.calls = 0    # stats: blits() calls in the last flush
+
+    def add(self, surface, position, layer=0):
+        self.layers.setdefault(layer, []).append((surface, position))
+
+    def extend(self, blits, layer=0):
+        """Queue an iterable of (surface, position) pairs"""
+        self.layers.setdefault(layer, []).extend(blits)
+
+    def flush(self, target, doreturn=True):
+        """Blit everything queued onto `target` and empty the queue.
+        Returns the rects touched when `doreturn` is true."""
+        rects = []
+        self.queued = self.calls = 0
+        for layer in sorted(self.layers):
+            blits = self.layers[layer]
+            self.queued += len(blits)
+            self.calls += 1
+            if doreturn:
+                rects += target.blits(blits)
+            else:
+                target.blits(blits, doreturn=False)
+        self.layers.clear()
+        return rects
+
+    def __len__(self):
+        return sum(len(blits) for blits in self.layers.values())
@@ -0,0 +1,130 @@
+# renderer.py
+# ----------------------------------------------------------
+# Draws a GameSimulation to the window.
+# Full mode redraws everything and flips, like the game always
+# did. Dirty-rect mode keeps a copy of the arena background and,
+# each frame, only restores the regions entities/HUD covered last
+# frame, redraws them, and pushes just those rects with
+# pygame.display.update(rects). Any frame where the background
+# itself changes (camera scroll, parallax, shake) is a full flip.
+# ----------------------------------------------------------
+import pygame
+from hud import HUD
+from render_queue import RenderQueue, LAYER_PLAYER
+from profiler import NULL_PROFILER
+
+# Past this many dirty rects one full flip is cheaper than the list
+MAX_DIRTY_RECTS = 400
+
+
+class GameRenderer:
+    def __init__(self, screen, arena, camera, dirty_rects=False, profiler=NULL_PROFILER):
+        self.screen = screen
+        self.arena = arena
+        self.camera = camera
+        self.dirty_rects = dirty_rects
+        self.profiler = profiler
+        self.hud = HUD()
+        self.queue = RenderQueue()  # entity blits, submitted with Surface.blits
+
+        # Dirty-rect state
+        self.background = None       # arena as drawn for background_drawn_for
+        self.background_drawn_for = None
+        self.last_dirty = []         # rects covered by dynamic content last frame
+        self.last_shake = (0, 0)
+        self.last_game_over = None
+        self.full_frames = 0         # stats: frames that needed a full flip
+        self.partial_frames = 0
+
+    # ---------------------------------------------------------
+    # Frame entry point
+    # ---------------------------------------------------------
+    def render(self, sim, alpha=1.0):
+        """Draw one frame of `sim` and push it to the display. `alpha` (0-1)
+        places entities between the previous simulation step and the latest."""
+        profiler = self.profiler
+        profiler.count("enemies", sim.enemy_manager.get_count())
+        profiler.count("bullets", len(sim.bullets))
+        if not self.dirty_rects:
+            with profiler.phase("arena"):
+                self.draw_background(self.screen)
+            self.draw_dynamic(sim, alpha)
+            with profiler.phase("flip"):
+                pygame.display.flip()
+            return
+
+        view = self.camera.get_view()
+        key = self.arena.background_key(view)
+        # shake only moves entities, and none are drawn on the game over screen
+        shake = (0, 0) if sim.game_over else (self.camera.offset_x, self.camera.offset_y)
+        full = (
+            key is None
+            or key != self.background_drawn_for
+            or shake != (0, 0)
+            or shake != self.last_shake
+            or sim.game_over != self.last_game_over
+        )
+        self.last_shake = shake
+        self.last_game_over = sim.game_over
+
+        if full:
+            with profiler.phase("arena"):
+                if self.background is None:
+                    self.background = self.screen.copy()
+                self.draw_background(self.background)
+                self.background_drawn_for = key
+                self.screen.blit(self.background, (0, 0))
+            self.last_dirty = self.draw_dynamic(sim, alpha)
+            with profiler.phase("flip"):
+                pygame.display.flip()
+            self.full_frames += 1
+            return
+
+        self.partial_frames += 1
+        if sim.game_over:
+            return  # the game over screen is static once drawn
+
+        # restore what last frame's entities/HUD covered, then redraw them
+        with profiler.phase("arena"):
+            for rect in self.last_dirty:
+                self.screen.blit(self.background, rect, rect)
+        dirty = self.draw_dynamic(sim, alpha)
+        changed = self.last_dirty + dirty
+        self.last_dirty = dirty
+        with profiler.phase("flip"):
+            if len(changed) > MAX_DIRTY_RECTS:
+                pygame.display.flip()
+            elif changed:
+                pygame.display.update(changed)
+
+    # ---------------------------------------------------------
+    # Layers
+    # ---------------------------------------------------------
+    def draw_background(self, target):
+        self.arena.draw(target, view=self.camera.get_view())  # only chunks in view
+
+    def draw_dynamic(self, sim, alpha=1.0):
+        """Draw everything that moves or changes; returns the rects it covered
+        (the game over screen returns none - it is only drawn on full frames)"""
+        if sim.game_over:
+            self.hud.draw_game_over(self.screen, sim)
+            return []
+
+        screen = self.screen
+        dirty = []
+
+        # Apply camera position + shake
+        cam_offset = self.camera.get_offset()
+        player = sim.player
+        with self.profiler.phase("entities"):
+            queue = self.queue
+            queue.add(player.image, player.interpolated_rect(alpha).move(cam_offset), LAYER_PLAYER)
+            sim.bullets.draw(screen, cam_offset, queue, alpha)
+            sim.enemy_manager.draw(screen, cam_offset, queue=queue, alpha=alpha)
+            dirty += queue.flush(screen)
+
+        with self.profiler.phase("hud"):
+            dirty += self.hud.draw(screen, sim)
+            if self.profiler.overlay_visible:
+                dirty += self.hud.draw_profiler(screen, self.profiler)
+        return dirty
@@ -0,0 +1,146 @@
+# replay.py
+# ----------------------------------------------------------
+# Replays: the seed plus every tick's input (and dt) of one
+# game. GameSimulation is deterministic for a given seed and
+# input stream, so re-running the inputs headlessly rebuilds
+# the exact same game - bit for bit, as fast as the CPU allows.
+# A checksum of the game state is stored per tick to find the
+# first tick where a replay stops matching (bug reports, or
+# checking two versions simulate the same run).
+#
+#   python replay.py replays/last_game.npz [--profile profile.json]
+# ----------------------------------------------------------
+import argparse, os, sys, time, zlib
+import numpy as np
+from config import WIDTH, HEIGHT
+from simulation import GameSimulation, Action
+from profiler import FrameProfiler
+
+REPLAY_VERSION = 1
+
+# One record per tick
+INPUT_DTYPE = np.dtype([
+    ("dt", "<f8"),
+    ("move", "i1", 2),
+    ("shoot", "?"),
+    ("aim", "<f8", 2),
+])
+
+
+def state_checksum(sim):
+    """CRC32 of everything that decides how the game continues"""
+    player = sim.player
+    enemies = sim.enemy_manager.store
+    bullets = sim.bullets.store
+    n, b = len(enemies), len(bullets)
+    header = np.array([
+        sim.ticks, sim.score, sim.wave, sim.game_over, sim.wave_complete,
+        sim.enemies_spawned_this_wave, sim.enemies_killed_this_wave,
+        player.rect.x, player.rect.y, player.health, player.invincibility_timer,
+    ], dtype=np.int64)
+    crc = zlib.crc32(header.tobytes())
+    for array in (enemies.pos[:n], enemies.health[:n], enemies.offset[:n], bullets.pos[:b]):
+        crc = zlib.crc32(np.ascontiguousarray(array).tobytes(), crc)
+    return crc
+
+
+class Replay:
+    def __init__(self, seed, map_path=None):
+        self.seed = seed
+        self.map_path = map_path  # arena the game was played in (None = built-in)
+        self.inputs = []          # (dt, move_x, move_y, shoot, aim) per tick
+        self.checksums = []       # state_checksum after each tick
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def record(self, action, dt, sim=None):
+        """Add one tick's input; pass the simulation (after stepping it) to
+        store its checksum too"""
+        self.inputs.append((dt, (action.move_x, action.move_y), action.shoot, tuple(action.aim)))
+        if sim is not None:
+            self.checksums.append(state_checksum(sim))
+
+    def actions(self):
+        """Yield (Action, dt) for every recorded tick"""
+        for dt, (move_x, move_y), shoot, aim in self.inputs:
+            yield Action(move_x, move_y, aim, shoot), dt
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # open the file ourselves so savez doesn't append ".npz" to other names
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                version=REPLAY_VERSION,
+                seed=np.uint64(self.seed),
+                map_path=self.map_path or "",
+                inputs=np.array(self.inputs, dtype=INPUT_DTYPE),
+                checksums=np.array(self.checksums, dtype=np.uint32),
+            )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            if int(data["version"]) != REPLAY_VERSION:
+                raise ValueError(f"{path}: replay version {int(data['version'])}, expected {REPLAY_VERSION}")
+            replay = cls(int(data["seed"]), str(data["map_path"]) or None)
+            inputs = data["inputs"]
+            replay.inputs = [
+                (float(dt), (int(move[0]), int(move[1])), bool(shoot), (float(aim[0]), float(aim[1])))
+                for dt, move, shoot, aim in zip(inputs["dt"], inputs["move"], inputs["shoot"], inputs["aim"])
+            ]
+            replay.checksums = data["checksums"].tolist()
+        return replay
+
+
+def play(replay, sim=None, verify=True):
+    """Re-simulate a replay headlessly. Returns (sim, first tick whose state
+    checksum differs from the recording, or None if every tick matched)."""
+    if sim is None:
+        from arena import Arena
+        sim = GameSimulation(arena=Arena(WIDTH, HEIGHT, replay.map_path))
+    sim.reset(replay.seed)
+    verify = verify and len(replay.checksums) == len(replay)
+    profiler = sim.profiler
+    for tick, (action, dt) in enumerate(replay.actions()):
+        profiler.begin_frame()
+        sim.step(action, dt)
+        profiler.end_frame()
+        if verify and state_checksum(sim) != replay.checksums[tick]:
+            return sim, tick
+    return sim, None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-simulate a replay headlessly and check it")
+    parser.add_argument("replay", help="replay file (.npz)")
+    parser.add_argument("--profile", metavar="JSON", help="time every phase of each tick and write the stats here")
+    args = parser.parse_args(argv)
+
+    replay = Replay.load(args.replay)
+    sim = None
+    if args.profile:
+        from arena import Arena
+        sim = GameSimulation(arena=Arena(WIDTH, HEIGHT, replay.map_path))
+        sim.profiler = FrameProfiler(history=max(1, len(replay)))
+    start = time.perf_counter()
+    sim, mismatch = play(replay, sim)
+    elapsed = time.perf_counter() - start
+    print(f"Replayed {len(replay)} ticks in {elapsed:.2f}s ({len(replay) / max(elapsed, 1e-9):.0f} ticks/s)"
+          f" - score {sim.score}, wave {sim.wave}")
+    if args.profile:
+        sim.profiler.dump(args.profile)
+        print(f"✅ Profile written to {args.profile}")
+    if mismatch is None:
+        print("✅ Every tick matches the recording")
+    else:
+        print(f"⚠️ Replay diverges at tick {mismatch}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
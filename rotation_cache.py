@@ -0,0 +1,72 @@
+# rotation_cache.py
+import pygame
+from collections import OrderedDict
+from config import ROTATION_STEPS, ROTATION_CACHE_SIZE
+from assets import get_scaled
+
+# ---------------------------------------------------------
+# RotationCache: a sprite pre-rotated at N quantized angles
+# ---------------------------------------------------------
+# pygame.transform.rotate allocates a new Surface on every call.
+# Aiming only needs ROTATION_STEPS distinct angles (360 = 1°),
+# so each angle is rendered once and reused. Frames are made
+# lazily and kept in an LRU; prerender() fills the whole atlas
+# up front when startup time is cheaper than the first spins.
+# ---------------------------------------------------------
+class RotationCache:
+    def __init__(self, image, steps=ROTATION_STEPS, max_cached=ROTATION_CACHE_SIZE):
+        self.image = image
+        self.steps = steps
+        self.max_cached = max_cached
+        self.frames = OrderedDict()  # angle index -> (surface, pivot offset)
+        self.hits = 0
+        self.misses = 0
+
+    def quantize(self, angle):
+        """Angle in degrees -> index of the nearest pre-rendered angle"""
+        return round(angle * self.steps / 360) % self.steps
+
+    def get(self, angle):
+        """Return (surface, offset) for an angle in degrees (pygame's
+        counter-clockwise convention). offset is the surface's top-left
+        relative to the sprite centre, so blit at center + offset."""
+        return self.get_index(self.quantize(angle))
+
+    def get_index(self, index):
+        frame = self.frames.get(index)
+        if frame is not None:
+            self.hits += 1
+            self.frames.move_to_end(index)
+            return frame
+
+        self.misses += 1
+        surface = pygame.transform.rotate(self.image, index * 360 / self.steps)
+        width, height = surface.get_size()
+        frame = (surface, (-(width // 2), -(height // 2)))
+        self.frames[index] = frame
+        if self.max_cached is not None and len(self.frames) > self.max_cached:
+            self.frames.popitem(last=False)
+        return frame
+
+    def prerender(self):
+        """Render every angle now (bounded by max_cached)"""
+        for index in range(self.steps):
+            self.get_index(index)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "cached": len(self.frames)}
+
+
+# One cache per (source image, scale, steps), shared by every sprite using it
+_shared_caches = {}
+
+
+def get_rotation_cache(source, scale=1, steps=ROTATION_STEPS):
+    """Shared RotationCache for `source` scaled by `scale`"""
+    key = (id(source), scale, steps)
+    entry = _shared_caches.get(key)
+    if entry is None or entry[0] is not source:
+        # keep a reference to source so its id can't be reused while cached
+        entry = (source, RotationCache(get_scaled(source, scale), steps))
+        _shared_caches[key] = entry
+    return entry[1]
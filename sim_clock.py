@@ -0,0 +1,152 @@
+# sim_clock.py
+# ----------------------------------------------------------
+# Simulation time. The game loop advances the clock once per
+# step with that step's dt, so cooldowns, lifetimes and delays
+# follow game time - not the wall clock - and stay correct when
+# the simulation runs headless, fast-forwarded or replayed.
+# FixedStep feeds the game loop whole steps of one size from
+# the wall clock, at any time scale.
+# ----------------------------------------------------------
+import heapq
+from time import perf_counter
+from config import FPS
+
+# Milliseconds of game time that pass per unit of dt (dt=1 is one 60fps frame)
+MS_PER_FRAME = 1000 / FPS
+
+
+def ms_to_frames(ms):
+    """Convert a duration in ms to game-time frames (dt units)"""
+    return ms * FPS / 1000  # exact for whole-frame durations, unlike ms / MS_PER_FRAME
+
+
+class SimClock:
+    """Tick counter plus accumulated game time, with a heap of timers that
+    fire on a given tick"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.ticks = 0      # steps taken
+        self.time = 0.0     # game time in frames (sum of dt)
+        self.timers = []    # heap of (due tick, order, callback)
+        self.scheduled = 0  # timers ever scheduled (keeps same-tick timers in order)
+
+    @property
+    def time_ms(self):
+        return self.time * MS_PER_FRAME
+
+    def advance(self, dt=1.0):
+        """Start the next tick"""
+        self.ticks += 1
+        self.time += dt
+
+    def schedule(self, delay_ticks, callback):
+        """Call `callback()` from the first run_due() on a tick at least
+        `delay_ticks` after this one. Returns a handle for cancel()."""
+        timer = [self.ticks + delay_ticks, self.scheduled, callback]
+        self.scheduled += 1
+        heapq.heappush(self.timers, timer)
+        return timer
+
+    def cancel(self, timer):
+        timer[2] = None  # left in the heap, skipped when it comes due
+
+    def run_due(self):
+        """Fire every timer due by the current tick, in due order"""
+        timers = self.timers
+        while timers and timers[0][0] <= self.ticks:
+            callback = heapq.heappop(timers)[2]
+            if callback is not None:
+                callback()
+
+    def pending(self):
+        return sum(1 for timer in self.timers if timer[2] is not None)
+
+
+# Speeds the time scale steps through (slower() / faster())
+TIME_SCALES = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0)
+
+
+class FixedStep:
+    """Turns wall-clock time into whole simulation steps of one fixed size,
+    so the game plays the same at any frame rate.
+
+    Real time (times the time scale) builds up in an accumulator and every
+    full step's worth is simulated; what is left over is `alpha`, how far
+    the display is between the last two steps. A time scale of None means
+    unbounded: step as fast as possible for one frame's worth of wall time.
+    """
+
+    def __init__(self, time_scale=1.0, max_steps=5, step_ms=MS_PER_FRAME):
+        self.step_ms = step_ms
+        self.max_steps = max_steps  # per frame at 1x; past this, time is dropped
+        self.accumulator = 0.0      # real ms (scaled) not simulated yet
+        self.steps = 0              # stats
+        self.dropped_ms = 0.0
+        self.set_time_scale(time_scale)
+
+    @property
+    def unbounded(self):
+        return self.time_scale is None
+
+    @property
+    def alpha(self):
+        """Fraction (0-1) of a step the display is past the latest state"""
+        if self.unbounded:
+            return 1.0
+        return self.accumulator / self.step_ms
+
+    def set_time_scale(self, scale):
+        """Clamp to the TIME_SCALES range (None = unbounded)"""
+        if scale is not None:
+            scale = min(max(scale, TIME_SCALES[0]), TIME_SCALES[-1])
+        self.time_scale = scale
+        self.accumulator = 0.0
+
+    def slower(self):
+        if self.unbounded:
+            self.set_time_scale(TIME_SCALES[-1])
+        else:
+            self.set_time_scale(max([s for s in TIME_SCALES if s < self.time_scale], default=TIME_SCALES[0]))
+
+    def faster(self):
+        if not self.unbounded:
+            self.set_time_scale(min([s for s in TIME_SCALES if s > self.time_scale], default=TIME_SCALES[-1]))
+
+    def toggle_unbounded(self):
+        self.set_time_scale(1.0 if self.unbounded else None)
+
+    def run(self, real_ms, step):
+        """Call `step()` once per whole step due after `real_ms` of wall time.
+        A `step()` returning False ran nothing (the game is over): stop there,
+        without counting it. Returns the number of steps run."""
+        if self.unbounded:
+            # as many steps as fit in the time one frame would take
+            deadline = perf_counter() + self.step_ms / 1000
+            count = 0
+            while perf_counter() < deadline:
+                if step() is False:
+                    break
+                count += 1
+            self.steps += count
+            return count
+
+        self.accumulator += real_ms * self.time_scale
+        # a slow frame runs at most max_steps (x time scale) steps to catch up;
+        # the rest of the time is dropped rather than spiralling
+        limit = max(1, int(self.max_steps * self.time_scale))
+        count = 0
+        while self.accumulator >= self.step_ms:
+            if count == limit:
+                self.dropped_ms += self.accumulator - self.accumulator % self.step_ms
+                self.accumulator %= self.step_ms
+                break
+            if step() is False:
+                self.accumulator = 0.0
+                break
+            self.accumulator -= self.step_ms
+            count += 1
+        self.steps += count
+        return count
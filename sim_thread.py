@@ -0,0 +1,209 @@
+# sim_thread.py
+# ----------------------------------------------------------
+# Runs the simulation on its own thread so a slow frame
+# (Arena.draw, a flip waiting on the display) no longer holds
+# up input handling and physics. After each batch of fixed
+# steps the simulation thread publishes an immutable
+# SimSnapshot into a SnapshotBuffer; the render thread takes
+# the newest one and draws it. pygame's blits and flips release
+# the GIL while they run, so the two threads really overlap.
+#
+#   buffers=2  double buffered: the simulation waits until the
+#              last snapshot was taken (every one gets drawn)
+#   buffers=3  triple buffered: the simulation never waits; a
+#              snapshot not taken in time is replaced (dropped)
+# ----------------------------------------------------------
+import threading, time
+from collections import deque
+from queue import SimpleQueue, Empty
+from time import perf_counter
+import numpy as np
+
+# Snapshot ages (ms) kept for the latency stats
+LATENCY_HISTORY = 600
+
+
+class SnapshotBuffer:
+    """Hand-off of snapshots from one producer thread to one consumer thread"""
+
+    def __init__(self, buffers=3):
+        if buffers not in (2, 3):
+            raise ValueError(f"buffers must be 2 (double) or 3 (triple), got {buffers}")
+        self.buffers = buffers
+        self.cond = threading.Condition()
+        self.ready = None      # published, not taken yet
+        self.front = None      # taken by the consumer (being drawn)
+        self.last_shown = None
+        self.closed = False
+        # stats
+        self.published = 0
+        self.taken = 0
+        self.dropped = 0       # replaced before the consumer took them
+        self.repeats = 0       # takes that got the same snapshot again
+        self.wait_ms = 0.0     # producer time spent waiting (double buffering)
+        self.latency = deque(maxlen=LATENCY_HISTORY)  # ms from created to shown
+
+    def publish(self, snapshot):
+        """Make `snapshot` the newest one. Double buffered, this first waits
+        for the consumer to take the previous one."""
+        with self.cond:
+            if self.buffers == 2 and self.ready is not None:
+                start = perf_counter()
+                while self.ready is not None and not self.closed:
+                    self.cond.wait(0.1)
+                self.wait_ms += (perf_counter() - start) * 1000
+            if self.ready is not None:
+                self.dropped += 1
+            self.ready = snapshot
+            self.published += 1
+            self.cond.notify_all()
+
+    def take(self):
+        """Newest snapshot (the last one again if nothing new was published)"""
+        with self.cond:
+            if self.ready is None:
+                if self.front is not None:
+                    self.repeats += 1
+                return self.front
+            self.front, self.ready = self.ready, None
+            self.taken += 1
+            self.cond.notify_all()
+            return self.front
+
+    def shown(self, snapshot):
+        """Record that `snapshot` reached the screen (for the latency stats);
+        drawing the same one again is not new latency"""
+        if snapshot is self.last_shown:
+            return
+        self.last_shown = snapshot
+        self.latency.append((perf_counter() - snapshot.created) * 1000)
+
+    def close(self):
+        """Release a producer waiting in publish()"""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def stats(self):
+        latency = np.fromiter(self.latency, dtype=float)
+        return {
+            "buffers": self.buffers,
+            "published": self.published,
+            "taken": self.taken,
+            "dropped": self.dropped,
+            "repeats": self.repeats,
+            "producer_wait_ms": self.wait_ms,
+            "latency_ms": {
+                "mean": float(latency.mean()) if len(latency) else 0.0,
+                "p95": float(np.percentile(latency, 95)) if len(latency) else 0.0,
+                "max": float(latency.max()) if len(latency) else 0.0,
+            },
+        }
+
+
+class OverlapMeter:
+    """Wall time each thread spends busy, and how much of it both are busy at once"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.since = perf_counter()
+        self.started = {}      # name -> start of its current busy stretch
+        self.busy_ms = {}      # name -> total busy ms
+        self.overlap_ms = 0.0  # ms with two or more threads busy
+
+    def _advance(self, now):
+        if self.active >= 2:
+            self.overlap_ms += (now - self.since) * 1000
+        self.since = now
+
+    def begin(self, name):
+        with self.lock:
+            now = perf_counter()
+            self._advance(now)
+            self.active += 1
+            self.started[name] = now
+
+    def end(self, name):
+        with self.lock:
+            now = perf_counter()
+            self._advance(now)
+            self.active -= 1
+            self.busy_ms[name] = self.busy_ms.get(name, 0.0) + (now - self.started.pop(name)) * 1000
+
+    def stats(self):
+        """Busy ms per thread, ms both were busy, and that as a share of the
+        less busy thread's time (1.0 = it always ran alongside the other)"""
+        with self.lock:
+            busy = dict(self.busy_ms)
+            overlap = self.overlap_ms
+        least = min(busy.values(), default=0.0)
+        return {
+            "busy_ms": busy,
+            "overlap_ms": overlap,
+            "overlap_share": overlap / least if least else 0.0,
+        }
+
+
+class SimulationThread(threading.Thread):
+    """Steps the simulation with a FixedStep on its own thread.
+
+    `step()` runs one fixed step (False once there is nothing left to
+    simulate) and `snapshot()` returns the immutable state to publish after
+    each batch of steps. Anything else that touches the simulation - restarts,
+    speed changes - goes through call(), so it runs between steps.
+    """
+
+    def __init__(self, step, snapshot, stepper, buffer, meter=None):
+        super().__init__(name="simulation", daemon=True)
+        self.step = step
+        self.snapshot = snapshot
+        self.stepper = stepper
+        self.buffer = buffer
+        self.meter = meter or OverlapMeter()
+        self.requests = SimpleQueue()
+        self.stopping = threading.Event()
+
+    def call(self, fn):
+        """Run `fn()` on the simulation thread before its next step"""
+        self.requests.put(fn)
+
+    def stop(self):
+        self.stopping.set()
+        self.buffer.close()
+        self.join()
+
+    def _run_requests(self):
+        ran = False
+        while True:
+            try:
+                fn = self.requests.get_nowait()
+            except Empty:
+                return ran
+            fn()
+            ran = True
+
+    def run(self):
+        stepper = self.stepper
+        last = perf_counter()
+        while not self.stopping.is_set():
+            now = perf_counter()
+            real_ms, last = (now - last) * 1000, now
+            self.meter.begin("sim")
+            changed = self._run_requests()
+            ran = stepper.run(real_ms, self.step)
+            # nothing new to show (game over, or no step due yet): keep the
+            # snapshot already published
+            if ran or changed:
+                self.buffer.publish(self.snapshot())
+            self.meter.end("sim")
+            if not stepper.unbounded:
+                # sleep until the next step is due
+                due_ms = (stepper.step_ms - stepper.accumulator) / stepper.time_scale
+                self.stopping.wait(max(due_ms, 0.0) / 1000)
+            elif not ran:
+                # nothing left to simulate: check for requests once a step
+                # instead of spinning
+                self.stopping.wait(stepper.step_ms / 1000)
+            else:
+                time.sleep(0)  # let the render thread have the GIL
@@ -0,0 +1,229 @@
+# simulation.py
+# ----------------------------------------------------------
+# Headless game rules.
+# GameSimulation runs exactly what main.py's loop used to do
+# (wave spawning, movement, bullets, enemies, collisions, wave
+# timer) but without a window, event polling or clock.tick,
+# so it can be stepped as fast as the CPU allows for bots
+# and regression tests. main.py just renders its state.
+# ----------------------------------------------------------
+from time import perf_counter
+import numpy as np
+from config import WIDTH, HEIGHT, SCORE_PER_KILL, ARENA_MAP, ENEMY_PATHFINDING
+from assets import load_game_sprites
+from player import Player
+from bullet import BulletGroup
+from enemy import EnemyManager, FLOW_DIRECT_STEPS
+from flow_field import FlowField
+from sim_clock import SimClock
+from profiler import NULL_PROFILER
+
+# Spawn zones: this far in from the left and right edges of the world
+SPAWN_MARGIN = 50
+
+# How long the "wave complete" pause lasts (ticks)
+WAVE_COMPLETE_DELAY = 120  # 2 seconds at 60fps
+
+
+class Action:
+    """One frame of player input"""
+
+    def __init__(self, move_x=0, move_y=0, aim=(WIDTH // 2, HEIGHT // 2), shoot=False):
+        self.move_x = move_x  # -1 (left), 0 or 1 (right)
+        self.move_y = move_y  # -1 (up), 0 or 1 (down)
+        self.aim = aim        # point the player faces and shoots at
+        self.shoot = shoot    # trigger held this frame
+
+
+class SimSnapshot:
+    """Frozen copy of what the renderer and HUD read from a GameSimulation,
+    taken at one tick. Entity arrays are read-only copies, so it can be drawn
+    on one thread while the simulation keeps stepping on another."""
+
+    def __init__(self, sim, shake=(0, 0)):
+        self.created = perf_counter()
+        self.ticks = sim.ticks
+        self.seed = sim.seed
+        self.score = sim.score
+        self.game_over = sim.game_over
+        self.wave = sim.wave
+        self.wave_complete = sim.wave_complete
+        self.enemies_per_wave = sim.enemies_per_wave
+        self.enemies_killed_this_wave = sim.enemies_killed_this_wave
+        self.player = sim.player.snapshot()
+        self.bullets = sim.bullets.snapshot()
+        self.enemy_manager = sim.enemy_manager.snapshot()
+        self.shake = shake  # camera shake offset to draw with
+
+
+class GameSimulation:
+    """Game state plus the rules that advance it one frame at a time"""
+
+    def __init__(self, sprites=None, arena=None):
+        # Sprites decide rect sizes, so headless runs still load them (no window needed)
+        self.sprites = sprites or load_game_sprites()
+        if arena is None:
+            from arena import Arena
+            arena = Arena(WIDTH, HEIGHT, ARENA_MAP)
+        self.arena = arena
+        self.enemy_manager = EnemyManager(self.sprites["enemies"])
+        self.bullets = BulletGroup()
+        # one flow field steers every enemy around the obstacles towards the player
+        self.flow_field = None
+        if ENEMY_PATHFINDING:
+            self.flow_field = FlowField.from_arena(
+                arena, clearance=float(self.enemy_manager.half_size.max()), direct_steps=FLOW_DIRECT_STEPS)
+        self.profiler = NULL_PROFILER  # set a FrameProfiler to time each phase of step()
+        self.reset()
+
+    def reset(self, seed=None):
+        """Start a fresh game from wave 1.
+
+        All game randomness comes from self.rng, seeded here, so the same seed
+        and the same inputs always replay the same game. Without a seed a fresh
+        one is drawn (and kept in self.seed so the run can be recorded)."""
+        if seed is None:
+            seed = int(np.random.SeedSequence().generate_state(1)[0])
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        world_width, world_height = self.arena.world_size
+        self.player = Player(world_width // 2, world_height // 2, self.sprites["player"])
+        # entity pools are kept (emptied) between games
+        self.bullets.empty()
+        self.enemy_manager.reset(self.rng)
+
+        self.score = 0
+        self.game_over = False
+        self.wave = 1
+        self.enemies_per_wave = 5
+        self.enemies_spawned_this_wave = 0
+        self.enemies_killed_this_wave = 0
+        self.wave_complete = False
+
+        # Simulation clock (replaces pygame.time.get_ticks for cooldowns/lifetimes)
+        # and its timers (the wave complete pause)
+        self.clock = SimClock()
+
+    def pool_stats(self):
+        """Usage of the bullet and enemy pools (high-water marks etc.), to size
+        BULLET_POOL_SIZE / ENEMY_POOL_SIZE"""
+        return {
+            "bullets": self.bullets.store.stats(),
+            "enemies": self.enemy_manager.store.stats(),
+        }
+
+    def snapshot(self, shake=(0, 0)):
+        """SimSnapshot of the current state (for drawing on another thread)"""
+        return SimSnapshot(self, shake)
+
+    @property
+    def ticks(self):
+        return self.clock.ticks
+
+    @property
+    def time_ms(self):
+        return self.clock.time_ms
+
+    def step(self, action=None, dt=1.0):
+        """Advance one frame. Returns the list of events that happened
+        ("shoot", "kill", "hit", "wave_complete", "game_over")."""
+        if action is None:
+            action = Action()
+        events = []
+        self.clock.advance(dt)
+
+        if self.game_over:
+            return events
+
+        player = self.player
+
+        # ---- Shooting ----
+        if action.shoot and player.can_shoot():
+            player.shoot(self.bullets, self.sprites["bullet"], action.aim)
+            events.append("shoot")
+
+        # ---- Wave System: Spawn enemies from left and right ----
+        if not self.wave_complete:
+            self.spawn_wave_enemy()
+
+        # ---- Update ----
+        profiler = self.profiler
+        with profiler.phase("player"):
+            player.prev_center = player.rect.center
+            player.move(action.move_x, action.move_y, dt)
+            player.aim_and_rotate(action.aim)
+            player.update_invincibility()
+            player.update_fire_cooldown(dt)
+
+            # Check collision with obstacles - push player back
+            obstacle_rects = self.arena.obstacle_rects
+            for index in self.arena.query_obstacles(player.rect):
+                if player.rect.colliderect(obstacle_rects[index]):
+                    player.rect.x -= player.vel_x * dt
+                    player.rect.y -= player.vel_y * dt
+
+        with profiler.phase("bullet_update"):
+            self.bullets.update(dt)
+
+        with profiler.phase("enemy_update"):
+            # the field is only needed (and kept pointed at the player) while
+            # there are enemies to follow it
+            if self.flow_field is not None and self.enemy_manager.get_count():
+                self.flow_field.update(player.rect.center)
+            self.enemy_manager.update(dt, player.rect.center, self.flow_field)
+
+        # ---- Check Collisions ----
+        with profiler.phase("collisions"):
+            # Bullets vs Enemies (and obstacles, which absorb them)
+            kills = self.enemy_manager.check_bullet_collisions(self.bullets, self.arena.obstacle_grid)
+            if kills > 0:
+                self.score += kills * SCORE_PER_KILL
+                self.enemies_killed_this_wave += kills
+                events.append("kill")
+
+            # Enemies vs Player
+            if self.enemy_manager.check_player_collision(player.rect):
+                if player.take_damage(1):
+                    events.append("hit")
+
+        # Check if player died
+        if not player.is_alive():
+            self.game_over = True
+            events.append("game_over")
+
+        # ---- Wave Complete Check ----
+        if self.enemies_killed_this_wave >= self.enemies_per_wave and not self.wave_complete:
+            self.wave_complete = True
+            # the step that clears the wave is the first of the pause
+            self.clock.schedule(WAVE_COMPLETE_DELAY - 1, self.start_next_wave)
+            events.append("wave_complete")
+
+        # scheduled events due by the end of this tick (next wave)
+        self.clock.run_due()
+
+        return events
+
+    def spawn_wave_enemy(self):
+        """Spawn the next enemy of the current wave, alternating edges"""
+        if self.enemies_spawned_this_wave >= self.enemies_per_wave:
+            return
+        if self.enemy_manager.get_count() >= self.enemies_per_wave:
+            return
+        world_width, world_height = self.arena.world_size
+        spawn_x = SPAWN_MARGIN if self.enemies_spawned_this_wave % 2 == 0 else world_width - SPAWN_MARGIN
+        spawn_y = world_height // 2 + (self.enemies_spawned_this_wave - self.enemies_per_wave // 2) * 80
+
+        # Clamp Y position
+        spawn_y = max(100, min(world_height - 100, spawn_y))
+
+        self.enemy_manager.spawn_enemy_at(spawn_x, spawn_y)
+        self.enemies_spawned_this_wave += 1
+
+    def start_next_wave(self):
+        self.wave += 1
+        self.enemies_per_wave = 5 + self.wave * 2  # More enemies each wave
+        self.enemies_spawned_this_wave = 0
+        self.enemies_killed_this_wave = 0
+        self.wave_complete = False
+        # Increase enemy difficulty
+        self.enemy_manager.increase_difficulty()
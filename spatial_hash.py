@@ -0,0 +1,176 @@
+# spatial_hash.py
+import numpy as np
+from config import TILE_SIZE
+
+# Cell coordinates are biased so negative cells (off-screen entities) still
+# pack into a single non-negative int64 key
+CELL_BIAS = 1 << 20
+KEY_STRIDE = 1 << 21
+
+# Below this many (query x item) pairs a direct overlap matrix is cheaper
+# than probing the grid, and building the grid only pays off for a batch of
+# at least this many query boxes
+BRUTE_FORCE_PAIRS = 512
+MIN_BATCH_TO_INDEX = 16
+
+
+def cover_cells(mins, maxs, cell_size):
+    """Expand boxes into (owner, cell x, cell y) entries for every grid cell
+    they touch. `cell_size` may be a number or an (x, y) pair."""
+    c0 = np.floor_divide(mins, cell_size).astype(np.int64)
+    c1 = np.floor_divide(maxs, cell_size).astype(np.int64)
+    span_x = c1[:, 0] - c0[:, 0] + 1
+    span_y = c1[:, 1] - c0[:, 1] + 1
+    per_box = span_x * span_y
+    owner = np.repeat(np.arange(len(mins)), per_box)
+    # index of each entry within its box, walked row by row
+    local = np.arange(len(owner)) - np.repeat(np.cumsum(per_box) - per_box, per_box)
+    cx = c0[owner, 0] + local // span_y[owner]
+    cy = c0[owner, 1] + local % span_y[owner]
+    return owner, cx, cy
+
+
+def sweep_times(start, delta, mins, maxs):
+    """Slab test of segments start + t * delta (t in 0..1) against boxes, all
+    (N, 2). Returns the first t inside each box (0 if a segment starts inside
+    it), or inf where the segment misses. Touching edges do not count, the
+    same as the overlap test in SpatialHash.query."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t0 = (mins - start) / delta
+        t1 = (maxs - start) / delta
+    enter = np.minimum(t0, t1)
+    leave = np.maximum(t0, t1)
+    # no movement along an axis: inside that slab for all t, or never
+    still = delta == 0
+    inside = (mins < start) & (start < maxs)
+    enter[still] = np.where(inside[still], -np.inf, np.inf)
+    leave[still] = np.where(inside[still], np.inf, -np.inf)
+    enter = np.maximum(enter.max(axis=1), 0.0)
+    leave = np.minimum(leave.min(axis=1), 1.0)
+    return np.where(enter < leave, enter, np.inf)
+
+
+def _cover_cells(mins, maxs, cell_size):
+    """Expand boxes into (owner, cell key) entries for every grid cell they touch"""
+    owner, cx, cy = cover_cells(mins, maxs, cell_size)
+    return owner, (cx + CELL_BIAS) * KEY_STRIDE + (cy + CELL_BIAS)
+
+
+class SpatialHash:
+    """Uniform grid broadphase for axis-aligned boxes.
+
+    Items are stored sorted by cell key, so a whole batch of query boxes is
+    answered with two searchsorted calls instead of testing every pair.
+    The grid is only built when a query is big enough to need it; tiny
+    queries test every pair directly. Overlap uses the same strict test as
+    Rect.colliderect.
+    """
+
+    def __init__(self, cell_size=TILE_SIZE):
+        self.cell_size = cell_size
+        self.clear()
+
+    def clear(self):
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.items = np.zeros(0, dtype=np.int64)
+        self.mins = np.zeros((0, 2))
+        self.maxs = np.zeros((0, 2))
+        self.indexed = True
+
+    def __len__(self):
+        return len(self.mins)
+
+    def rebuild(self, mins, maxs):
+        """Index boxes given as (N, 2) min/max corner arrays; item i is box i"""
+        self.mins = np.array(mins, dtype=float).reshape(-1, 2)
+        self.maxs = np.array(maxs, dtype=float).reshape(-1, 2)
+        self.indexed = False
+
+    def _index(self):
+        owner, keys = _cover_cells(self.mins, self.maxs, self.cell_size)
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.items = owner[order]
+        self.indexed = True
+
+    def rebuild_rects(self, rects):
+        """Index a list of pygame Rects"""
+        boxes = np.array([(r.left, r.top, r.right, r.bottom) for r in rects], dtype=float).reshape(-1, 4)
+        self.rebuild(boxes[:, :2], boxes[:, 2:])
+
+    def remove(self, dead):
+        """Drop items where the boolean mask is True and renumber the rest,
+        matching EntityStore.remove compaction (no re-sort needed)"""
+        keep = ~dead
+        if self.indexed:
+            new_index = np.cumsum(keep) - 1
+            entry_keep = keep[self.items]
+            self.keys = self.keys[entry_keep]
+            self.items = new_index[self.items[entry_keep]]
+        self.mins = self.mins[keep]
+        self.maxs = self.maxs[keep]
+
+    def query(self, mins, maxs):
+        """Return (query_index, item_index) arrays for every overlapping pair,
+        sorted by query index then item index"""
+        mins = np.asarray(mins, dtype=float).reshape(-1, 2)
+        maxs = np.asarray(maxs, dtype=float).reshape(-1, 2)
+        empty = np.zeros(0, dtype=np.int64)
+        if len(mins) == 0 or len(self.mins) == 0:
+            return empty, empty
+        if len(mins) * len(self.mins) <= BRUTE_FORCE_PAIRS:
+            return self._query_all_pairs(mins, maxs)
+        if not self.indexed:
+            if len(mins) < MIN_BATCH_TO_INDEX:
+                return self._query_all_pairs(mins, maxs)
+            self._index()
+
+        owner, keys = _cover_cells(mins, maxs, self.cell_size)
+        start = np.searchsorted(self.keys, keys, side="left")
+        count = np.searchsorted(self.keys, keys, side="right") - start
+        total = int(count.sum())
+        if total == 0:
+            return empty, empty
+        q = np.repeat(owner, count)
+        local = np.arange(total) - np.repeat(np.cumsum(count) - count, count)
+        items = self.items[np.repeat(start, count) + local]
+
+        # a pair shows up once per shared cell - keep one
+        # (sort + compare neighbours: much faster than np.unique's hashing here)
+        pair = np.sort(q * len(self.mins) + items)
+        pair = pair[np.concatenate(([True], pair[1:] != pair[:-1]))]
+        q, items = pair // len(self.mins), pair % len(self.mins)
+
+        # exact overlap test on the candidates
+        overlap = ((mins[q, 0] < self.maxs[items, 0]) & (self.mins[items, 0] < maxs[q, 0]) &
+                   (mins[q, 1] < self.maxs[items, 1]) & (self.mins[items, 1] < maxs[q, 1]))
+        return q[overlap], items[overlap]
+
+    def query_swept(self, start, end, half_size=0):
+        """Boxes of half size `half_size` moving in a straight line from
+        `start` to `end` (N, 2 centres each). Return (query_index, item_index,
+        entry time) for every item a moving box touches on the way, sorted by
+        query index then entry time (0 = at start, 1 = at end)."""
+        start = np.asarray(start, dtype=float).reshape(-1, 2)
+        end = np.asarray(end, dtype=float).reshape(-1, 2)
+        half_size = np.asarray(half_size, dtype=float)
+        # broadphase: boxes around each whole path
+        q, items = self.query(np.minimum(start, end) - half_size, np.maximum(start, end) + half_size)
+        if len(q) == 0:
+            return q, items, np.zeros(0)
+        t = sweep_times(start[q], end[q] - start[q],
+                        self.mins[items] - half_size, self.maxs[items] + half_size)
+        hit = t <= 1
+        q, items, t = q[hit], items[hit], t[hit]
+        order = np.lexsort((t, q))
+        return q[order], items[order], t[order]
+
+    def _query_all_pairs(self, mins, maxs):
+        overlap = ((mins[:, None, 0] < self.maxs[None, :, 0]) & (self.mins[None, :, 0] < maxs[:, None, 0]) &
+                   (mins[:, None, 1] < self.maxs[None, :, 1]) & (self.mins[None, :, 1] < maxs[:, None, 1]))
+        return np.nonzero(overlap)
+
+    def query_rect(self, rect):
+        """Indices of items overlapping a single pygame Rect"""
+        _, items = self.query((rect.left, rect.top), (rect.right, rect.bottom))
+        return items
@@ -0,0 +1,399 @@
+# tmx.py
+# ----------------------------------------------------------
+# Tiled (.tmx) map loader.
+# Parses tilesets, (infinite) chunked CSV layers and tile
+# animations into NumPy chunk arrays, pre-renders each chunk to
+# a Surface, and caches the parsed arrays as a binary .npz in
+# CACHE_DIR so later launches skip the XML entirely.
+# ----------------------------------------------------------
+import os
+import json
+import zlib
+import xml.etree.ElementTree as ET
+import numpy as np
+import pygame
+from assets import load_image
+from chunk_grid import visible_chunks
+
+# Tiled stores flip flags in the top bits of each gid
+FLIP_H = 0x80000000
+FLIP_V = 0x40000000
+FLIP_D = 0x20000000
+GID_MASK = 0x1FFFFFFF
+
+CACHE_DIR = ".tmx_cache"
+CACHE_VERSION = 1
+
+
+def _parse_csv(text):
+    return np.array([int(value) for value in text.split(",")], dtype=np.uint32)
+
+
+def _parse_properties(elem):
+    props = elem.find("properties")
+    if props is None:
+        return {}
+    return {p.get("name"): p.get("value", p.text) for p in props.findall("property")}
+
+
+def _parse_tileset(elem, base_dir):
+    """Tileset element (inline or external .tsx) -> plain dict"""
+    firstgid = int(elem.get("firstgid", 1))
+    source = elem.get("source")
+    if source:
+        # external .tsx tileset - image paths are relative to the .tsx file
+        tsx_path = os.path.join(base_dir, source)
+        base_dir = os.path.dirname(tsx_path)
+        elem = ET.parse(tsx_path).getroot()
+    image = elem.find("image")
+    animations = {}
+    for tile in elem.findall("tile"):
+        frames = tile.find("animation")
+        if frames is not None:
+            animations[int(tile.get("id"))] = [
+                [int(f.get("tileid")), int(f.get("duration"))] for f in frames.findall("frame")
+            ]
+    return {
+        "firstgid": firstgid,
+        "name": elem.get("name", ""),
+        "tilewidth": int(elem.get("tilewidth")),
+        "tileheight": int(elem.get("tileheight")),
+        "tilecount": int(elem.get("tilecount", 0)),
+        "columns": int(elem.get("columns", 0)),
+        "image": os.path.normpath(os.path.join(base_dir, image.get("source"))) if image is not None else None,
+        "animations": animations,
+    }
+
+
+def parse_tmx(path, chunk_size=16):
+    """Stream-parse a .tmx file. Returns (meta dict, per-layer {(cx, cy): gid array}).
+
+    Chunk keys are chunk indices (tile coordinate // chunk_size). Finite maps
+    are split into chunks of the same size so both kinds look alike.
+    """
+    base_dir = os.path.dirname(path)
+    meta = {"tilesets": [], "layers": []}
+    layers_chunks = []
+    groups = []  # stack of (visible, opacity) for nested <group>s
+    layer = None
+    chunks = None
+
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if tag == "map":
+                meta["tilewidth"] = int(elem.get("tilewidth"))
+                meta["tileheight"] = int(elem.get("tileheight"))
+                meta["width"] = int(elem.get("width"))
+                meta["height"] = int(elem.get("height"))
+                meta["infinite"] = elem.get("infinite") == "1"
+            elif tag == "group":
+                visible = elem.get("visible", "1") != "0"
+                opacity = float(elem.get("opacity", 1))
+                if groups:
+                    visible = visible and groups[-1][0]
+                    opacity *= groups[-1][1]
+                groups.append((visible, opacity))
+            elif tag == "layer":
+                visible = elem.get("visible", "1") != "0"
+                opacity = float(elem.get("opacity", 1))
+                if groups:
+                    visible = visible and groups[-1][0]
+                    opacity *= groups[-1][1]
+                layer = {"name": elem.get("name", ""), "visible": visible, "opacity": opacity}
+                chunks = {}
+            continue
+
+        if tag == "tileset":
+            meta["tilesets"].append(_parse_tileset(elem, base_dir))
+            elem.clear()
+        elif tag == "chunk" and layer is not None:
+            x, y = int(elem.get("x")), int(elem.get("y"))
+            w, h = int(elem.get("width")), int(elem.get("height"))
+            gids = _parse_csv(elem.text).reshape(h, w)
+            _store_chunks(chunks, gids, x, y, chunk_size)
+            elem.clear()
+        elif tag == "data" and layer is not None and not chunks:
+            if elem.get("encoding") != "csv":
+                raise ValueError(f"{path}: only CSV layer data is supported")
+            if elem.text and elem.text.strip():
+                gids = _parse_csv(elem.text).reshape(meta["height"], meta["width"])
+                _store_chunks(chunks, gids, 0, 0, chunk_size)
+        elif tag == "layer" and layer is not None:
+            layer["properties"] = _parse_properties(elem)
+            meta["layers"].append(layer)
+            layers_chunks.append(chunks)
+            layer = None
+            elem.clear()
+        elif tag == "group":
+            groups.pop()
+
+    meta["chunk_size"] = chunk_size
+    return meta, layers_chunks
+
+
+def _store_chunks(chunks, gids, x, y, chunk_size):
+    """Cut a block of gids at tile (x, y) into chunk_size squares, dropping empty ones"""
+    h, w = gids.shape
+    for ty in range(0, h, chunk_size):
+        for tx in range(0, w, chunk_size):
+            block = gids[ty:ty + chunk_size, tx:tx + chunk_size]
+            if not block.any():
+                continue
+            key = ((x + tx) // chunk_size, (y + ty) // chunk_size)
+            chunk = chunks.get(key)
+            if chunk is None:
+                chunk = chunks[key] = np.zeros((chunk_size, chunk_size), dtype=np.uint32)
+            ox, oy = (x + tx) % chunk_size, (y + ty) % chunk_size
+            chunk[oy:oy + block.shape[0], ox:ox + block.shape[1]] = block
+
+
+# ---------------------------------------------------------
+# Binary cache
+# ---------------------------------------------------------
+def _cache_path(path):
+    stat = os.stat(path)
+    name = os.path.splitext(os.path.basename(path))[0]
+    stamp = f"{stat.st_size}-{stat.st_mtime_ns}-v{CACHE_VERSION}"
+    source_id = zlib.crc32(os.path.abspath(path).encode())
+    return os.path.join(CACHE_DIR, f"{name}-{source_id:08x}-{stamp}.npz")
+
+
+def _save_cache(cache_path, meta, layers_chunks):
+    # every chunk of every layer goes into one array, keyed by (layer, cx, cy)
+    size = meta["chunk_size"]
+    keys = [(i, cx, cy) for i, chunks in enumerate(layers_chunks) for cx, cy in sorted(chunks)]
+    data = [layers_chunks[i][(cx, cy)] for i, cx, cy in keys]
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = cache_path + ".tmp.npz"
+    np.savez(
+        tmp_path,
+        meta=np.array(json.dumps(meta)),
+        keys=np.array(keys, dtype=np.int32).reshape(-1, 3),
+        data=np.array(data, dtype=np.uint32).reshape(-1, size, size),
+    )
+    os.replace(tmp_path, cache_path)
+
+
+def _load_cache(cache_path):
+    with np.load(cache_path) as archive:
+        meta = json.loads(str(archive["meta"]))
+        keys, data = archive["keys"].tolist(), archive["data"]
+    layers_chunks = [{} for _ in meta["layers"]]
+    for (layer, cx, cy), gids in zip(keys, data):
+        layers_chunks[layer][(cx, cy)] = gids
+    for tileset in meta["tilesets"]:
+        # JSON turned the int animation keys into strings
+        tileset["animations"] = {int(k): v for k, v in tileset["animations"].items()}
+    return meta, layers_chunks
+
+
+# ---------------------------------------------------------
+# TileMap
+# ---------------------------------------------------------
+class TileMap:
+    """Array-backed tile map: one dict of (chunk_size x chunk_size) gid arrays per layer"""
+
+    def __init__(self, meta, layers_chunks):
+        self.meta = meta
+        self.tilewidth = meta["tilewidth"]
+        self.tileheight = meta["tileheight"]
+        self.chunk_size = meta["chunk_size"]
+        self.tilesets = meta["tilesets"]
+        self.layers = meta["layers"]
+        self.chunks = layers_chunks
+
+        # Animated gids -> (frame gids, frame end times, total duration ms)
+        self.animations = {}
+        for tileset in self.tilesets:
+            for local_id, frames in tileset["animations"].items():
+                gids = np.array([tileset["firstgid"] + tile for tile, _ in frames], dtype=np.uint32)
+                ends = np.cumsum([duration for _, duration in frames])
+                self.animations[tileset["firstgid"] + local_id] = (gids, ends, int(ends[-1]))
+        self.animated_gids = np.array(sorted(self.animations), dtype=np.uint32)
+
+        self.tile_cache = {}       # raw gid (with flip bits) -> Surface or None
+        self.tileset_images = {}   # tileset image path -> Surface or None
+        self.chunk_surfaces = {}   # (layer index, chunk key) -> (Surface or None, animated tiles)
+
+    @classmethod
+    def load(cls, path, use_cache=True):
+        """Load a .tmx file, going through the binary cache when possible"""
+        cache_path = _cache_path(path)
+        if use_cache and os.path.exists(cache_path):
+            try:
+                return cls(*_load_cache(cache_path))
+            except Exception as e:
+                print(f"⚠️ Ignoring broken map cache {cache_path}: {e}")
+        meta, layers_chunks = parse_tmx(path)
+        if use_cache:
+            try:
+                _save_cache(cache_path, meta, layers_chunks)
+            except OSError as e:
+                print(f"⚠️ Could not write map cache {cache_path}: {e}")
+        return cls(meta, layers_chunks)
+
+    @property
+    def chunk_pixels(self):
+        return (self.chunk_size * self.tilewidth, self.chunk_size * self.tileheight)
+
+    def tile_bounds(self, layers=None):
+        """(min_x, min_y, max_x, max_y) tile coordinates covering every non-empty
+        tile (max exclusive), or None for an empty map"""
+        lo, hi = None, None
+        for index, chunks in enumerate(self.chunks):
+            if layers is not None and index not in layers:
+                continue
+            for (cx, cy), gids in chunks.items():
+                ys, xs = np.nonzero(gids)
+                if len(xs) == 0:
+                    continue
+                x0, y0 = cx * self.chunk_size + xs.min(), cy * self.chunk_size + ys.min()
+                x1, y1 = cx * self.chunk_size + xs.max() + 1, cy * self.chunk_size + ys.max() + 1
+                lo = (x0, y0) if lo is None else (min(lo[0], x0), min(lo[1], y0))
+                hi = (x1, y1) if hi is None else (max(hi[0], x1), max(hi[1], y1))
+        if lo is None:
+            return None
+        return (int(lo[0]), int(lo[1]), int(hi[0]), int(hi[1]))
+
+    def find_layers(self, names):
+        """Indices of layers whose name is in `names` or whose `collides` property is true"""
+        return [i for i, layer in enumerate(self.layers)
+                if layer["name"] in names or str(layer["properties"].get("collides", "")).lower() == "true"]
+
+    # ---- Tile images ----
+    def _tileset_for(self, gid):
+        found = None
+        for tileset in self.tilesets:
+            if tileset["firstgid"] <= gid:
+                found = tileset
+            else:
+                break
+        return found
+
+    def get_tile(self, raw_gid):
+        """Surface for a gid (flip bits honoured), or None if empty/missing"""
+        raw_gid = int(raw_gid)
+        if raw_gid in self.tile_cache:
+            return self.tile_cache[raw_gid]
+        gid = raw_gid & GID_MASK
+        tile = None
+        tileset = self._tileset_for(gid) if gid else None
+        if tileset is not None and tileset["image"]:
+            image = self.tileset_images.get(tileset["image"], False)
+            if image is False:
+                try:
+                    image = load_image(tileset["image"])
+                except Exception as e:
+                    print(f"⚠️ Error loading tileset {tileset['name']}: {e}")
+                    image = None
+                self.tileset_images[tileset["image"]] = image
+            local = gid - tileset["firstgid"]
+            columns = tileset["columns"] or 1
+            tw, th = tileset["tilewidth"], tileset["tileheight"]
+            area = pygame.Rect((local % columns) * tw, (local // columns) * th, tw, th)
+            if image is not None and image.get_rect().contains(area):
+                tile = image.subsurface(area)
+                if raw_gid & FLIP_D:
+                    tile = pygame.transform.flip(pygame.transform.rotate(tile, -90), True, False)
+                if raw_gid & (FLIP_H | FLIP_V):
+                    tile = pygame.transform.flip(tile, bool(raw_gid & FLIP_H), bool(raw_gid & FLIP_V))
+        self.tile_cache[raw_gid] = tile
+        return tile
+
+    def animated_gid(self, raw_gid, time_ms):
+        """Frame of an animated tile at time_ms (flip bits carried over)"""
+        gids, ends, total = self.animations[int(raw_gid) & GID_MASK]
+        frame = int(np.searchsorted(ends, time_ms % total, side="right"))
+        return int(gids[min(frame, len(gids) - 1)]) | (int(raw_gid) & ~GID_MASK)
+
+    # ---- Chunk rendering ----
+    def get_chunk(self, layer_index, key):
+        """(pre-rendered Surface of the static tiles or None,
+            list of (x, y, raw gid) animated tiles in chunk pixels)"""
+        cached = self.chunk_surfaces.get((layer_index, key))
+        if cached is not None:
+            return cached
+        gids = self.chunks[layer_index][key]
+        masked = gids & GID_MASK
+        animated = np.isin(masked, self.animated_gids)
+        surface = None
+        static = (masked != 0) & ~animated
+        if static.any():
+            surface = pygame.Surface(self.chunk_pixels, pygame.SRCALPHA)
+            ys, xs = np.nonzero(static)
+            blits = []
+            for x, y, gid in zip(xs.tolist(), ys.tolist(), gids[ys, xs].tolist()):
+                tile = self.get_tile(gid)
+                if tile is not None:
+                    blits.append((tile, (x * self.tilewidth, y * self.tileheight)))
+            surface.blits(blits, doreturn=False)
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha()
+            opacity = self.layers[layer_index]["opacity"]
+            surface.set_alpha(int(opacity * 255), pygame.RLEACCEL)
+        ys, xs = np.nonzero(animated)
+        anim_tiles = [(x * self.tilewidth, y * self.tileheight, gid)
+                      for x, y, gid in zip(xs.tolist(), ys.tolist(), gids[ys, xs].tolist())]
+        cached = (surface, anim_tiles)
+        self.chunk_surfaces[(layer_index, key)] = cached
+        return cached
+
+    def prerender(self):
+        """Render every chunk of every visible layer now"""
+        for index, layer in enumerate(self.layers):
+            if layer["visible"]:
+                for key in self.chunks[index]:
+                    self.get_chunk(index, key)
+
+    def draw_layer(self, screen, layer_index, offset=(0, 0), time_ms=0):
+        """Blit one layer with its (0, 0) tile at screen position `offset`,
+        skipping chunks that are off screen"""
+        chunk_w, chunk_h = self.chunk_pixels
+        chunks = self.chunks[layer_index]
+        first_x, first_y, end_x, end_y = visible_chunks(screen, offset, chunk_w, chunk_h)
+        if (end_x - first_x) * (end_y - first_y) > len(chunks):
+            keys = [k for k in chunks if first_x <= k[0] < end_x and first_y <= k[1] < end_y]
+        else:
+            keys = [(cx, cy) for cy in range(first_y, end_y) for cx in range(first_x, end_x) if (cx, cy) in chunks]
+        blits = []
+        for key in keys:
+            surface, anim_tiles = self.get_chunk(layer_index, key)
+            x = offset[0] + key[0] * chunk_w
+            y = offset[1] + key[1] * chunk_h
+            if surface is not None:
+                blits.append((surface, (x, y)))
+            for tx, ty, gid in anim_tiles:
+                tile = self.get_tile(self.animated_gid(gid, time_ms))
+                if tile is not None:
+                    blits.append((tile, (x + tx, y + ty)))
+        screen.blits(blits, doreturn=False)
+
+    def draw(self, screen, offset=(0, 0), time_ms=0):
+        """Blit every visible layer in map order"""
+        for index, layer in enumerate(self.layers):
+            if layer["visible"]:
+                self.draw_layer(screen, index, offset, time_ms)
+
+    def collision_rects(self, layer_indices, offset=(0, 0)):
+        """Merge solid tiles of the given layers into row-run Rects (world pixels)"""
+        rects = []
+        for index in layer_indices:
+            for (cx, cy), gids in self.chunks[index].items():
+                solid = gids != 0
+                for row in range(self.chunk_size):
+                    cols = np.flatnonzero(solid[row])
+                    if len(cols) == 0:
+                        continue
+                    # split the row into runs of consecutive solid tiles
+                    breaks = np.flatnonzero(np.diff(cols) != 1)
+                    starts = np.concatenate(([cols[0]], cols[breaks + 1]))
+                    ends = np.concatenate((cols[breaks], [cols[-1]]))
+                    for start, end in zip(starts.tolist(), ends.tolist()):
+                        rects.append(pygame.Rect(
+                            offset[0] + (cx * self.chunk_size + start) * self.tilewidth,
+                            offset[1] + (cy * self.chunk_size + row) * self.tileheight,
+                            (end - start + 1) * self.tilewidth,
+                            self.tileheight,
+                        ))
+        return rects